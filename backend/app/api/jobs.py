@@ -1,12 +1,18 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
 from typing import List
-from ..services.job_fetcher import JobFetcher
-from ..core.database import SessionLocal
+from ..services.job_fetcher import get_job_fetcher
+from ..core.database import get_db
+from ..core.metrics import stage
+from ..services.job_ingest import JobIngestor
+from ..services.fetch_watermark import WatermarkStore, query_key
 from ..models.job import Job
-from datetime import datetime
-from ..services.matcher import Matcher
-import json
+from ..models.resume import Resume
+from ..services.match_queue import get_match_queue, QueueFull
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -15,49 +21,69 @@ class FetchRequest(BaseModel):
     companies: List[str] = []
 
 @router.post("/jobs/fetch")
-def fetch_jobs(request: FetchRequest):
-    """Fetch jobs from external API, store them, and run matching against stored resumes.
+def fetch_jobs(request: FetchRequest, db: Session = Depends(get_db)):
+    """Fetch jobs from external API, store them, and queue matching against stored resumes.
+
+    Returns jobs_fetched, the number of postings this query had not seen before
+    (some may already be stored from other queries), jobs_stored, the number of
+    those that were new to the jobs table, and the id of the background match
+    task; poll /jobs/match-tasks/{task_id} for its progress.
+    """
+    jf = get_job_fetcher()
+    # incremental: only postings not seen by earlier fetches of the same query come back
+    watermarks = WatermarkStore(db)
+    key = query_key(request.roles, request.companies, jf.countries)
+    state = watermarks.load(key)
+    with stage("fetch"):
+        jobs = jf.fetch_jobs(request.roles, request.companies, state)
+
+    # resolve existing external_ids and insert the new jobs in one transaction; the
+    # watermark commits with them, so postings are never marked seen but not stored
+    with stage("ingest", items=len(jobs)):
+        ingest = JobIngestor(db).ingest(jobs, commit=False)
+        watermarks.save(key, state, commit=False)
+        db.commit()
+    counts = {"jobs_fetched": len(jobs), "jobs_stored": len(ingest.new_ids)}
+
+    # resumes whose upload-time matching was rejected or failed are retried here
+    _resubmit_pending_resumes(db)
+
+    # only jobs not yet matched against every resume need scoring (later resumes
+    # get matched on upload): the new ones, plus any whose earlier task was
+    # rejected or failed, which stay match_pending until a task completes
+    pending = [job_id for (job_id,) in db.query(Job.id).filter(Job.match_pending.is_(True)).order_by(Job.id)]
+    if not pending:
+        return {**counts, "match_task_id": None}
+
+    # matching runs on the background worker pool, off the request path
+    try:
+        task = get_match_queue().submit_unclaimed(pending)
+    except QueueFull:
+        # the jobs are stored either way; the next fetch resubmits them
+        logger.warning("Match queue full; %d jobs stay pending until the next fetch", len(pending))
+        return {**counts, "match_task_id": None}
+
+    return {**counts, "match_task_id": task.id if task is not None else None}
+
+def _resubmit_pending_resumes(db: Session):
+    pending = [resume_id for (resume_id,) in
+               db.query(Resume.id).filter(Resume.match_pending.is_(True)).order_by(Resume.id)]
+    if not pending:
+        return
+    try:
+        get_match_queue().submit_unclaimed([], resume_ids=pending)
+    except QueueFull:
+        logger.warning("Match queue full; %d resumes stay pending until the next fetch", len(pending))
+
+@router.get("/jobs/match-tasks/{task_id}")
+def get_match_task(task_id: str):
+    """Return status and progress of a background match task.
 
-    Returns number of jobs fetched.
+    status is queued, running, done, partial (some resumes failed to match and
+    stay pending for the next fetch) or failed. Finished tasks can be polled for
+    MATCH_TASK_TTL seconds.
     """
-    jf = JobFetcher()
-    jobs = jf.fetch_jobs(request.roles, request.companies)
-
-    db = SessionLocal()
-    stored_count = 0
-    stored_jobs = []
-    for j in jobs:
-        # avoid duplicates by external_id and apply_url
-        existing = None
-        if j.get("external_id"):
-            existing = db.query(Job).filter(Job.external_id == j.get("external_id")).first()
-        if not existing:
-            job = Job(
-                external_id=j.get("external_id"),
-                title=j.get("title"),
-                company=j.get("company"),
-                description=j.get("description"),
-                posted_date=datetime.fromisoformat(j.get("posted_date")) if j.get("posted_date") else None,
-                apply_url=j.get("apply_url")
-            )
-            db.add(job)
-            db.commit()
-            db.refresh(job)
-            stored_jobs.append(job)
-            stored_count += 1
-        else:
-            stored_jobs.append(existing)
-
-    # run matching pipeline for all resumes (non-blocking on individual errors)
-    matcher = Matcher()
-    from ..models.resume import Resume
-    resumes = db.query(Resume).all()
-
-    for r in resumes:
-        try:
-            matcher.match_resume_with_jobs(r, stored_jobs)
-        except Exception:
-            # Ignore matching errors for a single resume to allow other matches to proceed
-            continue
-
-    return {"jobs_fetched": len(jobs)}
+    task = get_match_queue().status(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Match task not found")
+    return task
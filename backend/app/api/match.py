@@ -1,7 +1,15 @@
-from fastapi import APIRouter, HTTPException
+import json
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from ..core.database import get_db
+from ..core.metrics import RESULTS_CACHE
+from ..models.resume import Resume
 from ..services.matcher import Matcher
+from ..services.results_cache import get_results_cache
+from ..services.embedding_service import EmbeddingService
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
+from datetime import datetime, timezone
 
 class ResumeData(BaseModel):
     text: str
@@ -12,20 +20,70 @@ class ResumeData(BaseModel):
 router = APIRouter()
 
 @router.post("/run")
-def run_match(resume: ResumeData):
-    """Run job matching for the given resume data."""
-    matcher = Matcher()
-    # create an in-memory Resume-like dict for one-off matching
-    from ..models.resume import Resume
-    temp = Resume(text=resume.text, skills=resume.skills)
-    matches = matcher.match_resume_with_jobs(temp, [])
+def run_match(
+    resume: ResumeData,
+    top_k: int = Query(20, ge=1, le=1000),
+    company: Optional[str] = Query(None),
+    posted_since: Optional[datetime] = Query(None),
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    db: Session = Depends(get_db),
+):
+    """Match the given resume data against all stored jobs without saving anything.
+
+    Returns the top_k best matches, optionally only for one company, jobs posted
+    since a date, or scores of at least min_score percent.
+    """
+    matcher = Matcher(db)
+    if posted_since is not None and posted_since.tzinfo is not None:
+        # posted dates are stored as naive UTC
+        posted_since = posted_since.astimezone(timezone.utc).replace(tzinfo=None)
+    # skills given by the client are canonicalized by the matcher; fall back to the text
+    skills = resume.skills or matcher.skill_extractor.extract(resume.text)
+    emb = EmbeddingService().generate_embedding(resume.text)
+    matches = matcher.rank_corpus(emb, skills, top_k=top_k, company=company,
+                                  posted_since=posted_since, min_score=min_score)
     return {"matches": matches}
 
 @router.get("/results/{resume_id}")
-def get_results(resume_id: int):
-    """Return stored match results for a given resume id."""
-    matcher = Matcher()
-    results = matcher.get_matches_for_resume(resume_id)
+def get_results(
+    resume_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """Return stored match results for a given resume id, best score first.
+
+    Paginated with limit/offset; min_score drops matches below that percentage.
+    Every resume/job pair is stored unless MATCH_KEEP_PER_RESUME caps it, in
+    which case pages past that many matches are empty.
+    Responses carry an ETag derived from the resume's match_version, so polling
+    clients sending If-None-Match get a 304 until matching writes new results;
+    bodies are served from the results cache while the version is unchanged.
+    """
+    row = db.query(Resume.match_version).filter(Resume.id == resume_id).first()
+    query = (limit, offset, min_score)
+    if row is not None:
+        version = row.match_version or 0
+        etag = f'"{resume_id}-{version}-{limit}-{offset}-{min_score}"'
+        # no-cache: browsers may keep the body but must revalidate it on every poll
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if if_none_match and (if_none_match.strip() == "*" or etag in
+                              [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]):
+            RESULTS_CACHE.inc(result="not_modified")
+            return Response(status_code=304, headers=headers)
+        cache = get_results_cache()
+        body = cache.get(resume_id, query, version)
+        if body is not None:
+            return Response(body, media_type="application/json", headers=headers)
+
+    matcher = Matcher(db)
+    results = matcher.get_matches_for_resume(resume_id, limit=limit, offset=offset, min_score=min_score)
     if results is None:
         raise HTTPException(status_code=404, detail="Resume not found or no matches")
-    return results
\ No newline at end of file
+    if row is None:
+        return results
+    body = json.dumps(results, separators=(",", ":")).encode("utf-8")
+    cache.put(resume_id, query, version, body)
+    return Response(body, media_type="application/json", headers=headers)
\ No newline at end of file
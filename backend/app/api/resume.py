@@ -1,40 +1,118 @@
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional
+
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from ..services.resume_parser import ResumeParser
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import RESUME_BATCH_MAX_FILES
 from ..core.database import SessionLocal
+from ..core.metrics import stage
 from ..models.resume import Resume
-import json
 from ..services.embedding_service import EmbeddingService
+from ..services.match_queue import QueueFull, get_match_queue
+from ..services.resume_parser import ResumeParser, ResumeTooLarge
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+FILE_TYPES = {".pdf": "pdf", ".docx": "docx"}
+
+
+def _file_type(filename: Optional[str]) -> Optional[str]:
+    name = (filename or "").lower()
+    for ext, ftype in FILE_TYPES.items():
+        if name.endswith(ext):
+            return ftype
+    return None
+
+
+def _store_resumes(parsed: List[Dict]) -> List[int]:
+    """Embed parsed resumes in one batch and insert them in one transaction; returns their ids."""
+    embeddings = EmbeddingService().generate_embeddings([p["text"] for p in parsed])
+    db = SessionLocal()
+    try:
+        with stage("store_resumes", items=len(parsed)):
+            resumes = []
+            for p, emb in zip(parsed, embeddings):
+                resume = Resume(text=p["text"], skills=json.dumps(p["skills"]), match_pending=True)
+                resume.set_embedding(emb)
+                resumes.append(resume)
+            db.add_all(resumes)
+            db.flush()
+            ids = [r.id for r in resumes]
+            db.commit()
+        return ids
+    finally:
+        db.close()
+
+
+def _queue_matching(resume_ids: List[int]) -> Optional[str]:
+    """Match new resumes against the stored jobs in the background; returns the task id."""
+    try:
+        return get_match_queue().submit([], resume_ids=resume_ids).id
+    except QueueFull:
+        # the resumes are stored either way and stay pending; the next job fetch resubmits them
+        logger.warning("Match queue full; resumes %s stay pending until the next fetch", resume_ids)
+        return None
+
+
+# Parsing and embedding are CPU bound and blocking, so both run on the threadpool
+# (and PDF pages on the parser's process pool) to keep the event loop free.
+
 @router.post("/resume/upload")
 async def upload_resume(file: UploadFile = File(...)):
     """Upload a resume (pdf or docx), parse it, store it and return the resume id."""
-    filename = file.filename.lower()
-    if filename.endswith(".pdf"):
-        ftype = "pdf"
-    elif filename.endswith(".docx"):
-        ftype = "docx"
-    else:
+    ftype = _file_type(file.filename)
+    if ftype is None:
         raise HTTPException(status_code=400, detail="Unsupported file type")
 
-    content = await file.read()
-    # write temporarily
-    tmp_path = f"/tmp/{file.filename}"
-    with open(tmp_path, "wb") as f:
-        f.write(content)
+    try:
+        # parse straight from the spooled upload; no copy under /tmp
+        parsed = await run_in_threadpool(ResumeParser().parse_resume, file.file, ftype)
+    except ResumeTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
-    parser = ResumeParser()
-    parsed = parser.parse_resume(tmp_path, ftype)
+    ids = await run_in_threadpool(_store_resumes, [parsed])
+    return {"resume_id": ids[0], "match_task_id": _queue_matching(ids)}
 
-    # store in DB
-    db = SessionLocal()
-    emb_service = EmbeddingService()
-    emb = emb_service.generate_embedding(parsed["text"]).tolist()
 
-    resume = Resume(text=parsed["text"], skills=json.dumps(parsed["skills"]), embedding=json.dumps(emb))
-    db.add(resume)
-    db.commit()
-    db.refresh(resume)
+@router.post("/resume/upload/batch")
+async def upload_resumes(files: List[UploadFile] = File(...)):
+    """Upload several resumes at once.
+
+    Files are parsed concurrently, embedded in one batch and stored in one
+    transaction. Returns one entry per file, in order, with either its
+    resume_id or the error that kept it from being stored, plus the id of the
+    background task matching the stored resumes against existing jobs.
+    """
+    if len(files) > RESUME_BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"At most {RESUME_BATCH_MAX_FILES} files per batch")
+
+    results: List[Dict] = [{"filename": f.filename} for f in files]
+    parsed: List[Optional[Dict]] = [None] * len(files)
+
+    async def parse(i: int, file: UploadFile):
+        ftype = _file_type(file.filename)
+        if ftype is None:
+            results[i]["error"] = "Unsupported file type"
+            return
+        try:
+            parsed[i] = await run_in_threadpool(ResumeParser().parse_resume, file.file, ftype)
+        except Exception as e:
+            # one unreadable file should not fail the rest of the batch
+            logger.warning("Could not parse %s: %s", file.filename, e)
+            results[i]["error"] = str(e) or type(e).__name__
+
+    await asyncio.gather(*(parse(i, f) for i, f in enumerate(files)))
 
-    return {"resume_id": resume.id}
+    ok = [i for i, p in enumerate(parsed) if p is not None]
+    task_id = None
+    if ok:
+        ids = await run_in_threadpool(_store_resumes, [parsed[i] for i in ok])
+        for i, resume_id in zip(ok, ids):
+            results[i]["resume_id"] = resume_id
+        task_id = _queue_matching(ids)
+    return {"resumes": results, "match_task_id": task_id}
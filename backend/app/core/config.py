@@ -0,0 +1,85 @@
+import os
+import tempfile
+
+# Database connections (see core/database.py)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))  # server databases (e.g. Postgres) only
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; -1 keeps connections forever
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # NORMAL is durable enough under WAL
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))  # page cache per connection
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Metrics and profiling (see core/metrics.py)
+# off by default: the breakdown exposes internals, so only enable it where every caller is trusted
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"  # honour the profiling request header
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")
+
+# Embedding generation (see services/embedding_service.py)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache.db")  # "" disables the disk tier
+EMBEDDING_WARMUP = os.getenv("EMBEDDING_WARMUP", "1") == "1"  # load the model in the background at startup
+
+# Shared embedding worker process (see services/embedding_worker.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "inline")  # inline | worker
+# unix socket path; by default in a directory only the current user can enter
+EMBEDDING_WORKER_ADDRESS = os.getenv("EMBEDDING_WORKER_ADDRESS") or os.path.join(
+    os.getenv("XDG_RUNTIME_DIR") or os.path.join(tempfile.gettempdir(), f"jobmatch-{os.getuid()}"),
+    "jobmatch-embedding.sock")
+EMBEDDING_WORKER_AUTOSTART = os.getenv("EMBEDDING_WORKER_AUTOSTART", "1") == "1"
+EMBEDDING_WORKER_TIMEOUT = float(os.getenv("EMBEDDING_WORKER_TIMEOUT", "30"))  # seconds
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "256"))  # texts per coalesced encode
+EMBEDDING_QUEUE_SIZE = int(os.getenv("EMBEDDING_QUEUE_SIZE", "64"))  # pending requests before rejecting
+
+# Memory-mapped job corpus snapshot shared by all workers (see services/job_corpus.py)
+JOB_CORPUS_PATH = os.getenv("JOB_CORPUS_PATH", "./job_corpus")
+JOB_CORPUS_CHECK_INTERVAL = float(os.getenv("JOB_CORPUS_CHECK_INTERVAL", "1"))  # seconds between change checks
+JOB_CORPUS_WARMUP = os.getenv("JOB_CORPUS_WARMUP", "1") == "1"  # catch up with the jobs table in the background at startup
+JOB_CORPUS_QUANTIZED = os.getenv("JOB_CORPUS_QUANTIZED", "1") == "1"  # int8 first pass, float32 rescoring
+JOB_CORPUS_RESCORE_FACTOR = int(os.getenv("JOB_CORPUS_RESCORE_FACTOR", "4"))  # rescored candidates per result
+JOB_CORPUS_RESCORE_MIN = int(os.getenv("JOB_CORPUS_RESCORE_MIN", "1000"))
+
+# IVF shortlist over the job corpus (see services/job_index.py)
+JOB_INDEX_MIN_ROWS = int(os.getenv("JOB_INDEX_MIN_ROWS", "50000"))  # smaller corpora are scanned in full
+JOB_INDEX_LISTS = int(os.getenv("JOB_INDEX_LISTS", "0"))  # k-means lists; 0 picks sqrt(rows)
+JOB_INDEX_NPROBE = int(os.getenv("JOB_INDEX_NPROBE", "32"))  # lists scanned per query; more is closer to exact
+
+# Cached /api/results responses (see services/results_cache.py)
+RESULTS_CACHE_MAX_BYTES = int(os.getenv("RESULTS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # serialized bodies
+
+# Background matching triggered by /api/jobs/fetch (see services/match_queue.py)
+MATCH_WORKERS = int(os.getenv("MATCH_WORKERS", "2"))
+MATCH_QUEUE_SIZE = int(os.getenv("MATCH_QUEUE_SIZE", "100"))
+# opt-in cap on the matches stored per resume (its best ones); 0 stores every pair.
+# With a cap, /api/results has nothing past that many matches for any resume.
+MATCH_KEEP_PER_RESUME = int(os.getenv("MATCH_KEEP_PER_RESUME", "0"))
+MATCH_MAX_RETRIES = int(os.getenv("MATCH_MAX_RETRIES", "2"))
+MATCH_RETRY_BACKOFF = float(os.getenv("MATCH_RETRY_BACKOFF", "0.5"))  # seconds, doubled per retry
+MATCH_TASK_TTL = int(os.getenv("MATCH_TASK_TTL", "86400"))  # seconds a finished task stays pollable
+
+# Adzuna job fetching (see services/job_fetcher.py)
+ADZUNA_BASE_URL = os.getenv("ADZUNA_BASE_URL", "https://api.adzuna.com/v1/api/jobs")
+ADZUNA_COUNTRIES = [c.strip() for c in os.getenv("ADZUNA_COUNTRIES", "us").split(",") if c.strip()]
+FETCH_MAX_PAGES = int(os.getenv("FETCH_MAX_PAGES", "10"))
+FETCH_RESULTS_PER_PAGE = int(os.getenv("FETCH_RESULTS_PER_PAGE", "50"))
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "4"))
+FETCH_RATE_LIMIT = float(os.getenv("FETCH_RATE_LIMIT", "5"))  # requests per second, 0 = unlimited
+FETCH_MAX_RETRIES = int(os.getenv("FETCH_MAX_RETRIES", "3"))
+FETCH_RETRY_BACKOFF = float(os.getenv("FETCH_RETRY_BACKOFF", "0.5"))
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "10"))
+
+# Resume parsing (see services/resume_parser.py)
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(10 * 1024 * 1024)))
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "50"))
+RESUME_PARALLEL_PAGES = int(os.getenv("RESUME_PARALLEL_PAGES", "8"))  # PDFs with more pages use the process pool
+RESUME_PARSE_WORKERS = int(os.getenv("RESUME_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+RESUME_BATCH_MAX_FILES = int(os.getenv("RESUME_BATCH_MAX_FILES", "20"))  # per /resume/upload/batch request
+
+# Skill taxonomy: canonical skill -> aliases (see services/skill_extractor.py)
+SKILL_TAXONOMY_PATH = os.getenv(
+    "SKILL_TAXONOMY_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "skills.json")
+)
@@ -1,14 +1,98 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+import time
+
+from .config import (
+    DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT,
+    SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE, SQLITE_SYNCHRONOUS,
+)
+from .metrics import record_db_query
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./jobs.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+def _create_engine(url: str):
+    if make_url(url).get_backend_name() != "sqlite":
+        return create_engine(
+            url,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+
+    # sessions are handed between threadpool threads (dependency vs endpoint), never
+    # used by two threads at once, so the sqlite3 same-thread check does not apply
+    sqlite_engine = create_engine(
+        url, connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000.0}
+    )
+
+    @event.listens_for(sqlite_engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        # WAL lets readers proceed while a writer commits; the rest trades a little
+        # durability on power loss and some memory for fewer fsyncs and disk reads
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    return sqlite_engine
+
+
+engine = _create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# every statement counts as one round trip in the metrics and the request profile
+@event.listens_for(engine, "before_cursor_execute")
+def _query_start(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _query_end(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start", None)
+    if start is not None:
+        record_db_query(time.perf_counter() - start)
+
+
+def get_db():
+    """FastAPI dependency: one session per request, always closed afterwards."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def init_db():
+    # import every model so its table is registered on Base.metadata
+    from ..models import job, resume, match, match_task, fetch_watermark  # noqa: F401
     Base.metadata.create_all(bind=engine)
+    from .migrations import run_migrations
+    run_migrations(engine)
+
+
+def dialect_insert(db, table):
+    """INSERT construct for the session's dialect, so callers can use ON CONFLICT clauses.
+
+    Returns None for dialects without ON CONFLICT support.
+    """
+    name = db.get_bind().dialect.name
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(table)
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(table)
+    return None
@@ -0,0 +1,157 @@
+"""In-process metrics with Prometheus text exposition, plus per-request stage profiles.
+
+Pipeline code wraps its stages in ``with stage("embed", items=n):``. Each stage
+is recorded in the jobmatch_stage_seconds histogram and jobmatch_stage_items_total
+counter, and, when the current request opted into profiling (see
+ProfilingMiddleware in main.py), in that request's breakdown as well.
+
+Metrics are per process; with several uvicorn workers each exposes its own.
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# latency buckets in seconds, from sub-millisecond cache hits to slow fetches
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(n, "")) for n in self.labelnames), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [per-bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[idx] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += count
+                    le = 'le="%s"' % ("+Inf" if bound == math.inf else f"{bound:g}")
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total[0]:g}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+REGISTRY: List = []
+
+STAGE_SECONDS = Histogram("jobmatch_stage_seconds", "Time spent in each pipeline stage", ["stage"])
+STAGE_ITEMS = Counter("jobmatch_stage_items_total", "Items processed by each pipeline stage", ["stage"])
+EMBEDDING_CACHE = Counter("jobmatch_embedding_cache_total", "Embedding cache lookups by outcome", ["result"])
+DB_QUERIES = Counter("jobmatch_db_queries_total", "Database round trips (statements executed)")
+DB_SECONDS = Histogram("jobmatch_db_query_seconds", "Time per database statement")
+HTTP_SECONDS = Histogram("jobmatch_http_request_seconds", "HTTP request latency", ["method", "route", "status"])
+RESULTS_CACHE = Counter("jobmatch_results_cache_total", "Results cache lookups by outcome", ["result"])
+FETCH_REQUESTS = Counter("jobmatch_fetch_requests_total", "Job board page requests by outcome", ["result"])
+
+# stage name -> [seconds, calls, items] for the current request, when profiling was requested
+_profile: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("jobmatch_profile", default=None)
+
+
+def start_profile() -> Dict[str, List[float]]:
+    profile: Dict[str, List[float]] = {}
+    _profile.set(profile)
+    return profile
+
+
+def _profile_add(name: str, seconds: float, items: int):
+    profile = _profile.get()
+    if profile is not None:
+        entry = profile.setdefault(name, [0.0, 0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+        entry[2] += items
+
+
+def record_stage(name: str, seconds: float, items: Optional[int] = None):
+    STAGE_SECONDS.observe(seconds, stage=name)
+    if items:
+        STAGE_ITEMS.inc(items, stage=name)
+    _profile_add(name, seconds, items or 0)
+
+
+@contextmanager
+def stage(name: str, items: Optional[int] = None):
+    """Time the enclosed block as pipeline stage `name`, optionally counting `items` processed."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start, items)
+
+
+def record_db_query(seconds: float):
+    DB_QUERIES.inc()
+    DB_SECONDS.observe(seconds)
+    _profile_add("db", seconds, 1)
+
+
+def server_timing(profile: Dict[str, List[float]]) -> str:
+    """Render a profile as a Server-Timing header value (durations in ms)."""
+    parts = []
+    for name, (seconds, calls, items) in profile.items():
+        desc = f"{int(calls)} calls" + (f", {int(items)} items" if items and name != "db" else "")
+        parts.append(f'{name};dur={seconds * 1000:.2f};desc="{desc}"')
+    return ", ".join(parts)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,147 @@
+"""Lightweight in-place schema/data migrations run from init_db().
+
+The project has no migration framework; each step here is idempotent and cheap to
+re-run on an already migrated database.
+"""
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from .vectors import decode_json_embedding, embedding_to_bytes
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_TABLES = ("jobs", "resumes")
+BATCH_SIZE = 500
+
+
+def _ensure_binary_embedding_column(engine: Engine, table: str):
+    """Postgres cannot store bytes in a TEXT column, so convert the column type first.
+
+    SQLite is dynamically typed and keeps blobs in the old TEXT column as-is.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    columns = {c["name"]: c for c in inspect(engine).get_columns(table)}
+    col = columns.get("embedding")
+    if col is None or col["type"].__class__.__name__.upper() in ("BYTEA", "LARGEBINARY"):
+        return
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"ALTER TABLE {table} ALTER COLUMN embedding TYPE BYTEA USING convert_to(embedding, 'UTF8')"
+        ))
+
+
+def _legacy_filter(engine: Engine) -> str:
+    # narrow the scan to rows that can still hold JSON so re-runs stay cheap
+    if engine.dialect.name == "sqlite":
+        return " AND typeof(embedding) = 'text'"
+    if engine.dialect.name == "postgresql":
+        return " AND substring(embedding from 1 for 1) = '\\x5b'::bytea"  # '['
+    return ""
+
+
+def migrate_json_embeddings(engine: Engine) -> int:
+    """Rewrite embeddings stored as JSON text into float32 bytes.
+
+    Returns the number of rows converted.
+    """
+    tables = set(inspect(engine).get_table_names())
+    converted = 0
+    for table in EMBEDDING_TABLES:
+        if table not in tables:
+            continue
+        _ensure_binary_embedding_column(engine, table)
+        legacy = _legacy_filter(engine)
+        last_id = 0
+        while True:
+            with engine.begin() as conn:
+                rows = conn.execute(
+                    text(
+                        f"SELECT id, embedding FROM {table} WHERE id > :last AND embedding IS NOT NULL{legacy} "
+                        "ORDER BY id LIMIT :n"
+                    ),
+                    {"last": last_id, "n": BATCH_SIZE},
+                ).fetchall()
+                if not rows:
+                    break
+                updates = []
+                for row_id, value in rows:
+                    vec = decode_json_embedding(value)
+                    if vec is not None:
+                        updates.append({"id": row_id, "emb": embedding_to_bytes(vec)})
+                if updates:
+                    conn.execute(text(f"UPDATE {table} SET embedding = :emb WHERE id = :id"), updates)
+                    converted += len(updates)
+                last_id = rows[-1][0]
+    if converted:
+        logger.info("Converted %d JSON embeddings to float32 blobs", converted)
+    return converted
+
+
+def dedupe_matches(engine: Engine) -> int:
+    """Collapse duplicate (resume_id, job_id) match rows and add the unique index.
+
+    Keeps the newest row of each pair. Returns the number of rows deleted.
+    """
+    inspector = inspect(engine)
+    if "matches" not in inspector.get_table_names():
+        return 0
+    if any(ix["name"] == "uq_matches_resume_job" for ix in inspector.get_indexes("matches")):
+        return 0
+    with engine.begin() as conn:
+        deleted = conn.execute(text(
+            "DELETE FROM matches WHERE id NOT IN (SELECT MAX(id) FROM matches GROUP BY resume_id, job_id)"
+        )).rowcount
+        conn.execute(text("CREATE UNIQUE INDEX uq_matches_resume_job ON matches (resume_id, job_id)"))
+    if deleted:
+        logger.info("Removed %d duplicate match rows", deleted)
+    return deleted
+
+
+def ensure_columns(engine: Engine):
+    """Add nullable columns that were added to models after their tables existed.
+
+    create_all() never alters an existing table.
+    """
+    from .database import Base
+
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+            logger.info("Added column %s.%s", table.name, column.name)
+
+
+def ensure_indexes(engine: Engine):
+    """Create indexes added to models after their tables already existed.
+
+    create_all() only creates indexes together with a new table.
+    """
+    from .database import Base
+
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+
+
+def run_migrations(engine: Engine):
+    ensure_columns(engine)
+    migrate_json_embeddings(engine)
+    dedupe_matches(engine)
+    ensure_indexes(engine)
@@ -0,0 +1,69 @@
+import json
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+# Embeddings are stored as little-endian float32 bytes (384 dims -> 1536 bytes)
+EMBEDDING_DTYPE = np.dtype("<f4")
+
+# bytes json.loads() skips around a value
+_JSON_WHITESPACE = frozenset(b" \t\r\n")
+
+
+def embedding_to_bytes(embedding) -> bytes:
+    """Serialize an embedding to raw float32 bytes for a LargeBinary column."""
+    return np.asarray(embedding, dtype=EMBEDDING_DTYPE).tobytes()
+
+
+def quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-vector symmetric int8 quantization: embeddings ~= codes * scales[:, None].
+
+    Each row is scaled so its largest component maps to +-127; all-zero rows get
+    scale 0. Returns (codes int8 (N, D), scales float32 (N,)).
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    scales = np.abs(embeddings).max(axis=1) / 127 if embeddings.size else np.zeros(len(embeddings), dtype=np.float32)
+    divisor = np.where(scales > 0, scales, 1)[:, None]
+    codes = np.clip(np.rint(embeddings / divisor), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def decode_json_embedding(value: Union[bytes, str]) -> Optional[np.ndarray]:
+    """Decode a legacy embedding stored as a JSON list of floats.
+
+    Returns None when the value is not JSON, i.e. it is already in the binary format.
+    Binary values are sniffed in place, so only legacy rows are ever copied.
+    """
+    if isinstance(value, str):
+        stripped = value.strip()
+        if not (stripped.startswith("[") and stripped.endswith("]")):
+            return None
+    else:
+        view = memoryview(value).cast("B")
+        start, end = 0, len(view)
+        while start < end and view[start] in _JSON_WHITESPACE:
+            start += 1
+        while end > start and view[end - 1] in _JSON_WHITESPACE:
+            end -= 1
+        if end - start < 2 or view[start] != ord("[") or view[end - 1] != ord("]"):
+            return None
+        stripped = bytes(view[start:end])
+    try:
+        return np.asarray(json.loads(stripped), dtype=np.float32)
+    except (ValueError, TypeError):
+        # raw float32 bytes that happen to start with "[" and end with "]"
+        return None
+
+
+def embedding_from_bytes(value: Union[bytes, str, None]) -> Optional[np.ndarray]:
+    """Decode a stored embedding.
+
+    Binary values are wrapped with np.frombuffer without copying, so the result is
+    read-only. Legacy JSON rows (written before the binary format) are still decoded.
+    """
+    if value is None or len(value) == 0:
+        return None
+    legacy = decode_json_embedding(value)
+    if legacy is not None:
+        return legacy
+    return np.frombuffer(value, dtype=EMBEDDING_DTYPE)
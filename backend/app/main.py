@@ -1,10 +1,33 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import text
 from .api import match
 from .api import jobs
-from .core.database import init_db
+from .core import metrics
+from .core.config import EMBEDDING_WARMUP, JOB_CORPUS_WARMUP, PROFILE_HEADER, PROFILING_ENABLED
+from .core.database import init_db, engine
+from .services.embedding_service import EmbeddingService
+from .services.embedding_worker import EmbeddingBackendBusy
+from .services import job_corpus
 
-app = FastAPI(title="AI-Powered Job Matching System", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Ensure DB tables are created
+    init_db()
+    if EMBEDDING_WARMUP:
+        # load the model off the startup path; /ready reports when it is done
+        EmbeddingService().warm_up(background=True)
+    if JOB_CORPUS_WARMUP:
+        # build the corpus snapshot off the request path; /api/run serves the one on disk meanwhile
+        job_corpus.warm_up(background=True)
+    yield
+
+
+app = FastAPI(title="AI-Powered Job Matching System", version="1.0.0", lifespan=lifespan)
 
 # Simple CORS for local frontend integration
 app.add_middleware(
@@ -15,8 +38,76 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Ensure DB tables are created
-init_db()
+
+class ProfilingMiddleware:
+    """Record request latency per route; with the profile header set, return a per-stage breakdown.
+
+    With PROFILING_ENABLED=1, a request carrying ``X-Profile: 1`` (see PROFILE_HEADER)
+    gets a Server-Timing header listing every pipeline stage it went through (see
+    core/metrics.py), plus "db" for its database round trips and "total" for the
+    whole request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.header = PROFILE_HEADER.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = None
+        if PROFILING_ENABLED and dict(scope["headers"]).get(self.header, b"0") not in (b"", b"0"):
+            profile = metrics.start_profile()
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile is not None:
+                    profile["total"] = [time.perf_counter() - start, 1, 0]
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", metrics.server_timing(profile).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # label by route template, not raw path, to keep the series count bounded
+            metrics.HTTP_SECONDS.observe(time.perf_counter() - start, method=scope["method"],
+                                         route=route_label(scope), status=status)
+
+
+def route_label(scope) -> str:
+    """Full path template of the matched route, e.g. "/api/results/{resume_id}".
+
+    A route included with a prefix only knows its own part of the path, so the
+    prefix is recovered as the part of the request path in front of what the
+    route's pattern matches.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    path = scope["path"]
+    pattern = getattr(route, "path_regex", None)
+    if pattern is not None:
+        for i, char in enumerate(path):
+            if char == "/" and pattern.match(path[i:]):
+                return path[:i] + template
+    return template
+
+
+app.add_middleware(ProfilingMiddleware)
+
+@app.exception_handler(EmbeddingBackendBusy)
+async def embedding_busy(request: Request, exc: EmbeddingBackendBusy):
+    # the shared embedding worker is saturated; tell clients to back off
+    return JSONResponse({"detail": "Embedding service is busy, retry shortly"}, status_code=503,
+                        headers={"Retry-After": "1"})
 
 app.include_router(match.router, prefix="/api", tags=["match"])
 app.include_router(jobs.router, prefix="/api", tags=["jobs"])
@@ -25,4 +116,31 @@ app.include_router(resume.router, prefix="/api", tags=["resume"])
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to the AI-Powered Job Matching API"}
\ No newline at end of file
+    return {"message": "Welcome to the AI-Powered Job Matching API"}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus scrape endpoint (text exposition format); metrics are per process."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/ready")
+def ready():
+    """Readiness probe: 200 once the database answers and the embedding model is loaded.
+
+    If nothing is loading the model (warm-up is off, or the last load failed),
+    the probe starts a background load, so a later probe can turn ready.
+    """
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        database = "ok"
+    except Exception:
+        database = "unavailable"
+    service = EmbeddingService()
+    model = service.model_state
+    if model in ("not_loaded", "failed"):
+        service.warm_up(background=True)
+        model = "loading"
+    is_ready = database == "ok" and model == "ready"
+    body = {"status": "ready" if is_ready else "starting", "database": database, "model": model}
+    return JSONResponse(body, status_code=200 if is_ready else 503)
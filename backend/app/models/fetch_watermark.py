@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy.sql import func
+from ..core.database import Base
+import json
+
+class FetchWatermark(Base):
+    """Persisted FetchState for one fetch query (roles + companies + countries)."""
+    __tablename__ = "fetch_watermarks"
+    id = Column(Integer, primary_key=True, index=True)
+    query_key = Column(String, unique=True, index=True)
+    newest_created = Column(DateTime, nullable=True)
+    seen_ids = Column(Text)  # JSON object external_id -> posted date
+    validators = Column(Text)  # JSON object page url -> {etag, last_modified}
+    incomplete_countries = Column(Text, nullable=True)  # JSON list of countries with a failed page
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    def seen_dict(self):
+        try:
+            return json.loads(self.seen_ids)
+        except Exception:
+            return {}
+
+    def validators_dict(self):
+        try:
+            return json.loads(self.validators)
+        except Exception:
+            return {}
+
+    def incomplete_list(self):
+        try:
+            return json.loads(self.incomplete_countries) or []
+        except Exception:
+            return []
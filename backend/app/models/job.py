@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Text, LargeBinary
 from sqlalchemy.sql import func
 from ..core.database import Base
+from ..core.vectors import embedding_to_bytes, embedding_from_bytes
 import json
 
 class Job(Base):
@@ -12,9 +13,26 @@ class Job(Base):
     description = Column(Text)
     posted_date = Column(DateTime)
     apply_url = Column(String)
-    embedding = Column(Text, nullable=True)  # store as JSON list
+    embedding = Column(LargeBinary, nullable=True)  # float32 bytes
+    skills = Column(Text, nullable=True)  # JSON list of canonical skills, extracted at ingest
+    # True from ingest until a match task has scored the job against every resume;
+    # jobs left pending (queue full, task failed) are resubmitted by the next fetch
+    match_pending = Column(Boolean, nullable=True, index=True)
     created_at = Column(DateTime, server_default=func.now())
 
+    def skills_list(self):
+        try:
+            return json.loads(self.skills)
+        except Exception:
+            return []
+
+    def embedding_vector(self):
+        """Return the stored embedding as a read-only float32 array, or None."""
+        return embedding_from_bytes(self.embedding)
+
+    def set_embedding(self, embedding):
+        self.embedding = embedding_to_bytes(embedding)
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -24,4 +42,5 @@ class Job(Base):
             "description": self.description,
             "posted_date": self.posted_date.isoformat() if self.posted_date else None,
             "apply_url": self.apply_url,
+            "skills": self.skills_list(),
         }
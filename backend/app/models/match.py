@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from ..core.database import Base
 import json
@@ -14,12 +14,23 @@ class Match(Base):
     missing_skills = Column(Text)  # JSON list
     created_at = Column(DateTime, server_default=func.now())
 
-    def missing_skills_list(self):
+    __table_args__ = (
+        # one row per (resume, job); re-matching upserts instead of appending
+        Index("uq_matches_resume_job", "resume_id", "job_id", unique=True),
+        # serves "top matches for a resume" ordered by score
+        Index("ix_matches_resume_score", "resume_id", "score"),
+    )
+
+    @staticmethod
+    def parse_missing_skills(value):
         try:
-            return json.loads(self.missing_skills)
+            return json.loads(value)
         except Exception:
             return []
 
+    def missing_skills_list(self):
+        return self.parse_missing_skills(self.missing_skills)
+
     def to_dict(self):
         return {
             "job_id": self.job_id,
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from ..core.database import Base
+
+class MatchTaskRecord(Base):
+    """Persisted status of a background MatchTask, so any API process can report it."""
+    __tablename__ = "match_tasks"
+    id = Column(String(32), primary_key=True)
+    kind = Column(String)  # jobs | resumes
+    status = Column(String, index=True)  # queued | running | done | partial | failed
+    jobs = Column(Integer)
+    attempts = Column(Integer)
+    resumes_total = Column(Integer)
+    resumes_done = Column(Integer)
+    resumes_failed = Column(Integer)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime)
+    finished_at = Column(DateTime, nullable=True, index=True)
+
+    def to_dict(self):
+        return {
+            "task_id": self.id,
+            "status": self.status,
+            "kind": self.kind,
+            "jobs": self.jobs,
+            "attempts": self.attempts,
+            "resumes_total": self.resumes_total,
+            "resumes_done": self.resumes_done,
+            "resumes_failed": self.resumes_failed,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Text, LargeBinary
 from sqlalchemy.sql import func
 from ..core.database import Base
+from ..core.vectors import embedding_to_bytes, embedding_from_bytes
 import json
 
 class Resume(Base):
@@ -8,7 +9,12 @@ class Resume(Base):
     id = Column(Integer, primary_key=True, index=True)
     text = Column(Text)
     skills = Column(Text)  # JSON list
-    embedding = Column(Text, nullable=True)
+    embedding = Column(LargeBinary, nullable=True)  # float32 bytes
+    # bumped whenever matches for this resume are written; NULL (pre-existing rows) reads as 0
+    match_version = Column(Integer, nullable=True, default=0)
+    # True from upload until a match task has scored the resume against the job corpus;
+    # resumes left pending (queue full, task failed) are resubmitted by the next job fetch
+    match_pending = Column(Boolean, nullable=True, index=True)
     created_at = Column(DateTime, server_default=func.now())
 
     def skills_list(self):
@@ -17,6 +23,13 @@ class Resume(Base):
         except Exception:
             return []
 
+    def embedding_vector(self):
+        """Return the stored embedding as a read-only float32 array, or None."""
+        return embedding_from_bytes(self.embedding)
+
+    def set_embedding(self, embedding):
+        self.embedding = embedding_to_bytes(embedding)
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -0,0 +1,127 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..core.config import EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_SIZE
+from ..core.metrics import EMBEDDING_CACHE
+from ..core.vectors import EMBEDDING_DTYPE, embedding_to_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache keyed by a hash of the model name and normalized text.
+
+    - memory: bounded LRU of up to max_items vectors
+    - disk: SQLite table at path (disabled when path is empty), survives restarts
+
+    Disk hits are promoted into the memory tier. Thread-safe.
+    """
+
+    def __init__(self, model_name: str, max_items: int = EMBEDDING_CACHE_SIZE, path: Optional[str] = EMBEDDING_CACHE_PATH):
+        self.model_name = model_name
+        self.max_items = max_items
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache (key BLOB PRIMARY KEY, embedding BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        return " ".join((text or "").split())
+
+    def key(self, text: str) -> bytes:
+        payload = self.model_name + "\0" + self.normalize_text(text)
+        return hashlib.sha256(payload.encode("utf-8")).digest()
+
+    def _remember(self, key: bytes, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """Return cached vectors for the keys that are present; counts hits and misses."""
+        found: Dict[bytes, np.ndarray] = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            if missing and self._conn is not None:
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = self._conn.execute(
+                        "SELECT key, embedding FROM embedding_cache WHERE key IN (%s)" % ",".join("?" * len(chunk)),
+                        chunk,
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=EMBEDDING_DTYPE)
+                        self._remember(key, vector)
+                        found[key] = vector
+                        self.disk_hits += 1
+            memory_hits = len(keys) - len(missing)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        if memory_hits:
+            EMBEDDING_CACHE.inc(memory_hits, result="memory_hit")
+        if len(found) > memory_hits:
+            EMBEDDING_CACHE.inc(len(found) - memory_hits, result="disk_hit")
+        if len(keys) > len(found):
+            EMBEDDING_CACHE.inc(len(keys) - len(found), result="miss")
+        return found
+
+    def put_many(self, items: Dict[bytes, np.ndarray]):
+        if not items:
+            return
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, np.asarray(vector, dtype=EMBEDDING_DTYPE))
+            if self._conn is not None:
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embedding_cache (key, embedding) VALUES (?, ?)",
+                        [(key, embedding_to_bytes(vector)) for key, vector in items.items()],
+                    )
+                    self._conn.commit()
+                except sqlite3.Error:
+                    # the disk tier is best-effort; the memory tier still holds the vectors
+                    logger.exception("Failed to persist embeddings to the cache")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "memory_items": len(self._memory),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embedding_cache")
+                self._conn.commit()
@@ -1,19 +1,131 @@
-from sentence_transformers import SentenceTransformer
+from typing import List
+from ..core.config import EMBEDDING_BACKEND, EMBEDDING_BATCH_SIZE, EMBEDDING_MODEL
+from ..core.metrics import stage
+from .embedding_cache import EmbeddingCache
+import logging
+import threading
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 class EmbeddingService:
+    """Process-wide embedding service.
+
+    The sentence-transformers model (and the torch import behind it) is loaded
+    lazily and thread-safely on first use, or ahead of time via warm_up().
+    With EMBEDDING_BACKEND=worker the model lives in a shared worker process
+    instead and only a thin client is created here.
+    """
+
     _instance = None
+    _instance_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.model = SentenceTransformer('all-MiniLM-L6-v2')
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._model = None
+                    instance._model_lock = threading.Lock()
+                    instance.model_state = "not_loaded"  # not_loaded | loading | ready | failed
+                    instance.cache = EmbeddingCache(EMBEDDING_MODEL)
+                    cls._instance = instance
         return cls._instance
 
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self.model_state = "loading"
+                    try:
+                        self._model = self._load_model()
+                    except Exception:
+                        self.model_state = "failed"
+                        logger.exception("Failed to load embedding model %s", EMBEDDING_MODEL)
+                        raise
+                    self.model_state = "ready"
+        return self._model
+
+    @staticmethod
+    def _load_model():
+        if EMBEDDING_BACKEND == "worker":
+            from .embedding_worker import WorkerEmbeddingModel
+            model = WorkerEmbeddingModel()
+            model.get_sentence_embedding_dimension()  # connect (starting the worker if needed)
+            return model
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(EMBEDDING_MODEL)
+
+    @model.setter
+    def model(self, model):
+        # lets callers (e.g. benchmarks) plug in another encoder with the same encode() API
+        with self._model_lock:
+            self._model = model
+            self.model_state = "ready"
+
+    def warm_up(self, background: bool = True):
+        """Load the model now, optionally on a daemon thread so startup is not blocked."""
+        def load():
+            try:
+                self.model
+            except Exception:
+                pass  # logged by the loader; requests will retry the load
+
+        if not background:
+            self.model
+            return None
+        t = threading.Thread(target=load, name="embedding-warmup", daemon=True)
+        t.start()
+        return t
+
     def generate_embedding(self, text: str) -> np.ndarray:
         """Generate embedding for the given text using sentence-transformers."""
-        return self.model.encode(text)
+        return self.generate_embeddings([text])[0]
+
+    def generate_embeddings(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+        """Embed many texts at once; returns a (len(texts), D) float32 matrix of unit vectors.
+
+        Texts are looked up in the embedding cache first; identical uncached texts
+        are encoded only once and fed to the model in batches of batch_size.
+        """
+        positions = {}
+        keys = []
+        inverse = np.empty(len(texts), dtype=np.intp)
+        for i, text in enumerate(texts):
+            key = self.cache.key(text)
+            if key not in positions:
+                positions[key] = len(keys)
+                keys.append((key, text))
+            inverse[i] = positions[key]
+        if not keys:
+            dim = self.model.get_sentence_embedding_dimension()
+            return np.zeros((0, dim), dtype=np.float32)
+
+        # "embed" covers cache lookups and writes; "embed_encode" the model calls for the misses
+        with stage("embed", items=len(texts)):
+            cached = self.cache.get_many([key for key, _ in keys])
+            todo = [(key, text) for key, text in keys if key not in cached]
+            if todo:
+                with stage("embed_encode", items=len(todo)):
+                    encoded = self.model.encode([text for _, text in todo], batch_size=batch_size, convert_to_numpy=True)
+                fresh = dict(zip([key for key, _ in todo], self.normalize(encoded)))
+                self.cache.put_many(fresh)
+                cached.update(fresh)
+            unique = np.vstack([cached[key] for key, _ in keys])
+        return unique[inverse]
 
     def cosine_similarity(self, emb1: np.ndarray, emb2: np.ndarray) -> float:
         """Compute cosine similarity between two embeddings."""
-        return np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2))
\ No newline at end of file
+        return np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2))
+
+    @staticmethod
+    def normalize(embeddings: np.ndarray) -> np.ndarray:
+        """Return float32 embeddings scaled to unit length along the last axis.
+
+        Zero vectors are left as zeros so their cosine similarity comes out as 0.
+        """
+        arr = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(arr, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return arr / norms
\ No newline at end of file
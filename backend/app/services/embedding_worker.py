@@ -0,0 +1,280 @@
+"""Dedicated embedding worker shared by all API processes.
+
+Run it with ``python -m app.services.embedding_worker`` (or let the API start it,
+see EMBEDDING_WORKER_AUTOSTART). It loads the model once and serves encode
+requests from every uvicorn worker over a unix socket that only its owner can
+open; clients refuse a socket owned by anyone else. Requests are JSON and embeddings come back as raw float32 bytes, so
+nothing is ever unpickled from a peer. Requests that arrive
+within EMBEDDING_BATCH_WINDOW_MS of each other are coalesced into one
+model.encode() call; when EMBEDDING_QUEUE_SIZE requests are already waiting,
+new ones are rejected so callers can back off instead of piling up.
+
+With EMBEDDING_BACKEND=worker, EmbeddingService uses WorkerEmbeddingModel as
+its model, so caching and deduplication still happen in the API process.
+"""
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from typing import List, Optional
+
+import numpy as np
+
+from ..core.config import (
+    EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_WINDOW_MS, EMBEDDING_MAX_BATCH, EMBEDDING_MODEL,
+    EMBEDDING_QUEUE_SIZE, EMBEDDING_WORKER_ADDRESS, EMBEDDING_WORKER_AUTOSTART, EMBEDDING_WORKER_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# largest JSON request the worker reads; longer messages drop the connection
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+class EmbeddingBackendBusy(Exception):
+    """The embedding worker's queue is full; retry later."""
+
+
+def _address(address: str) -> str:
+    # unix sockets only: file permissions decide who may connect
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        raise ValueError(f"EMBEDDING_WORKER_ADDRESS must be a unix socket path, not {address!r}")
+    return address
+
+
+def _check_owner(address: str):
+    # a socket planted by another user at our path would see every text we embed
+    owner = os.stat(address).st_uid
+    if owner != os.getuid():
+        raise PermissionError(f"embedding worker socket {address} is owned by uid {owner}, not {os.getuid()}")
+
+
+def _send(conn, header: dict, embeddings: Optional[np.ndarray] = None):
+    # a JSON header, followed by the raw little-endian float32 matrix when there is one
+    if embeddings is not None:
+        embeddings = np.ascontiguousarray(embeddings, dtype="<f4")
+        header = dict(header, shape=list(embeddings.shape))
+    conn.send_bytes(json.dumps(header).encode())
+    if embeddings is not None:
+        conn.send_bytes(embeddings.tobytes())
+
+
+def _recv_reply(conn) -> dict:
+    reply = json.loads(conn.recv_bytes())
+    if "shape" in reply:
+        embeddings = np.empty(reply.pop("shape"), dtype="<f4")
+        if conn.recv_bytes_into(embeddings.reshape(-1).view(np.uint8)) != embeddings.nbytes:
+            raise OSError("truncated embedding reply")
+        reply["embeddings"] = embeddings
+    return reply
+
+
+class _Request:
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[str] = None
+
+
+class EmbeddingServer:
+    """Serve micro-batched encode requests for one model."""
+
+    def __init__(self, model, address: str = EMBEDDING_WORKER_ADDRESS,
+                 window_ms: float = EMBEDDING_BATCH_WINDOW_MS, max_batch: int = EMBEDDING_MAX_BATCH,
+                 max_pending: int = EMBEDDING_QUEUE_SIZE):
+        self.model = model
+        self.address = _address(address)
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[_Request]" = queue.Queue(maxsize=max_pending)
+        self.batches = 0
+        self.rejected = 0
+
+    def _batch_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0].texts)
+            deadline = time.monotonic() + self.window
+            # coalesce whatever else arrives within the window
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    req = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(req)
+                size += len(req.texts)
+            texts = [t for req in batch for t in req.texts]
+            try:
+                encoded = np.asarray(
+                    self.model.encode(texts, batch_size=EMBEDDING_BATCH_SIZE, convert_to_numpy=True),
+                    dtype=np.float32,
+                )
+                start = 0
+                for req in batch:
+                    req.result = encoded[start:start + len(req.texts)]
+                    start += len(req.texts)
+            except Exception as e:
+                logger.exception("Embedding batch of %d texts failed", len(texts))
+                for req in batch:
+                    req.error = str(e)
+            self.batches += 1
+            for req in batch:
+                req.done.set()
+
+    def _serve_connection(self, conn):
+        try:
+            while True:
+                try:
+                    message = json.loads(conn.recv_bytes(MAX_REQUEST_BYTES))
+                except (EOFError, OSError, ValueError):
+                    return
+                op = message.get("op") if isinstance(message, dict) else None
+                if op == "dim":
+                    _send(conn, {"dim": self.model.get_sentence_embedding_dimension()})
+                    continue
+                texts = message.get("texts") if op == "encode" else None
+                if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                    _send(conn, {"error": f"bad request for op {op!r}"})
+                    continue
+                req = _Request(texts)
+                try:
+                    self._queue.put_nowait(req)
+                except queue.Full:
+                    self.rejected += 1
+                    _send(conn, {"busy": True})
+                    continue
+                req.done.wait()
+                if req.error is not None:
+                    _send(conn, {"error": req.error})
+                else:
+                    _send(conn, {}, req.result)
+        finally:
+            conn.close()
+
+    def serve_forever(self):
+        os.makedirs(os.path.dirname(self.address) or ".", mode=0o700, exist_ok=True)
+        if os.path.exists(self.address):
+            # a stale socket file from a previous run; refuse if someone still answers
+            _check_owner(self.address)
+            try:
+                Client(self.address, family="AF_UNIX").close()
+                raise RuntimeError(f"embedding worker already running at {self.address}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.address)
+        # bind with a private umask, so the socket is never reachable by other users
+        umask = os.umask(0o177)
+        try:
+            listener = Listener(self.address, family="AF_UNIX")
+        finally:
+            os.umask(umask)
+        threading.Thread(target=self._batch_loop, name="embedding-batcher", daemon=True).start()
+        logger.info("Embedding worker listening on %s", self.address)
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception:
+                # client went away before the connection was set up; keep serving
+                logger.exception("Rejected embedding worker connection")
+                continue
+            threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+
+class WorkerEmbeddingModel:
+    """Client for EmbeddingServer with the encode() API of a SentenceTransformer.
+
+    Keeps one connection per calling thread so concurrent requests reach the
+    worker concurrently and can be batched together there.
+    """
+
+    def __init__(self, address: str = EMBEDDING_WORKER_ADDRESS, timeout: float = EMBEDDING_WORKER_TIMEOUT,
+                 autostart: bool = EMBEDDING_WORKER_AUTOSTART):
+        self.address = _address(address)
+        self.timeout = timeout
+        self.autostart = autostart
+        self._local = threading.local()
+        self._start_lock = threading.Lock()
+        self._dim: Optional[int] = None
+
+    def _start_worker(self):
+        backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        # detached, so it keeps serving the other API processes if this one exits;
+        # when several processes race, all but one fail to bind and exit
+        subprocess.Popen(
+            [sys.executable, "-m", "app.services.embedding_worker"],
+            cwd=backend_dir, start_new_session=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+    def _open(self):
+        _check_owner(self.address)
+        return Client(self.address, family="AF_UNIX")
+
+    def _connect(self):
+        try:
+            return self._open()
+        except (ConnectionRefusedError, FileNotFoundError):
+            if not self.autostart:
+                raise
+        with self._start_lock:
+            self._start_worker()
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    return self._open()
+                except (ConnectionRefusedError, FileNotFoundError):
+                    if time.monotonic() > deadline:
+                        raise
+                    time.sleep(0.2)
+
+    def _call(self, message: dict) -> dict:
+        for attempt in range(2):
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = self._connect()
+            try:
+                _send(conn, message)
+                if not conn.poll(self.timeout):
+                    raise TimeoutError("embedding worker did not answer in time")
+                return _recv_reply(conn)
+            except (EOFError, OSError, TimeoutError):
+                # worker restarted or connection went stale; reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        raise RuntimeError("unreachable")
+
+    def encode(self, texts, batch_size: int = EMBEDDING_BATCH_SIZE, convert_to_numpy: bool = True):
+        single = isinstance(texts, str)
+        reply = self._call({"op": "encode", "texts": [texts] if single else list(texts)})
+        if reply.get("busy"):
+            raise EmbeddingBackendBusy("embedding worker queue is full")
+        if "error" in reply:
+            raise RuntimeError(f"embedding worker failed: {reply['error']}")
+        embeddings = reply["embeddings"]
+        return embeddings[0] if single else embeddings
+
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._dim is None:
+            self._dim = int(self._call({"op": "dim"})["dim"])
+        return self._dim
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    from sentence_transformers import SentenceTransformer
+    EmbeddingServer(SentenceTransformer(EMBEDDING_MODEL)).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import hashlib
+import json
+from typing import List
+
+from ..core.database import dialect_insert
+from ..models.fetch_watermark import FetchWatermark
+from .job_fetcher import FetchState
+
+
+def query_key(roles: List[str], companies: List[str], countries: List[str]) -> str:
+    """Stable key for a fetch query, independent of order and case."""
+    parts = [
+        ",".join(sorted(r.strip().lower() for r in roles)),
+        ",".join(sorted(c.strip().lower() for c in companies)),
+        ",".join(sorted(c.strip().lower() for c in countries)),
+    ]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class WatermarkStore:
+    """Load and save per-query FetchState rows in the fetch_watermarks table."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def load(self, key: str) -> FetchState:
+        row = self.db.query(FetchWatermark).filter(FetchWatermark.query_key == key).first()
+        if row is None:
+            return FetchState()
+        return FetchState(row.newest_created, row.seen_dict(), row.validators_dict(), row.incomplete_list())
+
+    def save(self, key: str, state: FetchState, commit: bool = True):
+        """Upsert the state for key.
+
+        With commit=False the write joins the caller's transaction, so the
+        watermark only advances together with the jobs it covers.
+        """
+        values = {
+            "newest_created": state.newest_created,
+            "seen_ids": json.dumps(state.seen),
+            "validators": json.dumps(state.validators),
+            "incomplete_countries": json.dumps(state.incomplete),
+        }
+        stmt = dialect_insert(self.db, FetchWatermark)
+        if stmt is not None:
+            # concurrent first fetches of the same query would both INSERT otherwise
+            stmt = stmt.values(query_key=key, **values)
+            self.db.execute(stmt.on_conflict_do_update(index_elements=["query_key"], set_=values))
+        else:
+            row = self.db.query(FetchWatermark).filter(FetchWatermark.query_key == key).first()
+            if row is None:
+                row = FetchWatermark(query_key=key)
+                self.db.add(row)
+            for name, value in values.items():
+                setattr(row, name, value)
+        if commit:
+            self.db.commit()
@@ -0,0 +1,419 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..core.config import (
+    EMBEDDING_MODEL, JOB_CORPUS_CHECK_INTERVAL, JOB_CORPUS_PATH, JOB_INDEX_LISTS, JOB_INDEX_MIN_ROWS,
+)
+from ..core.database import SessionLocal
+from ..core.vectors import quantize_int8
+from ..models.job import Job
+from .job_index import IVFIndex, assign_lists, train_centroids
+from .skill_extractor import POPCOUNT, get_skill_extractor
+
+try:
+    import fcntl  # serializes refreshes across worker processes
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# bumped when columns are added or change meaning; older snapshots are rebuilt
+CORPUS_FORMAT = 3
+
+# one raw little-endian file per column; rows are appended as jobs are committed
+_COLUMNS = {
+    "ids": "<i8",
+    "embeddings": "<f4",
+    "codes": "i1",  # int8 embeddings: embeddings ~= codes * scales
+    "scales": "<f4",
+    "posted": "<i8",  # datetime64[us]; NaT for unknown dates
+    "skills": "u1",
+    "unknown": "<i4",  # job skills outside the taxonomy
+    "company": "<i4",  # index into meta["companies"]
+}
+
+# rows sampled to train the IVF centroids, per list
+INDEX_SAMPLE_PER_LIST = 64
+
+
+class CorpusView:
+    """One immutable generation of the job corpus.
+
+    - ids: (N,) int64 job ids, ascending except for jobs committed after higher ids
+    - embeddings: (N, D) float32 unit vectors
+    - codes, scales: (N, D) int8 and (N,) float32 per-vector quantized embeddings,
+      a quarter of the size; scored first so only the best candidates touch the
+      float32 rows
+    - posted: (N,) datetime64[us] posted dates
+    - skill_masks: (N, B) uint8 packed skill bitmasks
+    - unknown: (N,) int32 count of skills outside the taxonomy
+    - company_codes: (N,) int32 index into companies (lowercased names)
+    - index: IVF index over the embeddings, or None while the corpus is too small
+      to need one (see JOB_INDEX_MIN_ROWS)
+    """
+
+    def __init__(self, ids: np.ndarray, embeddings: np.ndarray, codes: np.ndarray, scales: np.ndarray,
+                 posted: np.ndarray, skill_masks: np.ndarray, unknown: np.ndarray, company_codes: np.ndarray,
+                 companies: List[str], index: Optional[IVFIndex] = None):
+        self.ids = ids
+        self.embeddings = embeddings
+        self.codes = codes
+        self.scales = scales
+        self.posted = posted
+        self.skill_masks = skill_masks
+        self.unknown = unknown
+        self.company_codes = company_codes
+        self.companies = companies
+        self.index = index
+        self.skill_counts = POPCOUNT[skill_masks].sum(axis=1, dtype=np.int64)
+        self._company_index = {c: i for i, c in enumerate(companies)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def company_code(self, company: str) -> Optional[int]:
+        return self._company_index.get((company or "").strip().lower())
+
+    def batch(self, rows: Optional[np.ndarray] = None, exact: bool = True):
+        """JobBatch over all rows, or the given row indices, ready for Matcher.score_batch.
+
+        With exact=False the batch carries only the int8 codes (embeddings is None),
+        so cutting it from a filtered row set reads no float32 rows. A batch over
+        all rows carries the IVF index.
+        """
+        from .matcher import JobBatch, recency_from_posted
+
+        if rows is None:
+            return JobBatch(None, self.embeddings if exact else None, recency_from_posted(self.posted),
+                            self.skill_masks, job_ids=self.ids, skill_counts=self.skill_counts,
+                            codes=self.codes, scales=self.scales, unknown=self.unknown, index=self.index)
+        # gather the rows first, so nothing is computed over the whole corpus
+        return JobBatch(None, self.embeddings[rows] if exact else None, recency_from_posted(self.posted[rows]),
+                        self.skill_masks[rows], job_ids=self.ids[rows], skill_counts=self.skill_counts[rows],
+                        codes=self.codes[rows], scales=self.scales[rows], unknown=self.unknown[rows])
+
+
+class JobCorpus:
+    """Process-wide, read-only snapshot of every job's scoring inputs.
+
+    Columns live in append-only files under `path` and are memory-mapped, so
+    all uvicorn workers share the same page-cache pages and matching against
+    the whole corpus needs no DB reads. Once it holds index_min_rows jobs, an
+    IVF index is trained over the embeddings and retrained whenever the corpus
+    has doubled since; new rows join the nearest existing list in between.
+    refresh() appends jobs newer than the
+    last snapshotted id, plus any still match_pending job it has not got yet
+    (with concurrent ingests, a lower id can commit after a higher one); other
+    processes pick the new rows up when meta.json
+    changes (checked at most every JOB_CORPUS_CHECK_INTERVAL seconds). Readers
+    keep being served the previous snapshot while a refresh runs.
+    """
+
+    def __init__(self, path: str = JOB_CORPUS_PATH, check_interval: float = JOB_CORPUS_CHECK_INTERVAL,
+                 index_min_rows: int = JOB_INDEX_MIN_ROWS, index_lists: int = JOB_INDEX_LISTS):
+        self.path = path
+        self.check_interval = check_interval
+        self.index_min_rows = index_min_rows
+        self.index_lists = index_lists
+        self._lock = threading.Lock()  # guards swapping in a new view
+        self._refresh_lock = threading.Lock()
+        self._view = self._empty_view(0, get_skill_extractor().mask_bytes)
+        self._meta_mtime = None
+        self._checked = 0.0
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @staticmethod
+    def _empty_view(dim: int, mask_bytes: int) -> CorpusView:
+        return CorpusView(
+            np.zeros(0, dtype=np.int64), np.zeros((0, dim), dtype=np.float32),
+            np.zeros((0, dim), dtype=np.int8), np.zeros(0, dtype=np.float32),
+            np.zeros(0, dtype="datetime64[us]"), np.zeros((0, mask_bytes), dtype=np.uint8),
+            np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), [],
+        )
+
+    def _new_meta(self) -> Dict:
+        extractor = get_skill_extractor()
+        return {"format": CORPUS_FORMAT, "model": EMBEDDING_MODEL, "mask_bytes": extractor.mask_bytes,
+                "taxonomy": extractor.fingerprint, "dim": 0, "count": 0, "max_id": 0, "companies": [],
+                "index": None}
+
+    def _read_meta(self) -> Dict:
+        try:
+            with open(self._file("meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return self._new_meta()
+        fresh = self._new_meta()
+        if any(meta.get(key) != fresh[key] for key in ("format", "model", "mask_bytes", "taxonomy")):
+            # columns, embeddings or skill bit positions no longer line up; start over
+            logger.info("Job corpus at %s was built for another format, model or taxonomy; rebuilding", self.path)
+            return fresh
+        return meta
+
+    def _write_meta(self, meta: Dict):
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._file("meta.json"))
+
+    def _row_shape(self, name: str, meta: Dict):
+        if name in ("embeddings", "codes"):
+            return (meta["dim"],)
+        if name == "skills":
+            return (meta["mask_bytes"],)
+        return ()
+
+    def _map(self, meta: Dict) -> CorpusView:
+        count = meta["count"]
+        if count == 0:
+            return self._empty_view(meta["dim"], meta["mask_bytes"])
+        arrays = {
+            name: np.memmap(self._file(name), dtype=dtype, mode="r", shape=(count,) + self._row_shape(name, meta))
+            for name, dtype in _COLUMNS.items()
+        }
+        return CorpusView(arrays["ids"], arrays["embeddings"], arrays["codes"], arrays["scales"],
+                          arrays["posted"].view("datetime64[us]"), arrays["skills"], arrays["unknown"],
+                          arrays["company"], meta["companies"], self._map_index(meta))
+
+    # The IVF files are named by generation: a retrain writes new ones and only
+    # then meta.json, so a reader never pairs centroids with another
+    # generation's lists. Replaced generations are unlinked, which leaves them
+    # readable by processes that still have them mapped.
+    def _index_files(self, generation: int):
+        return self._file(f"centroids.{generation}"), self._file(f"lists.{generation}")
+
+    def _map_index(self, meta: Dict) -> Optional[IVFIndex]:
+        index = meta.get("index")
+        if not index:
+            return None
+        centroids, lists = self._index_files(index["generation"])
+        return IVFIndex(
+            np.memmap(centroids, dtype="<f4", mode="r", shape=(index["lists"], meta["dim"])),
+            np.memmap(lists, dtype="<i4", mode="r", shape=(meta["count"],)),
+        )
+
+    def _append_lists(self, meta: Dict, centroids: np.ndarray, embeddings: np.ndarray):
+        # new rows join their nearest existing list until the next retrain
+        with open(self._index_files(meta["index"]["generation"])[1], "ab") as f:
+            f.truncate(meta["count"] * 4)
+            f.write(assign_lists(embeddings, centroids).astype("<i4").tobytes())
+
+    def _train_index(self, meta: Dict) -> Optional[int]:
+        """Train a new IVF generation over every row; returns the generation it replaced, if any."""
+        count = meta["count"]
+        embeddings = np.memmap(self._file("embeddings"), dtype="<f4", mode="r", shape=(count, meta["dim"]))
+        n_lists = self.index_lists or int(np.sqrt(count))
+        rng = np.random.default_rng(count)
+        sample = np.sort(rng.choice(count, size=min(count, n_lists * INDEX_SAMPLE_PER_LIST), replace=False))
+        centroids = train_centroids(embeddings[sample], n_lists)
+        previous = meta.get("index")
+        generation = previous["generation"] + 1 if previous else 1
+        centroids_file, lists_file = self._index_files(generation)
+        centroids.astype("<f4").tofile(centroids_file)
+        assign_lists(embeddings, centroids).astype("<i4").tofile(lists_file)
+        meta["index"] = {"generation": generation, "lists": len(centroids), "trained": count}
+        logger.info("Job corpus: trained IVF index with %d lists over %d jobs", len(centroids), count)
+        return previous["generation"] if previous else None
+
+    def _load(self):
+        meta_path = self._file("meta.json")
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._meta_mtime:
+            return
+        meta = self._read_meta()
+        try:
+            view = self._map(meta)
+        except (OSError, ValueError):
+            # files shorter than meta claims (e.g. removed by hand); the next refresh rebuilds
+            logger.exception("Job corpus at %s is unreadable", self.path)
+            return
+        self._view = view
+        self._meta_mtime = mtime
+
+    def view(self) -> CorpusView:
+        """Current snapshot, re-mapped if another process refreshed it."""
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            with self._lock:
+                self._checked = now
+                self._load()
+        return self._view
+
+    def __len__(self):
+        return len(self.view())
+
+    @contextmanager
+    def _exclusive(self):
+        os.makedirs(self.path, exist_ok=True)
+        with self._refresh_lock, open(self._file(".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _append(self, meta: Dict, columns: Dict[str, np.ndarray]):
+        for name, dtype in _COLUMNS.items():
+            row_bytes = int(np.prod(self._row_shape(name, meta), dtype=np.int64)) * np.dtype(dtype).itemsize
+            with open(self._file(name), "ab") as f:
+                # drop any tail left by an append that died before meta.json was written
+                f.truncate(meta["count"] * row_bytes)
+                f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+
+    def _start_over(self):
+        # other processes may still have the old files mapped: truncating them in
+        # place would SIGBUS those readers, so swap in new empty files instead and
+        # leave the old inodes to live until they are unmapped. meta.json goes
+        # first so nobody maps the new files against the old row count.
+        try:
+            os.unlink(self._file("meta.json"))
+        except FileNotFoundError:
+            pass
+        for name in os.listdir(self.path):
+            if name.startswith(("centroids.", "lists.")):
+                os.unlink(self._file(name))
+        for name in _COLUMNS:
+            tmp = self._file(name + ".tmp")
+            open(tmp, "wb").close()
+            os.replace(tmp, self._file(name))
+
+    def _late_jobs(self, db, meta: Dict) -> List[Job]:
+        """Jobs at or below max_id that the corpus lacks: committed after a higher id was snapshotted.
+
+        Every job is stored match_pending, and its match task refreshes the corpus
+        before clearing the flag, so only pending jobs need checking.
+        """
+        if meta["count"] == 0:
+            return []
+        pending = np.array([job_id for (job_id,) in db.query(Job.id).filter(
+            Job.id <= meta["max_id"], Job.match_pending.is_(True)).order_by(Job.id)], dtype=np.int64)
+        if not len(pending):
+            return []
+        ids = np.memmap(self._file("ids"), dtype=_COLUMNS["ids"], mode="r", shape=(meta["count"],))
+        missing = pending[~np.isin(pending, ids)].tolist()
+        jobs = []
+        for start in range(0, len(missing), 500):
+            jobs += db.query(Job).filter(Job.id.in_(missing[start:start + 500])).order_by(Job.id).all()
+        return jobs
+
+    def refresh(self, db, batch_size: int = 1000) -> int:
+        """Append jobs stored since the last refresh. Returns the number of rows added.
+
+        Jobs still missing an embedding or skills get them generated (and saved) here.
+        """
+        from .matcher import Matcher
+
+        added = 0
+        with self._exclusive():
+            meta = self._read_meta()
+            if meta["count"] == 0 and any(os.path.exists(self._file(n)) and os.path.getsize(self._file(n))
+                                          for n in _COLUMNS):
+                self._start_over()
+            matcher = Matcher(db)
+            index = meta.get("index")
+            centroids = None
+            if index:
+                centroids = np.fromfile(self._index_files(index["generation"])[0], dtype="<f4").reshape(
+                    index["lists"], meta["dim"])
+            late = self._late_jobs(db, meta)
+            while True:
+                if late:
+                    jobs, late = late[:batch_size], late[batch_size:]
+                else:
+                    jobs = db.query(Job).filter(Job.id > meta["max_id"]).order_by(Job.id).limit(batch_size).all()
+                if not jobs:
+                    break
+                batch = matcher.prepare_jobs(jobs)
+                if meta["dim"] == 0:
+                    meta["dim"] = int(batch.embeddings.shape[1])
+                companies = {c: i for i, c in enumerate(meta["companies"])}
+                codes = np.empty(len(jobs), dtype=np.int32)
+                for i, job in enumerate(jobs):
+                    name = (job.company or "").strip().lower()
+                    if name not in companies:
+                        companies[name] = len(meta["companies"])
+                        meta["companies"].append(name)
+                    codes[i] = companies[name]
+                posted = np.array([j.posted_date if j.posted_date is not None else np.datetime64("NaT") for j in jobs],
+                                  dtype="datetime64[us]")
+                q_codes, q_scales = quantize_int8(batch.embeddings)
+                self._append(meta, {
+                    "ids": batch.job_ids,
+                    "embeddings": batch.embeddings,
+                    "codes": q_codes,
+                    "scales": q_scales,
+                    "posted": posted.view(np.int64),
+                    "skills": batch.skill_masks,
+                    "unknown": batch.unknown,
+                    "company": codes,
+                })
+                if centroids is not None:
+                    self._append_lists(meta, centroids, batch.embeddings)
+                meta["count"] += len(jobs)
+                meta["max_id"] = max(meta["max_id"], int(jobs[-1].id))
+                added += len(jobs)
+            index = meta.get("index")
+            retrain = meta["count"] >= self.index_min_rows and (not index or meta["count"] >= 2 * index["trained"])
+            replaced = self._train_index(meta) if retrain else None
+            if added or retrain or not os.path.exists(self._file("meta.json")):
+                self._write_meta(meta)
+            if replaced is not None:
+                for name in self._index_files(replaced):
+                    os.unlink(name)
+            with self._lock:
+                self._meta_mtime = None
+                self._load()
+        if added:
+            logger.info("Job corpus: added %d jobs (%d total)", added, meta["count"])
+        return added
+
+
+_job_corpus: Optional[JobCorpus] = None
+_job_corpus_lock = threading.Lock()
+
+
+def get_job_corpus() -> JobCorpus:
+    """Process-wide job corpus, mapped from disk; see refresh() and warm_up() for catching up."""
+    global _job_corpus
+    with _job_corpus_lock:
+        if _job_corpus is None:
+            corpus = JobCorpus()
+            corpus.view()
+            _job_corpus = corpus
+        return _job_corpus
+
+
+def warm_up(background: bool = True):
+    """Catch the corpus up with the jobs table, optionally on a daemon thread so startup is not blocked.
+
+    Until it finishes, requests are served from the snapshot already on disk.
+    """
+    def build():
+        db = SessionLocal()
+        try:
+            get_job_corpus().refresh(db)
+        except Exception:
+            logger.exception("Job corpus warm-up failed; the next match task retries the refresh")
+        finally:
+            db.close()
+
+    if not background:
+        build()
+        return None
+    t = threading.Thread(target=build, name="job-corpus-warmup", daemon=True)
+    t.start()
+    return t
@@ -1,33 +1,137 @@
 import os
 import requests
-from datetime import datetime, timedelta
-from typing import List, Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from ..core.config import (
+    ADZUNA_BASE_URL, ADZUNA_COUNTRIES, FETCH_MAX_PAGES, FETCH_RESULTS_PER_PAGE, FETCH_WORKERS,
+    FETCH_RATE_LIMIT, FETCH_MAX_RETRIES, FETCH_RETRY_BACKOFF, FETCH_TIMEOUT,
+)
+from ..core.metrics import FETCH_REQUESTS, record_stage
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
+RECENCY_DAYS = 5
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads (rate <= 0 disables)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class FetchState:
+    """Watermark for incremental fetching of one query.
+
+    - newest_created: newest posting date seen so far
+    - seen: external_id -> posting date (ISO) of postings already processed, or the
+      time they were first seen for postings without a date
+    - validators: page URL -> {"etag", "last_modified"} for conditional requests
+    - incomplete: countries where a page failed on the last fetch; the next fetch
+      pages through their whole recency window again instead of stopping at the
+      watermark, so the postings on the failed page are not lost
+
+    JobFetcher.fetch_jobs updates the state in place; persisting it between
+    fetches is up to the caller (see services/fetch_watermark.py).
+    """
+
+    def __init__(self, newest_created: Optional[datetime] = None, seen: Optional[Dict[str, str]] = None,
+                 validators: Optional[Dict[str, Dict[str, str]]] = None,
+                 incomplete: Optional[List[str]] = None):
+        self.newest_created = newest_created
+        self.seen = seen if seen is not None else {}
+        self.validators = validators if validators is not None else {}
+        self.incomplete = incomplete if incomplete is not None else []
+
+    def mark_seen(self, external_id: str, created: Optional[datetime]):
+        # undated postings age from when they were first seen, so prune() drops them too
+        self.seen[external_id] = (created or datetime.utcnow()).isoformat()
+        if created and (self.newest_created is None or created > self.newest_created):
+            self.newest_created = created
+
+    def prune(self, cutoff: datetime):
+        """Forget postings older than cutoff; the recency filter drops them anyway."""
+        cutoff_iso = cutoff.isoformat()
+        # "" is how undated postings used to be stored; they are dropped as well
+        self.seen = {k: v for k, v in self.seen.items() if v and v >= cutoff_iso}
+
+
 class JobFetcher:
     """Fetch jobs from Adzuna. Requires ADZUNA_APP_ID and ADZUNA_APP_KEY environment variables.
 
     If credentials are missing, falls back to a small mocked set of jobs to allow local testing.
 
+    Result pages for each configured country are fetched concurrently over a pooled
+    session with rate limiting and retry/backoff. Paging stops early once results
+    fall outside the recency window.
+
     Filtering and selection rules:
     - Only jobs posted within the last 5 days are kept
     - Title must contain one of the provided role keywords (case-insensitive)
     - Only the fields title, company, description, posted_date, apply_url are returned
     """
 
-    ADZUNA_URL = "https://api.adzuna.com/v1/api/jobs/us/search/1"
+    def __init__(self, countries: Optional[List[str]] = None, base_url: str = ADZUNA_BASE_URL,
+                 max_pages: int = FETCH_MAX_PAGES, results_per_page: int = FETCH_RESULTS_PER_PAGE,
+                 max_workers: int = FETCH_WORKERS, rate_limit: float = FETCH_RATE_LIMIT,
+                 max_retries: int = FETCH_MAX_RETRIES, backoff: float = FETCH_RETRY_BACKOFF,
+                 timeout: float = FETCH_TIMEOUT, app_id: Optional[str] = None, app_key: Optional[str] = None):
+        self.app_id = app_id or os.getenv("ADZUNA_APP_ID")
+        self.app_key = app_key or os.getenv("ADZUNA_APP_KEY")
+        self.countries = countries or ADZUNA_COUNTRIES
+        self.base_url = base_url.rstrip("/")
+        self.max_pages = max_pages
+        self.results_per_page = results_per_page
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.session = self._build_session(max_retries, backoff, max_workers)
 
-    def __init__(self):
-        self.app_id = os.getenv("ADZUNA_APP_ID")
-        self.app_key = os.getenv("ADZUNA_APP_KEY")
+    @staticmethod
+    def _build_session(max_retries: int, backoff: float, pool_size: int) -> requests.Session:
+        """Pooled session; transient errors (429/5xx, connection resets) retry with exponential backoff."""
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def page_url(self, country: str, page: int) -> str:
+        return f"{self.base_url}/{country}/search/{page}"
 
     def _parse_posted_date(self, date_str: str):
         try:
-            # Try ISO format first
-            return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+            # Try ISO format first; compare everything as naive UTC like datetime.utcnow()
+            parsed = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+            return parsed
         except Exception:
             try:
                 # Fallback: parse common formats
@@ -35,16 +139,21 @@ class JobFetcher:
             except Exception:
                 return None
 
-    def _filter_job(self, job: Dict, roles: List[str]) -> bool:
-        # recency filter
-        created = None
-        if job.get("created"):
-            created = self._parse_posted_date(job.get("created"))
-        elif job.get("created_at"):
-            created = self._parse_posted_date(job.get("created_at"))
+    def _created(self, job: Dict) -> Optional[datetime]:
+        created = job.get("created") or job.get("created_at")
+        return self._parse_posted_date(created) if created else None
+
+    @staticmethod
+    def _external_id(job: Dict) -> str:
+        return str(job.get("id") or job.get("redirect_url") or "")
+
+    def _filter_job(self, job: Dict, roles: List[str], created: Optional[datetime] = None) -> bool:
+        # recency filter; callers that already parsed the date pass it in
+        if created is None:
+            created = self._created(job)
 
         if created:
-            if datetime.utcnow() - created > timedelta(days=5):
+            if datetime.utcnow() - created > timedelta(days=RECENCY_DAYS):
                 return False
         # title filter
         title = (job.get("title") or "").lower()
@@ -53,15 +162,13 @@ class JobFetcher:
                 return True
         return False
 
-    def _normalize(self, job: Dict) -> Dict:
-        created = job.get("created") or job.get("created_at")
-        posted_date = None
-        if created:
-            parsed = self._parse_posted_date(created)
-            posted_date = parsed.isoformat() if parsed else None
+    def _normalize(self, job: Dict, created: Optional[datetime] = None) -> Dict:
+        if created is None:
+            created = self._created(job)
+        posted_date = created.isoformat() if created else None
 
         return {
-            "external_id": str(job.get("id") or job.get("redirect_url") or ""),
+            "external_id": self._external_id(job),
             "title": job.get("title"),
             "company": job.get("company" , {}).get("display_name") if isinstance(job.get("company"), dict) else job.get("company"),
             "description": job.get("description"),
@@ -69,10 +176,42 @@ class JobFetcher:
             "apply_url": job.get("redirect_url") or job.get("url") or job.get("apply_url")
         }
 
-    def fetch_jobs(self, roles: List[str], companies: List[str]) -> List[Dict]:
+    def _select(self, results: List[Dict], roles: List[str], companies: List[str],
+                state: Optional[FetchState]) -> List[Dict]:
+        """Filter and normalize raw results, skipping postings the state has already seen."""
+        jobs = []
+        seen = set()
+        for r in results:
+            ext = self._external_id(r)
+            # the same posting can come back on several pages/countries or an earlier fetch
+            if ext in seen or (state is not None and ext in state.seen):
+                continue
+            seen.add(ext)
+            created = self._created(r)
+            if state is not None:
+                state.mark_seen(ext, created)
+            if not self._filter_job(r, roles, created):
+                continue
+            norm = self._normalize(r, created)
+            # If companies are given, ensure company matches
+            if companies:
+                comp = (norm.get("company") or "").lower()
+                if not any(c.lower() in comp for c in companies):
+                    continue
+            jobs.append(norm)
+        if state is not None:
+            state.prune(datetime.utcnow() - timedelta(days=RECENCY_DAYS))
+        return jobs
+
+    def fetch_jobs(self, roles: List[str], companies: List[str], state: Optional[FetchState] = None) -> List[Dict]:
         """Return a list of normalized jobs that match criteria.
 
         If Adzuna credentials are missing or an error occurs, return a small mocked dataset.
+
+        With a FetchState only the delta is returned: postings it has already seen are
+        skipped before normalization, and paging stops at the previous watermark.
+        Countries where a page fails are left in state.incomplete, and the
+        watermark does not advance past the postings that page may have held.
         """
         if not self.app_id or not self.app_key:
             logger.warning("ADZUNA credentials not set - using mocked jobs for local testing")
@@ -96,13 +235,15 @@ class JobFetcher:
                     "redirect_url": "https://example.com/apply/2"
                 }
             ]
-            filtered = [self._normalize(j) for j in mocked if self._filter_job(j, roles)]
-            return filtered
+            return self._select(mocked, roles, [], state)
 
         params = {
             "app_id": self.app_id,
             "app_key": self.app_key,
-            "results_per_page": 50
+            "results_per_page": self.results_per_page,
+            # newest first, so paging can stop at the end of the recency window
+            "sort_by": "date",
+            "max_days_old": RECENCY_DAYS,
         }
 
         # Build query - include roles; company handled client-side when needed
@@ -112,24 +253,134 @@ class JobFetcher:
         if companies:
             params["company"] = ",".join(companies)
 
+        newest_created = state.newest_created if state is not None else None
+        results = self._fetch_all_pages(params, state)
+        jobs = self._select(results, roles, companies, state)
+        if state is not None and state.incomplete:
+            # postings newer than the old watermark may sit on the failed pages
+            state.newest_created = newest_created
+        return jobs
+
+    def _fetch_page(self, country: str, page: int, params: Dict,
+                    validators: Optional[Dict[str, str]] = None) -> Tuple[List[Dict], Dict[str, str], bool]:
+        """GET one result page; returns (results, response validators, not_modified)."""
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        self.rate_limiter.wait()
+        start = time.perf_counter()
         try:
-            resp = requests.get(self.ADZUNA_URL, params=params, timeout=10)
+            resp = self.session.get(self.page_url(country, page), params=params, headers=headers, timeout=self.timeout)
             resp.raise_for_status()
-            data = resp.json()
-            results = data.get("results", [])
-            # Filter and normalize
-            jobs = []
-            for r in results:
-                if not self._filter_job(r, roles):
-                    continue
-                norm = self._normalize(r)
-                # If companies are given, ensure company matches
-                if companies:
-                    comp = (norm.get("company") or "").lower()
-                    if not any(c.lower() in comp for c in companies):
+        except requests.RequestException:
+            FETCH_REQUESTS.inc(result="error")
+            raise
+        finally:
+            record_stage("fetch_page", time.perf_counter() - start)
+        if resp.status_code == 304:
+            FETCH_REQUESTS.inc(result="not_modified")
+            return [], validators or {}, True
+        FETCH_REQUESTS.inc(result="ok")
+        fresh = {}
+        if resp.headers.get("ETag"):
+            fresh["etag"] = resp.headers["ETag"]
+        if resp.headers.get("Last-Modified"):
+            fresh["last_modified"] = resp.headers["Last-Modified"]
+        return resp.json().get("results", []), fresh, False
+
+    def _page_exhausts_window(self, results: List[Dict], state: Optional[FetchState] = None) -> bool:
+        """True when this page is the last one worth requesting.
+
+        That is the case for a short page or, results being sorted newest first,
+        when the oldest posting on it is already outside the recency window or
+        older than the state's watermark, or every posting on it was already seen.
+        Pass state=None for a country catching up after a failed page: only the
+        recency window counts then.
+        """
+        if len(results) < self.results_per_page:
+            return True
+        if state is not None and all(self._external_id(r) in state.seen for r in results):
+            return True
+        cutoff = datetime.utcnow() - timedelta(days=RECENCY_DAYS)
+        if state is not None and state.newest_created is not None:
+            cutoff = max(cutoff, state.newest_created)
+        for r in reversed(results):
+            parsed = self._created(r)
+            if parsed is not None:
+                return parsed < cutoff
+        return False
+
+    def _fetch_all_pages(self, params: Dict, state: Optional[FetchState] = None) -> List[Dict]:
+        """Fetch pages for every country concurrently, in waves of max_workers pages.
+
+        A country stops paging after a page that exhausts the recency window (or the
+        state's watermark), is unchanged since the last fetch (HTTP 304) or fails.
+        Results come back ordered by country and page; a failed page leaves a gap,
+        but the pages fetched around it in the same wave are still returned. The
+        countries with a failed page are recorded in state.incomplete; on the next
+        fetch those are paged without the watermark or conditional requests.
+        """
+        pages: Dict[Tuple[str, int], List[Dict]] = {}
+        next_page = {c: 1 for c in self.countries}
+        done = set()
+        failed: Dict[str, List[int]] = {}
+        catching_up = set(state.incomplete) if state is not None else set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while len(done) < len(self.countries):
+                # round-robin over countries so one country's speculative pages don't starve the rest
+                wave = []
+                while len(wave) < self.max_workers:
+                    active = [c for c in self.countries if c not in done and next_page[c] <= self.max_pages]
+                    if not active:
+                        break
+                    for country in active[:self.max_workers - len(wave)]:
+                        wave.append((country, next_page[country]))
+                        next_page[country] += 1
+                if not wave:
+                    break
+                validators = state.validators if state is not None else {}
+                futures = {
+                    key: pool.submit(self._fetch_page, key[0], key[1], params,
+                                     None if key[0] in catching_up else validators.get(self.page_url(*key)))
+                    for key in wave
+                }
+                for (country, page), future in futures.items():
+                    try:
+                        results, fresh, not_modified = future.result()
+                    except Exception as e:
+                        logger.exception("Failed to fetch %s page %d from Adzuna: %s", country, page, e)
+                        failed.setdefault(country, []).append(page)
+                        done.add(country)
                         continue
-                jobs.append(norm)
-            return jobs
-        except Exception as e:
-            logger.exception("Failed to fetch from Adzuna, returning empty list: %s", e)
-            return []
+                    if state is not None and fresh:
+                        state.validators[self.page_url(country, page)] = fresh
+                    pages[(country, page)] = results
+                    if not_modified or self._page_exhausts_window(results, None if country in catching_up else state):
+                        done.add(country)
+        ordered = []
+        for country in self.countries:
+            fetched = sorted(page for c, page in pages if c == country)
+            for page in fetched:
+                ordered.extend(pages[(country, page)])
+            if country in failed:
+                logger.warning("Partial Adzuna results for %s: page(s) %s failed, returning pages %s",
+                               country, sorted(failed[country]), fetched)
+        if state is not None:
+            state.incomplete = [c for c in self.countries if c in failed]
+        return ordered
+
+
+_job_fetcher: Optional[JobFetcher] = None
+_job_fetcher_lock = threading.Lock()
+
+
+def get_job_fetcher() -> JobFetcher:
+    """Process-wide fetcher, so requests share one pooled session and one rate limit."""
+    global _job_fetcher
+    with _job_fetcher_lock:
+        if _job_fetcher is None:
+            _job_fetcher = JobFetcher()
+        return _job_fetcher
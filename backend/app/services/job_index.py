@@ -0,0 +1,74 @@
+"""Inverted-file (IVF) index over the job corpus embeddings.
+
+k-means splits the corpus into lists of nearby jobs; a query only scans the
+rows in the lists of its nprobe nearest centroids, so shortlisting reads a
+few percent of the corpus instead of every row. JobCorpus trains the index
+and stores the centroids and each row's list next to its other columns
+(see services/job_corpus.py); Matcher scores only the probed rows.
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# rows per matrix product when assigning, so the (rows, lists) scores stay small
+ASSIGN_CHUNK = 16384
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the nearest (highest cosine) centroid for every row, as int32."""
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_CHUNK):
+        block = np.asarray(vectors[start:start + ASSIGN_CHUNK], dtype=np.float32)
+        out[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+def train_centroids(sample: np.ndarray, n_lists: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means over unit vectors; returns (n_lists, D) float32 unit centroids."""
+    sample = np.asarray(sample, dtype=np.float32)
+    n_lists = max(1, min(n_lists, len(sample)))
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = assign_lists(sample, centroids)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=n_lists)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        filled = counts > 0
+        sums = np.add.reduceat(sample[order], starts[filled], axis=0)
+        # a list that lost all its members keeps its previous centroid
+        centroids[filled] = _normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """Centroids plus the list of every corpus row; probe() returns candidate rows per query."""
+
+    def __init__(self, centroids: np.ndarray, lists: np.ndarray):
+        self.centroids = centroids
+        self.lists = lists  # (N,) int32 list of each corpus row
+        self._inverted: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def __len__(self):
+        return len(self.centroids)
+
+    def _inverted_lists(self) -> Tuple[np.ndarray, np.ndarray]:
+        # rows grouped by list, and where each list starts; built once per snapshot
+        if self._inverted is None:
+            order = np.argsort(self.lists, kind="stable")
+            bounds = np.searchsorted(self.lists[order], np.arange(len(self.centroids) + 1))
+            self._inverted = (order, bounds)
+        return self._inverted
+
+    def probe(self, queries: np.ndarray, nprobe: int) -> List[np.ndarray]:
+        """Ascending row indices in each query's nprobe nearest lists."""
+        nprobe = max(1, min(nprobe, len(self.centroids)))
+        sims = np.atleast_2d(queries) @ self.centroids.T
+        nearest = np.argpartition(-sims, nprobe - 1, axis=1)[:, :nprobe]
+        order, bounds = self._inverted_lists()
+        return [np.sort(np.concatenate([order[bounds[c]:bounds[c + 1]] for c in row])) for row in nearest]
@@ -0,0 +1,112 @@
+import json
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import insert
+
+from ..core.database import dialect_insert
+from ..models.job import Job
+from .skill_extractor import get_skill_extractor
+
+# keep IN lists well under SQLite's bound-parameter limit
+IN_CHUNK = 500
+
+
+class IngestResult:
+    """Outcome of a bulk ingest.
+
+    - job_ids: stored job id for every ingested job, in input order (duplicates collapsed)
+    - new_ids: ids of the rows inserted by this ingest
+    """
+
+    def __init__(self, job_ids: List[int], new_ids: List[int]):
+        self.job_ids = job_ids
+        self.new_ids = new_ids
+
+
+class JobIngestor:
+    """Store normalized jobs (as returned by JobFetcher) in bulk.
+
+    Existing rows are resolved with one IN query per chunk of external_ids and new
+    rows are written with a single multi-row INSERT ... ON CONFLICT DO NOTHING in one
+    transaction, instead of a SELECT + commit + refresh per job.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def _row(j: Dict) -> Dict:
+        return {
+            "external_id": j.get("external_id") or None,
+            "title": j.get("title"),
+            "company": j.get("company"),
+            "description": j.get("description"),
+            "posted_date": datetime.fromisoformat(j.get("posted_date")) if j.get("posted_date") else None,
+            "apply_url": j.get("apply_url"),
+            # extracted once here so matching never rescans the description
+            "skills": json.dumps(get_skill_extractor().extract(j.get("description") or "")),
+            "match_pending": True,
+        }
+
+    def _existing_ids(self, external_ids: List[str]) -> Dict[str, int]:
+        found = {}
+        for start in range(0, len(external_ids), IN_CHUNK):
+            chunk = external_ids[start:start + IN_CHUNK]
+            rows = self.db.query(Job.external_id, Job.id).filter(Job.external_id.in_(chunk)).all()
+            found.update({ext: job_id for ext, job_id in rows})
+        return found
+
+    def ingest(self, jobs: List[Dict], commit: bool = True) -> IngestResult:
+        """Store the jobs; with commit=False the inserts are left for the caller to commit."""
+        rows = []
+        seen = set()
+        for j in jobs:
+            ext = j.get("external_id") or None
+            if ext is not None:
+                if ext in seen:
+                    continue
+                seen.add(ext)
+            rows.append({"external_id": ext, "job": j})
+
+        existing = self._existing_ids([r["external_id"] for r in rows if r["external_id"] is not None])
+        to_insert = [
+            self._row(r["job"]) for r in rows if r["external_id"] is None or r["external_id"] not in existing
+        ]
+
+        new_ids: List[int] = []
+        inserted: Dict[str, int] = {}
+        anonymous: List[int] = []
+        if to_insert:
+            stmt = dialect_insert(self.db, Job)
+            if stmt is not None:
+                # a concurrent fetch may have stored the same posting since the lookup
+                stmt = stmt.on_conflict_do_nothing(index_elements=["external_id"])
+            else:
+                stmt = insert(Job)
+            result = self.db.execute(stmt.returning(Job.id, Job.external_id, sort_by_parameter_order=True), to_insert)
+            for job_id, ext in result:
+                new_ids.append(job_id)
+                if ext is None:
+                    anonymous.append(job_id)
+                else:
+                    inserted[ext] = job_id
+            if commit:
+                self.db.commit()
+
+        # rows that lost an insert race were stored by someone else; look them up once
+        lost = [r["external_id"] for r in to_insert if r["external_id"] is not None and r["external_id"] not in inserted]
+        if lost:
+            existing.update(self._existing_ids(lost))
+
+        job_ids = []
+        anonymous_iter = iter(anonymous)
+        for r in rows:
+            ext = r["external_id"]
+            if ext is None:
+                job_ids.append(next(anonymous_iter))
+            elif ext in inserted:
+                job_ids.append(inserted[ext])
+            elif ext in existing:
+                job_ids.append(existing[ext])
+        return IngestResult(job_ids, new_ids)
@@ -0,0 +1,296 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from ..core.config import (
+    MATCH_MAX_RETRIES, MATCH_QUEUE_SIZE, MATCH_RETRY_BACKOFF, MATCH_TASK_TTL, MATCH_WORKERS,
+)
+from ..core.database import SessionLocal
+from ..core.metrics import stage
+from ..models.job import Job
+from ..models.match_task import MatchTaskRecord
+from ..models.resume import Resume
+
+logger = logging.getLogger(__name__)
+
+# finished tasks kept in memory for status polling; older ones are read from the match_tasks table
+MAX_FINISHED_TASKS = 1000
+FINISHED = ("done", "partial", "failed")
+
+
+class QueueFull(Exception):
+    """Raised when the match queue has no room for another task."""
+
+
+class MatchTask:
+    """A request to match newly stored jobs against every resume, or new resumes against the job corpus."""
+
+    def __init__(self, job_ids: List[int], resume_ids: Optional[List[int]] = None):
+        self.id = uuid.uuid4().hex
+        self.job_ids = list(job_ids)
+        self.resume_ids = list(resume_ids) if resume_ids is not None else None
+        # queued | running | done | partial (some resumes failed) | failed (all did, or prepare failed)
+        self.status = "queued"
+        self.attempts = 0
+        self.resumes_total = 0
+        self.resumes_done = 0
+        self.resumes_failed = 0
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def kind(self) -> str:
+        return "resumes" if self.resume_ids is not None else "jobs"
+
+    def record(self) -> Dict:
+        """Column values for the task's match_tasks row."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "jobs": len(self.job_ids),
+            "attempts": self.attempts,
+            "resumes_total": self.resumes_total,
+            "resumes_done": self.resumes_done,
+            "resumes_failed": self.resumes_failed,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    def to_dict(self) -> Dict:
+        return MatchTaskRecord(**self.record()).to_dict()
+
+
+class MatchQueue:
+    """Bounded queue of MatchTasks served by a pool of background worker threads.
+
+    A job task embeds its (new) jobs, then scores them against the cached
+    resume matrix in chunks; a resume task scores new resumes against the
+    job corpus and keeps each one's best matches. Each chunk is retried with
+    exponential backoff before its resumes are counted as failed; errors are
+    logged and reported on the task rather than silently dropped.
+
+    Task status is also written to the match_tasks table as it changes, so a
+    task can be polled from any API process, not just the one running it.
+    """
+
+    def __init__(self, workers: int = MATCH_WORKERS, max_pending: int = MATCH_QUEUE_SIZE,
+                 max_retries: int = MATCH_MAX_RETRIES, backoff: float = MATCH_RETRY_BACKOFF):
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._queue: "queue.Queue[MatchTask]" = queue.Queue(maxsize=max_pending)
+        self._tasks: "OrderedDict[str, MatchTask]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def _start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"match-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, job_ids: List[int], resume_ids: Optional[List[int]] = None) -> MatchTask:
+        task = MatchTask(job_ids, resume_ids)
+        with self._lock:
+            self._enqueue(task)
+        return task
+
+    def submit_unclaimed(self, job_ids: List[int], resume_ids: Optional[List[int]] = None) -> Optional[MatchTask]:
+        """Submit a job task (or, with resume_ids, a resume task) for the ids no queued or running task covers.
+
+        Returns None when every id is already claimed; raises QueueFull like submit().
+        """
+        with self._lock:
+            claimed = set()
+            for t in self._tasks.values():
+                if t.status not in ("queued", "running"):
+                    continue
+                if resume_ids is None and t.resume_ids is None:
+                    claimed.update(t.job_ids)
+                elif resume_ids is not None and t.resume_ids is not None:
+                    claimed.update(t.resume_ids)
+            if resume_ids is None:
+                job_ids = [i for i in job_ids if i not in claimed]
+            else:
+                resume_ids = [i for i in resume_ids if i not in claimed]
+            if not (job_ids if resume_ids is None else resume_ids):
+                return None
+            task = MatchTask(job_ids, resume_ids)
+            self._enqueue(task)
+        return task
+
+    def _enqueue(self, task: MatchTask):
+        # called with self._lock held; the row is written before a worker can update it
+        self._start()
+        if self._queue.full():
+            raise QueueFull("match queue is full")
+        self._persist(task)
+        self._queue.put_nowait(task)
+        self._tasks[task.id] = task
+        self._trim()
+
+    def get(self, task_id: str) -> Optional[MatchTask]:
+        with self._lock:
+            return self._tasks.get(task_id)
+
+    def status(self, task_id: str) -> Optional[Dict]:
+        """Status of a task submitted by this or any other process, or None if unknown (or expired)."""
+        task = self.get(task_id)
+        if task is not None:
+            return task.to_dict()
+        db = SessionLocal()
+        try:
+            row = db.get(MatchTaskRecord, task_id)
+            return row.to_dict() if row is not None else None
+        finally:
+            db.close()
+
+    def _persist(self, task: MatchTask):
+        """Write the task's current status to match_tasks; failures are logged, not raised."""
+        db = SessionLocal()
+        try:
+            db.merge(MatchTaskRecord(**task.record()))
+            if task.status in FINISHED:
+                cutoff = datetime.utcnow() - timedelta(seconds=MATCH_TASK_TTL)
+                db.query(MatchTaskRecord).filter(MatchTaskRecord.finished_at < cutoff).delete(
+                    synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Could not save status of match task %s", task.id)
+        finally:
+            db.close()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _trim(self):
+        finished = [tid for tid, t in self._tasks.items() if t.status in FINISHED]
+        for tid in finished[:max(0, len(finished) - MAX_FINISHED_TASKS)]:
+            del self._tasks[tid]
+
+    def _worker(self):
+        while True:
+            task = self._queue.get()
+            try:
+                self._run(task)
+            except Exception:
+                logger.exception("Unexpected error in match task %s", task.id)
+                task.status = "failed"
+                self._persist(task)
+            finally:
+                self._queue.task_done()
+
+    def _retry(self, fn, *args):
+        """Call fn, retrying with exponential backoff; re-raises the last error."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return fn(*args)
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt))
+
+    def _run(self, task: MatchTask):
+        from .job_corpus import get_job_corpus
+        from .matcher import Matcher
+        from .resume_matrix import get_resume_matrix
+
+        task.status = "running"
+        self._persist(task)
+        # embed_jobs commits; keep the loaded jobs instead of reloading each one in prepare_jobs
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            matcher = Matcher(db)
+
+            def prepare():
+                task.attempts += 1
+                try:
+                    jobs = db.query(Job).filter(Job.id.in_(task.job_ids)).all() if task.job_ids else []
+                    # embed all new jobs in one batched call, then stack them once for every resume
+                    matcher.embed_jobs([job for job in jobs if job.embedding is None])
+                    corpus = get_job_corpus()
+                    corpus.refresh(db)
+                    # the corpus is refreshed before the resumes are read, so a resume stored
+                    # meanwhile is covered either here or by its own resume task
+                    resumes = get_resume_matrix(db).current()
+                    if task.resume_ids is not None:
+                        return corpus.view().batch(), resumes.select(task.resume_ids)
+                    return matcher.prepare_jobs(jobs), resumes
+                except Exception:
+                    db.rollback()
+                    raise
+
+            try:
+                with stage("match_prepare", items=len(task.job_ids)):
+                    batch, resumes = self._retry(prepare)
+            except Exception as e:
+                logger.exception("Match task %s failed to prepare", task.id)
+                task.status = "failed"
+                task.error = str(e)
+                return
+
+            task.resumes_total = len(resumes)
+            step = matcher._chunk_rows(len(batch), batch.skill_masks.shape[1]) if len(batch) else max(1, len(resumes))
+
+            def match_chunk(chunk):
+                try:
+                    if task.resume_ids is not None:
+                        matcher.match_resumes_with_corpus(batch, chunk)
+                    else:
+                        matcher.match_jobs_with_resumes(batch, chunk)
+                except Exception:
+                    db.rollback()
+                    raise
+
+            for start in range(0, len(resumes), step):
+                chunk = resumes.rows(start, start + step)
+                try:
+                    with stage("match_chunk", items=len(chunk) * len(batch)):
+                        self._retry(match_chunk, chunk)
+                except Exception as e:
+                    logger.exception("Match task %s: resumes %s-%s failed after retries",
+                                     task.id, chunk.ids[0], chunk.ids[-1])
+                    task.resumes_failed += len(chunk)
+                    task.error = f"resumes {chunk.ids[0]}-{chunk.ids[-1]}: {e}"
+                task.resumes_done += len(chunk)
+                self._persist(task)
+            if not task.resumes_failed:
+                # fully matched; failed chunks leave the jobs or resumes pending for the next fetch
+                model, ids = (Job, task.job_ids) if task.resume_ids is None else (Resume, task.resume_ids)
+                for start in range(0, len(ids), 500):
+                    db.query(model).filter(model.id.in_(ids[start:start + 500])).update(
+                        {model.match_pending: None}, synchronize_session=False)
+                db.commit()
+                task.status = "done"
+            elif task.resumes_failed < task.resumes_total:
+                task.status = "partial"
+            else:
+                task.status = "failed"
+        finally:
+            task.finished_at = datetime.utcnow()
+            db.close()
+            if task.status in FINISHED:
+                self._persist(task)
+
+
+_match_queue: Optional[MatchQueue] = None
+_match_queue_lock = threading.Lock()
+
+
+def get_match_queue() -> MatchQueue:
+    global _match_queue
+    with _match_queue_lock:
+        if _match_queue is None:
+            _match_queue = MatchQueue()
+        return _match_queue
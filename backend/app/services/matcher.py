@@ -1,20 +1,107 @@
 from .embedding_service import EmbeddingService
-from typing import List, Dict
-from ..core.database import SessionLocal, init_db
+from .skill_extractor import POPCOUNT, get_skill_extractor
+from typing import List, Dict, Optional
+from ..core.config import (
+    JOB_CORPUS_QUANTIZED, JOB_CORPUS_RESCORE_FACTOR, JOB_CORPUS_RESCORE_MIN, JOB_INDEX_NPROBE, MATCH_KEEP_PER_RESUME,
+)
+from ..core.database import SessionLocal, dialect_insert
+from ..core.metrics import stage
 from ..models.job import Job
 from ..models.match import Match
 from ..models.resume import Resume
+from .resume_matrix import ResumeSet
+from sqlalchemy import func, select, tuple_
 import numpy as np
 import json
 from datetime import datetime
 
-# Ensure tables exist
-init_db()
+SEMANTIC_WEIGHT = 0.65
+SKILL_WEIGHT = 0.25
+RECENCY_WEIGHT = 0.1
+RECENCY_WINDOW_DAYS = 5
+
+
+def recency_from_posted(posted: np.ndarray) -> np.ndarray:
+    """Recency bonus for a datetime64 array of posted dates; NaT scores 0."""
+    posted = np.asarray(posted, dtype="datetime64[us]")
+    now = np.datetime64(datetime.utcnow(), "us")
+    days_old = np.floor((now - posted) / np.timedelta64(1, "D"))
+    days_old = np.clip(days_old, 0, None)
+    bonus = 1 - days_old / float(RECENCY_WINDOW_DAYS)
+    bonus[(days_old >= RECENCY_WINDOW_DAYS) | np.isnat(posted)] = 0.0
+    return bonus
+
+
+class JobBatch:
+    """Job-side scoring inputs prepared once and reused for every resume.
+
+    - jobs: the Job rows, or None for batches cut from the job corpus snapshot
+    - job_ids: (M,) int64 job ids
+    - embeddings: (M, D) float32 matrix with unit-length rows, or None when only
+      the quantized codes are carried (scores are then approximate)
+    - recency: (M,) recency bonus per job
+    - skill_masks: (M, B) uint8 packed skill bitmasks over the skill taxonomy
+    - skill_counts: (M,) number of taxonomy skills per job
+    - unknown: (M,) job skills outside the taxonomy (they only enlarge the Jaccard
+      union, as on the resume side)
+    - codes, scales: optional int8 (M, D) and float32 (M,) quantized embeddings
+      (see core.vectors.quantize_int8), used for a cheap first scoring pass
+    - index: optional IVF index over the batch's rows (see services/job_index.py);
+      sub-batches do not carry it
+    """
+
+    def __init__(self, jobs: Optional[List[Job]], embeddings: Optional[np.ndarray], recency: np.ndarray,
+                 skill_masks: np.ndarray, job_ids: Optional[np.ndarray] = None,
+                 skill_counts: Optional[np.ndarray] = None, codes: Optional[np.ndarray] = None,
+                 scales: Optional[np.ndarray] = None, unknown: Optional[np.ndarray] = None, index=None):
+        self.jobs = jobs
+        self.job_ids = job_ids if job_ids is not None else np.array([job.id for job in jobs], dtype=np.int64)
+        self.embeddings = embeddings
+        self.recency = recency
+        self.skill_masks = skill_masks
+        if skill_counts is None:
+            skill_counts = POPCOUNT[skill_masks].sum(axis=1, dtype=np.int64)
+        self.skill_counts = skill_counts
+        self.unknown = unknown if unknown is not None else np.zeros(len(self.job_ids), dtype=np.int64)
+        self.codes = codes
+        self.scales = scales
+        self.index = index
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def take(self, rows: np.ndarray, exact: bool = True) -> "JobBatch":
+        """Sub-batch of the given row indices; only the arrays this batch carries are gathered.
+
+        With exact=False the float32 embeddings are left out (see CorpusView.batch).
+        """
+        def pick(values):
+            return None if values is None else values[rows]
+
+        jobs = [self.jobs[i] for i in rows] if self.jobs is not None else None
+        return JobBatch(jobs, pick(self.embeddings) if exact else None, self.recency[rows], self.skill_masks[rows],
+                        job_ids=self.job_ids[rows], skill_counts=self.skill_counts[rows],
+                        codes=pick(self.codes), scales=pick(self.scales), unknown=self.unknown[rows])
+
 
 class Matcher:
-    def __init__(self):
+    def __init__(self, db=None):
         self.embedding_service = EmbeddingService()
-        self.db = SessionLocal()
+        self.skill_extractor = get_skill_extractor()
+        # share the caller's session so ORM objects it loaded can be updated here;
+        # a session opened here is ours to close
+        self._owns_db = db is None
+        self.db = db if db is not None else SessionLocal()
+
+    def close(self):
+        if self._owns_db:
+            self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def compute_skill_overlap(self, resume_skills: List[str], job_skills: List[str]) -> float:
         """Compute skill overlap as Jaccard similarity."""
@@ -43,90 +130,403 @@ class Matcher:
             return 0.0
         return max(0.0, 1 - (days_old / 5.0))
 
-    def match_resume_with_jobs(self, resume: Resume, jobs: List[Job]) -> List[Dict]:
-        """Match a resume with provided jobs and persist Match records.
+    def recency_bonuses(self, posted_dates: List[Optional[datetime]]) -> np.ndarray:
+        """Vectorized recency_bonus over a list of posted dates (None scores 0)."""
+        posted = np.array([d if d is not None else np.datetime64("NaT") for d in posted_dates], dtype="datetime64[us]")
+        return recency_from_posted(posted)
 
-        Scoring: 0.65 * semantic_similarity + 0.25 * skill_overlap + 0.1 * recency_bonus
-        """
-        # load resume embedding or generate
-        if resume.embedding:
-            resume_emb = np.array(json.loads(resume.embedding))
-        else:
-            resume_emb = self.embedding_service.generate_embedding(resume.text)
-            resume.embedding = json.dumps(resume_emb.tolist())
-            self.db.add(resume)
+    def embed_jobs(self, jobs: List[Job]) -> int:
+        """Generate embeddings for jobs with a single batched encode and one commit."""
+        if not jobs:
+            return 0
+        embeddings = self.embedding_service.generate_embeddings([job.description or "" for job in jobs])
+        for job, emb in zip(jobs, embeddings):
+            job.set_embedding(emb)
+            self.db.add(job)
+        self.db.commit()
+        return len(jobs)
+
+    def extract_job_skills(self, jobs: List[Job]) -> int:
+        """Fill in skills for jobs stored before skills were extracted at ingest."""
+        missing = [job for job in jobs if job.skills is None]
+        for job in missing:
+            job.skills = json.dumps(self.skill_extractor.extract(job.description or ""))
+            self.db.add(job)
+        if missing:
             self.db.commit()
+        return len(missing)
 
-        resume_skills = resume.skills_list()
-        matches = []
+    def prepare_jobs(self, jobs: List[Job]) -> JobBatch:
+        """Stack job embeddings, recency and skill bitmasks for batch scoring.
+
+        Jobs without an embedding or skills get them generated here (see embed_jobs).
+        """
+        with stage("prepare_jobs", items=len(jobs)):
+            # job.embedding may not exist - generate the missing ones in one batch
+            self.embed_jobs([job for job in jobs if job.embedding is None])
+            self.extract_job_skills(jobs)
+            vectors = [job.embedding_vector() for job in jobs]
+
+            if vectors:
+                embeddings = self.embedding_service.normalize(np.vstack(vectors))
+            else:
+                embeddings = np.zeros((0, 0), dtype=np.float32)
+
+            skill_masks = np.zeros((len(jobs), self.skill_extractor.mask_bytes), dtype=np.uint8)
+            unknown = np.zeros(len(jobs), dtype=np.int64)
+            for i, job in enumerate(jobs):
+                skill_masks[i], unknown[i] = self.skill_extractor.to_mask(job.skills_list())
+
+            recency = self.recency_bonuses([job.posted_date for job in jobs])
+        return JobBatch(jobs, embeddings, recency, skill_masks, unknown=unknown)
+
+    def score_matrix(self, resumes: ResumeSet, batch: JobBatch) -> Dict[str, np.ndarray]:
+        """Score every resume in `resumes` against every job in the batch with one matrix multiply.
+
+        Returns (R, M) arrays for semantic_similarity, skill_overlap, final (the
+        unrounded percentage, to rank on) and score (final rounded, for output).
+        Missing-skill masks are left to the caller, which usually needs them for a
+        few pairs only.
+        """
+        with stage("score", items=len(resumes) * len(batch)):
+            if batch.embeddings is not None:
+                semantic = (resumes.embeddings @ batch.embeddings.T).astype(np.float64)
+            else:
+                semantic = self._quantized_similarity(resumes.embeddings, batch)
+
+            # Jaccard over skill bitmasks: popcount(job & resume) / popcount(job | resume);
+            # skills outside the taxonomy, on either side, only enlarge the union
+            intersection = POPCOUNT[resumes.skill_masks[:, None, :] & batch.skill_masks[None, :, :]].sum(axis=2, dtype=np.int64)
+            union = (batch.skill_counts + batch.unknown)[None, :] + (resumes.skill_counts + resumes.unknown)[:, None] - intersection
+            overlap = np.ones(intersection.shape, dtype=np.float64)
+            np.divide(intersection, union, out=overlap, where=union > 0)
+
+            final = (SEMANTIC_WEIGHT * semantic + SKILL_WEIGHT * overlap + RECENCY_WEIGHT * batch.recency[None, :]) * 100
+        return {"semantic_similarity": semantic, "skill_overlap": overlap, "final": final, "score": np.round(final, 0)}
+
+    @staticmethod
+    def _quantized_similarity(queries: np.ndarray, batch: JobBatch, step: int = 8192) -> np.ndarray:
+        # float32 queries against int8 codes, widened a slice at a time so the
+        # float copy stays small; only the scale multiply is per job
+        out = np.empty((len(queries), len(batch)), dtype=np.float64)
+        for start in range(0, len(batch), step):
+            out[:, start:start + step] = queries @ batch.codes[start:start + step].astype(np.float32).T
+        out *= batch.scales[None, :]
+        return out
+
+    def rescore_candidates(self, resumes: ResumeSet, batch: JobBatch, top_k: int) -> Optional[np.ndarray]:
+        """Shortlist each resume's best rows from the batch's int8 codes for exact rescoring.
+
+        Returns (R, C) row indices, C = top_k * JOB_CORPUS_RESCORE_FACTOR (at least
+        JOB_CORPUS_RESCORE_MIN), or None when the batch is small enough, or not
+        quantized, so every row should be scored exactly. Skills and recency are
+        exact in the first pass; only the semantic term is approximate (per-vector
+        int8 error is well under one score point), so the oversampled shortlist
+        holds the exact top_k.
+        """
+        pool = max(top_k * JOB_CORPUS_RESCORE_FACTOR, JOB_CORPUS_RESCORE_MIN)
+        if not JOB_CORPUS_QUANTIZED or batch.codes is None or len(batch) <= pool:
+            return None
+        approx = JobBatch(None, None, batch.recency, batch.skill_masks, job_ids=batch.job_ids,
+                          skill_counts=batch.skill_counts, codes=batch.codes, scales=batch.scales,
+                          unknown=batch.unknown)
+        scores = self.score_matrix(resumes, approx)["final"]
+        return np.sort(np.argpartition(-scores, pool - 1, axis=1)[:, :pool], axis=1)
+
+    def index_candidates(self, resumes: ResumeSet, index, n_rows: int, top_k: int,
+                         keep: Optional[np.ndarray] = None) -> Optional[List[np.ndarray]]:
+        """Each resume's candidate rows from the corpus IVF index, or None to consider every row.
+
+        A resume's candidates are the rows in its JOB_INDEX_NPROBE nearest lists
+        (only those where keep is True, when a filter mask is given). Lists are
+        picked on the semantic term alone, trading a little recall for scanning a
+        fraction of the corpus; a resume whose lists hold fewer than top_k rows
+        gets every row instead. Not used while the rows fit the rescoring pool.
+        """
+        pool = max(top_k * JOB_CORPUS_RESCORE_FACTOR, JOB_CORPUS_RESCORE_MIN)
+        everything = np.flatnonzero(keep) if keep is not None else np.arange(n_rows)
+        if index is None or len(everything) <= pool:
+            return None
+        candidates = []
+        for rows in index.probe(resumes.embeddings, JOB_INDEX_NPROBE):
+            if keep is not None:
+                rows = rows[keep[rows]]
+            candidates.append(rows if len(rows) >= top_k else everything)
+        return candidates
+
+    def _best_rows(self, resume: ResumeSet, batch: JobBatch, k: int, rows: np.ndarray):
+        """One resume's exact top k among the given rows of batch: (row indices, their scores)."""
+        shortlist = self.rescore_candidates(resume, batch.take(rows, exact=False), k)
+        if shortlist is not None:
+            rows = rows[shortlist[0]]
+        exact = self.score_matrix(resume, batch.take(rows))
+        top = np.argpartition(-exact["final"][0], k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        return rows[top], {key: value[0, top] for key, value in exact.items()}
+
+    def _resume_set(self, resume_emb: np.ndarray, resume_skills: List[str]) -> ResumeSet:
+        mask, unknown = self.skill_extractor.to_mask(resume_skills)
+        return ResumeSet(np.zeros(1, dtype=np.int64), self.embedding_service.normalize(resume_emb).reshape(1, -1),
+                         mask.reshape(1, -1), np.array([unknown], dtype=np.int64))
+
+    def score_batch(self, resume_emb: np.ndarray, resume_skills: List[str], batch: JobBatch) -> Dict[str, np.ndarray]:
+        """Score one resume against every job in the batch in a single NumPy pass.
+
+        Returns arrays of length len(batch) for semantic_similarity, skill_overlap,
+        recency, final and score (see score_matrix), plus missing_masks:
+        packed bitmasks of the job skills the resume lacks.
+        """
+        n_jobs = len(batch)
+        if n_jobs == 0:
+            empty = np.zeros(0, dtype=np.float64)
+            return {"semantic_similarity": empty, "skill_overlap": empty, "recency": empty, "final": empty, "score": empty,
+                    "missing_masks": batch.skill_masks}
 
-        for job in jobs:
-            # job.embedding may not exist - generate on the fly
-            if job.embedding:
-                job_emb = np.array(json.loads(job.embedding))
+        resume = self._resume_set(resume_emb, resume_skills)
+        scores = {key: value[0] for key, value in self.score_matrix(resume, batch).items()}
+        scores["recency"] = batch.recency
+        scores["missing_masks"] = batch.skill_masks & ~resume.skill_masks[0]
+        return scores
+
+    def save_matches(self, rows: List[Dict], keep: Optional[int] = None) -> int:
+        """Upsert Match rows keyed by (resume_id, job_id) in a single transaction.
+
+        Existing pairs get their scores overwritten, so re-matching never duplicates rows.
+        With `keep`, each affected resume is then pruned to its best `keep` matches
+        (see MATCH_KEEP_PER_RESUME). Every affected resume's match_version is
+        bumped (see services/results_cache.py).
+        """
+        if not rows:
+            return 0
+        with stage("save_matches", items=len(rows)):
+            stmt = dialect_insert(self.db, Match)
+            if stmt is not None:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["resume_id", "job_id"],
+                    set_={
+                        "score": stmt.excluded.score,
+                        "semantic_similarity": stmt.excluded.semantic_similarity,
+                        "skill_overlap": stmt.excluded.skill_overlap,
+                        "missing_skills": stmt.excluded.missing_skills,
+                        "created_at": func.now(),
+                    },
+                )
+                self.db.execute(stmt, rows)
             else:
-                job_emb = self.embedding_service.generate_embedding(job.description or "")
-                job.embedding = json.dumps(job_emb.tolist())
-                self.db.add(job)
-                self.db.commit()
-
-            semantic_sim = float(self.embedding_service.cosine_similarity(resume_emb, job_emb))
-
-            # Attempt to extract skills from job description by simple keyword matching
-            # This is a simple approach; a production system should use a proper skills extractor
-            job_skills = []
-            # naive split by non-alphanumeric
-            tokens = set((job.description or "").lower().split())
-            for sk in resume_skills:
-                if sk.lower() in tokens:
-                    job_skills.append(sk.lower())
-
-            skill_overlap = float(self.compute_skill_overlap(resume_skills, job_skills))
-            rec_bonus = float(self.recency_bonus(job.posted_date.isoformat() if job.posted_date else None))
-
-            final_score = 0.65 * semantic_sim + 0.25 * skill_overlap + 0.1 * rec_bonus
-            final_score_pct = round(final_score * 100, 0)
-
-            # compute missing skills as difference (simple approximation)
-            missing = [s for s in (set(job_skills) - set([s.lower() for s in resume_skills]))]
-
-            # persist match
-            match = Match(
-                resume_id=resume.id,
-                job_id=job.id,
-                score=float(final_score_pct),
-                semantic_similarity=float(semantic_sim),
-                skill_overlap=float(skill_overlap),
-                missing_skills=json.dumps(missing)
-            )
-            self.db.add(match)
+                pairs = [(r["resume_id"], r["job_id"]) for r in rows]
+                self.db.query(Match).filter(tuple_(Match.resume_id, Match.job_id).in_(pairs)).delete(synchronize_session=False)
+                self.db.bulk_insert_mappings(Match, rows)
+            # same transaction as the matches, so a cached result never outlives them
+            resume_ids = sorted({r["resume_id"] for r in rows})
+            for start in range(0, len(resume_ids), 500):
+                if keep is not None:
+                    self._prune_matches(resume_ids[start:start + 500], keep)
+                self.db.query(Resume).filter(Resume.id.in_(resume_ids[start:start + 500])).update(
+                    {Resume.match_version: func.coalesce(Resume.match_version, 0) + 1}, synchronize_session=False)
             self.db.commit()
+        return len(rows)
+
+    def _prune_matches(self, resume_ids: List[int], keep: int):
+        # drop every match past each resume's `keep` best, in the caller's transaction
+        ranked = select(
+            Match.id,
+            func.row_number().over(
+                partition_by=Match.resume_id,
+                order_by=(Match.score.desc(), Match.semantic_similarity.desc(), Match.id.desc()),
+            ).label("rank"),
+        ).where(Match.resume_id.in_(resume_ids)).subquery()
+        stale = select(ranked.c.id).where(ranked.c.rank > keep)
+        self.db.query(Match).filter(Match.id.in_(stale)).delete(synchronize_session=False)
 
+    @staticmethod
+    def _chunk_rows(n_jobs: int, mask_bytes: int, budget: int = 16 * 1024 * 1024) -> int:
+        # resumes per chunk, so the (R, M, B) bitmask temporaries stay around `budget` bytes
+        return max(1, budget // max(1, n_jobs * mask_bytes))
+
+    def _missing_json(self, mask: np.ndarray, cache: Dict[bytes, str]) -> str:
+        key = mask.tobytes()
+        value = cache.get(key)
+        if value is None:
+            value = cache[key] = json.dumps(self.skill_extractor.from_mask(mask) if mask.any() else [])
+        return value
+
+    def match_jobs_with_resumes(self, batch: JobBatch, resumes: ResumeSet, top_k: int = MATCH_KEEP_PER_RESUME) -> int:
+        """Reverse matching: score the batch's jobs against every resume and save those pairs only.
+
+        Used for newly stored jobs, so the cost grows with new jobs x resumes rather
+        than with the whole jobs table. Every pair is saved unless top_k caps the
+        matches kept per resume (0 keeps all); then each resume keeps its best top_k
+        overall, the same retention as match_resumes_with_corpus, so at most top_k
+        of the new jobs are written per resume. Returns the number of Match rows written.
+        """
+        if len(batch) == 0 or len(resumes) == 0:
+            return 0
+        written = 0
+        missing_cache: Dict[bytes, str] = {}
+        k = min(top_k, len(batch)) if top_k > 0 else len(batch)
+        step = self._chunk_rows(len(batch), batch.skill_masks.shape[1])
+        for start in range(0, len(resumes), step):
+            chunk = resumes.rows(start, start + step)
+            scores = self.score_matrix(chunk, batch)
+            if k < len(batch):
+                best = np.argpartition(-scores["final"], k - 1, axis=1)[:, :k]
+            else:
+                best = np.broadcast_to(np.arange(len(batch)), (len(chunk), len(batch)))
+            rows = []
+            for r, resume_id in enumerate(chunk.ids.tolist()):
+                for m in best[r].tolist():
+                    rows.append({
+                        "resume_id": resume_id,
+                        "job_id": int(batch.job_ids[m]),
+                        "score": float(scores["score"][r, m]),
+                        "semantic_similarity": float(scores["semantic_similarity"][r, m]),
+                        "skill_overlap": float(scores["skill_overlap"][r, m]),
+                        "missing_skills": self._missing_json(batch.skill_masks[m] & ~chunk.skill_masks[r], missing_cache),
+                    })
+            written += self.save_matches(rows, keep=top_k if top_k > 0 else None)
+        return written
+
+    def match_resumes_with_corpus(self, batch: JobBatch, resumes: ResumeSet, top_k: int = MATCH_KEEP_PER_RESUME) -> int:
+        """Match newly uploaded resumes against the job corpus batch, saving their matches.
+
+        Every pair is saved unless top_k caps the matches kept per resume (0 keeps
+        all). With a cap, only the rows in each resume's nearest IVF lists are
+        considered when the corpus has an index (see index_candidates), and a
+        quantized batch is scored on its int8 codes first, so only each resume's
+        shortlist is rescored with float32 (see rescore_candidates). Returns the
+        number of Match rows written.
+        """
+        if len(batch) == 0 or len(resumes) == 0:
+            return 0
+        written = 0
+        missing_cache: Dict[bytes, str] = {}
+        k = min(top_k, len(batch)) if top_k > 0 else len(batch)
+        step = self._chunk_rows(len(batch), batch.skill_masks.shape[1])
+        for start in range(0, len(resumes), step):
+            chunk = resumes.rows(start, start + step)
+            candidates = self.index_candidates(chunk, batch.index, len(batch), k) if k < len(batch) else None
+            shortlist = self.rescore_candidates(chunk, batch, k) if candidates is None and k < len(batch) else None
+            if candidates is not None:
+                # exact top k within each resume's nearest IVF lists
+                picks = [self._best_rows(chunk.rows(r, r + 1), batch, k, rows) for r, rows in enumerate(candidates)]
+            elif shortlist is not None:
+                # exact float32 scores for each resume's int8 shortlist only
+                picks = []
+                for r, rows in enumerate(shortlist):
+                    exact = self.score_matrix(chunk.rows(r, r + 1), batch.take(rows))
+                    top = np.argpartition(-exact["final"][0], k - 1)[:k]
+                    picks.append((rows[top], {key: value[0, top] for key, value in exact.items()}))
+            else:
+                scores = self.score_matrix(chunk, batch)
+                if k < len(batch):
+                    best = np.argpartition(-scores["final"], k - 1, axis=1)[:, :k]
+                else:
+                    best = np.broadcast_to(np.arange(len(batch)), (len(chunk), len(batch)))
+                picks = [(best[r], {key: value[r, best[r]] for key, value in scores.items()}) for r in range(len(chunk))]
+            rows = []
+            for r, (resume_id, (job_rows, scores)) in enumerate(zip(chunk.ids.tolist(), picks)):
+                for i, m in enumerate(job_rows):
+                    rows.append({
+                        "resume_id": resume_id,
+                        "job_id": int(batch.job_ids[m]),
+                        "score": float(scores["score"][i]),
+                        "semantic_similarity": float(scores["semantic_similarity"][i]),
+                        "skill_overlap": float(scores["skill_overlap"][i]),
+                        "missing_skills": self._missing_json(batch.skill_masks[m] & ~chunk.skill_masks[r], missing_cache),
+                    })
+            written += self.save_matches(rows, keep=top_k if top_k > 0 else None)
+        return written
+
+    def rank_corpus(self, resume_emb: np.ndarray, resume_skills: List[str], top_k: int = 20,
+                    company: Optional[str] = None, posted_since: Optional[datetime] = None,
+                    min_score: Optional[float] = None) -> List[Dict]:
+        """Score a resume against every stored job in the corpus snapshot and return the best top_k.
+
+        Nothing is persisted. Filters are applied on the snapshot arrays before
+        scoring. When the corpus has an IVF index only the rows in the resume's
+        nearest lists are scored (see index_candidates); scoring runs on the int8
+        codes first with exact float32 rescoring of a shortlist, and only the
+        top_k winners are looked up in the jobs table.
+        """
+        from .job_corpus import get_job_corpus
+
+        view = get_job_corpus().view()
+        if len(view) == 0:
+            return []
+        resume = self._resume_set(resume_emb, resume_skills)
+        rows = keep = None  # every row, without copying the corpus arrays
+        if company or posted_since is not None:
+            keep = np.ones(len(view), dtype=bool)
+            if company:
+                code = view.company_code(company)
+                if code is None:
+                    return []
+                keep &= view.company_codes == code
+            if posted_since is not None:
+                keep &= view.posted >= np.datetime64(posted_since, "us")
+            rows = np.flatnonzero(keep)
+            if len(rows) == 0:
+                return []
+        candidates = self.index_candidates(resume, view.index, len(view), top_k, keep)
+        if candidates is not None:
+            rows = candidates[0]
+
+        # first pass on the int8 codes; only the shortlist reads float32 rows
+        shortlist = self.rescore_candidates(resume, view.batch(rows, exact=False), top_k)
+        if shortlist is not None:
+            rows = shortlist[0] if rows is None else rows[shortlist[0]]
+        batch = view.batch(rows)
+        scores = self.score_batch(resume_emb, resume_skills, batch)
+        candidates = np.arange(len(batch))
+        if min_score is not None:
+            candidates = candidates[scores["score"] >= min_score]
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores["final"][candidates], top_k - 1)[:top_k]]
+        # best unrounded score first, so equal rounded scores keep a meaningful order
+        candidates = candidates[np.argsort(-scores["final"][candidates], kind="stable")]
+
+        job_ids = [int(i) for i in batch.job_ids[candidates]]
+        with stage("job_details", items=len(job_ids)):
+            details = {
+                r.id: r for r in
+                self.db.query(Job.id, Job.title, Job.company, Job.apply_url).filter(Job.id.in_(job_ids)).all()
+            } if job_ids else {}
+        matches = []
+        for i, job_id in zip(candidates, job_ids):
+            job = details.get(job_id)
+            if job is None:
+                continue  # deleted since the snapshot was taken
+            mask = scores["missing_masks"][i]
             matches.append({
+                "job_id": job_id,
                 "title": job.title,
                 "company": job.company,
-                "score": int(final_score_pct),
-                "missing_skills": missing,
-                "apply_url": job.apply_url
+                "score": int(scores["score"][i]),
+                "missing_skills": self.skill_extractor.from_mask(mask) if mask.any() else [],
+                "apply_url": job.apply_url,
             })
-
-        # sort by score desc
-        matches.sort(key=lambda x: x["score"], reverse=True)
         return matches
 
-    def get_matches_for_resume(self, resume_id: int) -> List[Dict]:
-        rows = self.db.query(Match).filter(Match.resume_id == resume_id).all()
-        results = []
-        for r in rows:
-            # get job details
-            job = self.db.query(Job).filter(Job.id == r.job_id).first()
-            results.append({
-                "title": job.title if job else None,
-                "company": job.company if job else None,
+    def get_matches_for_resume(self, resume_id: int, limit: int = 100, offset: int = 0, min_score: Optional[float] = None) -> List[Dict]:
+        """Return a page of matches for a resume, best score first.
+
+        One joined query served by the (resume_id, score) index; no per-row Job lookups.
+        """
+        query = (
+            self.db.query(Match.score, Match.missing_skills, Job.title, Job.company, Job.apply_url)
+            .outerjoin(Job, Job.id == Match.job_id)
+            .filter(Match.resume_id == resume_id)
+        )
+        if min_score is not None:
+            query = query.filter(Match.score >= min_score)
+        with stage("results_query"):
+            rows = query.order_by(Match.score.desc(), Match.id.desc()).offset(offset).limit(limit).all()
+        return [
+            {
+                "title": r.title,
+                "company": r.company,
                 "score": int(round(r.score)),
-                "missing_skills": r.missing_skills_list(),
-                "apply_url": job.apply_url if job else None
-            })
-        # sort
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results
\ No newline at end of file
+                "missing_skills": Match.parse_missing_skills(r.missing_skills),
+                "apply_url": r.apply_url
+            }
+            for r in rows
+        ]
@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from ..core.config import RESULTS_CACHE_MAX_BYTES
+from ..core.metrics import RESULTS_CACHE
+
+
+class ResultsCache:
+    """Serialized /api/results responses, keyed by resume id and query, tagged with the match version.
+
+    An entry is only served while its version equals the resume's current
+    match_version (bumped by Matcher.save_matches in the same transaction that
+    writes the matches), so nothing has to be invalidated explicitly: a stale
+    entry is simply replaced on the next request. Entries are evicted least
+    recently used once their bodies exceed max_bytes in total. Thread-safe;
+    one instance per process.
+    """
+
+    def __init__(self, max_bytes: int = RESULTS_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[int, Hashable], Tuple[int, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, resume_id: int, query: Hashable, version: int) -> Optional[bytes]:
+        key = (resume_id, query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                RESULTS_CACHE.inc(result="miss")
+                return None
+            self._entries.move_to_end(key)
+        RESULTS_CACHE.inc(result="hit")
+        return entry[1]
+
+    def put(self, resume_id: int, query: Hashable, version: int, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        key = (resume_id, query)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1])
+            self._entries[key] = (version, body)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+_results_cache: Optional[ResultsCache] = None
+_results_cache_lock = threading.Lock()
+
+
+def get_results_cache() -> ResultsCache:
+    global _results_cache
+    with _results_cache_lock:
+        if _results_cache is None:
+            _results_cache = ResultsCache()
+        return _results_cache
@@ -0,0 +1,137 @@
+import logging
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from ..models.resume import Resume
+from .embedding_service import EmbeddingService
+from .skill_extractor import POPCOUNT, get_skill_extractor
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeSet:
+    """Immutable scoring inputs for a set of resumes.
+
+    - ids: (R,) int64 resume ids, ascending except for resumes committed after higher ids
+    - embeddings: (R, D) float32 unit vectors
+    - skill_masks: (R, B) uint8 packed skill bitmasks
+    - skill_counts: (R,) taxonomy skills per resume
+    - unknown: (R,) skills outside the taxonomy (they only enlarge the Jaccard union)
+    """
+
+    def __init__(self, ids: np.ndarray, embeddings: np.ndarray, skill_masks: np.ndarray, unknown: np.ndarray):
+        self.ids = ids
+        self.embeddings = embeddings
+        self.skill_masks = skill_masks
+        self.skill_counts = POPCOUNT[skill_masks].sum(axis=1, dtype=np.int64)
+        self.unknown = unknown
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rows(self, start: int, stop: int) -> "ResumeSet":
+        return ResumeSet(self.ids[start:stop], self.embeddings[start:stop], self.skill_masks[start:stop],
+                         self.unknown[start:stop])
+
+    def select(self, resume_ids) -> "ResumeSet":
+        """The subset with the given ids (unknown ids are ignored)."""
+        idx = np.flatnonzero(np.isin(self.ids, np.asarray(list(resume_ids), dtype=np.int64)))
+        return ResumeSet(self.ids[idx], self.embeddings[idx], self.skill_masks[idx], self.unknown[idx])
+
+
+class ResumeMatrix:
+    """Process-wide matrix of every resume's scoring inputs, for reverse matching.
+
+    Resumes are never updated after upload, so refresh() only appends rows
+    with ids above the last one seen, plus still match_pending resumes it has
+    not got yet (a lower id can commit after a higher one). current() returns
+    an immutable ResumeSet, so readers never see a half-appended matrix.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = ResumeSet(np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32),
+                                  np.zeros((0, get_skill_extractor().mask_bytes), dtype=np.uint8),
+                                  np.zeros(0, dtype=np.int64))
+
+    def __len__(self):
+        return len(self._current)
+
+    def current(self) -> ResumeSet:
+        return self._current
+
+    @staticmethod
+    def _late_resumes(db, cur: ResumeSet, last_id: int) -> List[Resume]:
+        # resumes stay match_pending until their own task has matched them, which
+        # refreshes the matrix first, so only pending ones can be missing here
+        if not len(cur):
+            return []
+        pending = np.array([resume_id for (resume_id,) in db.query(Resume.id).filter(
+            Resume.id <= last_id, Resume.match_pending.is_(True))], dtype=np.int64)
+        missing = pending[~np.isin(pending, cur.ids)].tolist()
+        resumes = []
+        for start in range(0, len(missing), 500):
+            resumes += db.query(Resume).filter(Resume.id.in_(missing[start:start + 500])).order_by(Resume.id).all()
+        return resumes
+
+    def refresh(self, db, batch_size: int = 1000) -> int:
+        """Append resumes stored since the last refresh; missing embeddings are generated and saved."""
+        extractor = get_skill_extractor()
+        added = 0
+        with self._lock:
+            cur = self._current
+            ids, embeddings, masks, unknown = [cur.ids], [cur.embeddings], [cur.skill_masks], [cur.unknown]
+            last_id = int(cur.ids.max()) if len(cur) else 0
+            late = self._late_resumes(db, cur, last_id)
+            while True:
+                if late:
+                    resumes, late = late[:batch_size], late[batch_size:]
+                else:
+                    resumes = db.query(Resume).filter(Resume.id > last_id).order_by(Resume.id).limit(batch_size).all()
+                if not resumes:
+                    break
+                vectors = [r.embedding_vector() for r in resumes]
+                chunk_masks = np.zeros((len(resumes), extractor.mask_bytes), dtype=np.uint8)
+                chunk_unknown = np.zeros(len(resumes), dtype=np.int64)
+                for i, r in enumerate(resumes):
+                    chunk_masks[i], chunk_unknown[i] = extractor.to_mask(r.skills_list())
+                ids.append(np.array([r.id for r in resumes], dtype=np.int64))
+                masks.append(chunk_masks)
+                unknown.append(chunk_unknown)
+                last_id = max(last_id, int(resumes[-1].id))
+
+                missing = [i for i, v in enumerate(vectors) if v is None]
+                if missing:
+                    fresh = EmbeddingService().generate_embeddings([resumes[i].text or "" for i in missing])
+                    for i, emb in zip(missing, fresh):
+                        vectors[i] = emb
+                        resumes[i].set_embedding(emb)
+                        db.add(resumes[i])
+                    db.commit()
+                embeddings.append(EmbeddingService.normalize(np.vstack(vectors)))
+                added += len(resumes)
+            if added:
+                if len(cur) == 0:
+                    embeddings = embeddings[1:]  # the empty placeholder has no dimension yet
+                self._current = ResumeSet(np.concatenate(ids), np.vstack(embeddings), np.vstack(masks),
+                                          np.concatenate(unknown))
+        if added:
+            logger.info("Resume matrix: added %d resumes (%d total)", added, len(self._current))
+        return added
+
+
+_resume_matrix: Optional[ResumeMatrix] = None
+_resume_matrix_lock = threading.Lock()
+
+
+def get_resume_matrix(db=None) -> ResumeMatrix:
+    """Process-wide resume matrix, caught up with the resumes table when db is given."""
+    global _resume_matrix
+    with _resume_matrix_lock:
+        if _resume_matrix is None:
+            _resume_matrix = ResumeMatrix()
+    if db is not None:
+        _resume_matrix.refresh(db)
+    return _resume_matrix
@@ -1,48 +1,118 @@
+import io
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import BinaryIO, Dict, List, Optional, Union
+
 import pdfplumber
 from docx import Document
-import re
-import spacy
-from typing import Dict, List
 
-nlp = spacy.load("en_core_web_sm")
+from ..core.metrics import stage
+from ..core.config import RESUME_MAX_BYTES, RESUME_MAX_PAGES, RESUME_PARALLEL_PAGES, RESUME_PARSE_WORKERS
+from .skill_extractor import get_skill_extractor
+
+logger = logging.getLogger(__name__)
+
+Source = Union[str, BinaryIO]
+
+
+class ResumeTooLarge(ValueError):
+    """The resume exceeds RESUME_MAX_BYTES or RESUME_MAX_PAGES."""
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the API process runs threads that a forked child would inherit mid-lock
+            _pool = ProcessPoolExecutor(max_workers=RESUME_PARSE_WORKERS, mp_context=get_context("spawn"))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def _extract_pdf_pages(data: bytes, pages: List[int]) -> List[str]:
+    """Extract the text of the given 1-based pages; runs in a pool worker."""
+    with pdfplumber.open(io.BytesIO(data), pages=pages) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages]
+
 
 class ResumeParser:
     @staticmethod
-    def extract_text(file_path: str, file_type: str) -> str:
-        """Extract raw text from PDF, DOCX or TXT file."""
+    def _size(source: Source) -> int:
+        if isinstance(source, str):
+            return os.path.getsize(source)
+        source.seek(0, os.SEEK_END)
+        size = source.tell()
+        source.seek(0)
+        return size
+
+    @staticmethod
+    def _read_bytes(source: Source) -> bytes:
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                return f.read()
+        source.seek(0)
+        return source.read()
+
+    @classmethod
+    def _extract_pdf(cls, source: Source) -> List[str]:
+        with pdfplumber.open(source) as pdf:
+            n_pages = len(pdf.pages)
+            if n_pages > RESUME_MAX_PAGES:
+                raise ResumeTooLarge(f"Resume has {n_pages} pages; the limit is {RESUME_MAX_PAGES}")
+            if n_pages < RESUME_PARALLEL_PAGES or RESUME_PARSE_WORKERS < 2:
+                return [page.extract_text() or "" for page in pdf.pages]
+        # layout analysis is CPU bound and per page, so large documents are split
+        # into contiguous page ranges extracted in worker processes
+        data = cls._read_bytes(source)
+        n_chunks = min(RESUME_PARSE_WORKERS, n_pages)
+        ranges = [list(range(i * n_pages // n_chunks + 1, (i + 1) * n_pages // n_chunks + 1))
+                  for i in range(n_chunks)]
+        try:
+            chunks = _get_pool().map(_extract_pdf_pages, [data] * n_chunks, ranges)
+            return [text for chunk in chunks for text in chunk]
+        except BrokenProcessPool:
+            logger.warning("Resume parse pool died; extracting %d pages in-process", n_pages)
+            _reset_pool()
+            return _extract_pdf_pages(data, list(range(1, n_pages + 1)))
+
+    @classmethod
+    def extract_text(cls, source: Source, file_type: str) -> str:
+        """Extract raw text from a PDF, DOCX or TXT file path or binary file object.
+
+        File objects (e.g. an upload's spooled file) are read in place, so no
+        temporary copy is written.
+        """
+        size = cls._size(source)
+        if size > RESUME_MAX_BYTES:
+            raise ResumeTooLarge(f"Resume is {size} bytes; the limit is {RESUME_MAX_BYTES}")
         if file_type == "pdf":
-            with pdfplumber.open(file_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    text += page.extract_text() or ""
-                return text
+            return "\n".join(cls._extract_pdf(source))
         elif file_type == "docx":
-            doc = Document(file_path)
-            text = ""
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-            return text
+            doc = Document(source)
+            return "\n".join(para.text for para in doc.paragraphs)
         elif file_type == "txt":
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                return f.read()
+            return cls._read_bytes(source).decode("utf-8", errors="ignore")
         else:
             raise ValueError("Unsupported file type")
 
     @staticmethod
     def extract_skills(text: str) -> List[str]:
-        """Extract skills using keyword matching and spaCy NER."""
-        # Simple keyword list (expand as needed)
-        skill_keywords = [
-            "python", "java", "javascript", "sql", "machine learning", "data analysis",
-            "fastapi", "django", "react", "aws", "docker", "git"
-        ]
-        skills = []
-        doc = nlp(text.lower())
-        for token in doc:
-            if token.text in skill_keywords:
-                skills.append(token.text)
-        # Remove duplicates
-        return list(set(skills))
+        """Extract canonical skills using the compiled skill taxonomy (see SkillExtractor)."""
+        return get_skill_extractor().extract(text)
 
     @staticmethod
     def extract_experience_years(text: str) -> int:
@@ -72,10 +142,12 @@ class ResumeParser:
         else:
             return "Senior"
 
-    def parse_resume(self, file_path: str, file_type: str) -> Dict:
-        """Parse the resume and return extracted data."""
-        text = self.extract_text(file_path, file_type)
-        skills = self.extract_skills(text)
+    def parse_resume(self, source: Source, file_type: str) -> Dict:
+        """Parse the resume (a file path or binary file object) and return extracted data."""
+        with stage("parse"):
+            text = self.extract_text(source, file_type)
+        with stage("extract_skills"):
+            skills = self.extract_skills(text)
         years = self.extract_experience_years(text)
         seniority = self.infer_seniority(years)
         return {
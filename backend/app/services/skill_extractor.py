@@ -0,0 +1,104 @@
+import hashlib
+import json
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import SKILL_TAXONOMY_PATH
+
+# popcount of every byte value, for counting set bits in packed skill masks
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# characters that may be part of a skill name ("c++", "c#", "node.js"), so a
+# match must not be glued to them on either side
+_WORD = r"[\w+#]"
+
+
+class SkillExtractor:
+    """Find taxonomy skills in free text with a single compiled regex.
+
+    The taxonomy maps each canonical skill to its aliases, e.g.
+    {"machine learning": ["machine learning", "ml"]}. All aliases are compiled
+    into one case-insensitive alternation (longest first), so extraction is a
+    single linear scan and multi-word skills match across spaces or hyphens.
+    """
+
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        self.skills: List[str] = [s.lower() for s in taxonomy]
+        self.skill_index: Dict[str, int] = {s: i for i, s in enumerate(self.skills)}
+        self._aliases: Dict[str, str] = {}
+        for skill, aliases in taxonomy.items():
+            for alias in set([skill] + list(aliases)):
+                self._aliases[self._normalize(alias)] = skill.lower()
+        patterns = [self._alias_pattern(a) for a in sorted(self._aliases, key=len, reverse=True)]
+        self._regex = re.compile(r"(?<![\w+#.])(?:%s)(?!%s)" % ("|".join(patterns), _WORD), re.IGNORECASE)
+
+    @classmethod
+    def from_file(cls, path: str = SKILL_TAXONOMY_PATH) -> "SkillExtractor":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(re.split(r"[\s\-]+", text.strip().lower()))
+
+    @staticmethod
+    def _alias_pattern(alias: str) -> str:
+        # words of a multi-word alias may be separated by any run of spaces/hyphens
+        return r"[\s\-]+".join(re.escape(word) for word in alias.split(" "))
+
+    def canonical(self, name: str) -> Optional[str]:
+        """Canonical skill for a skill name or alias, or None if it is not in the taxonomy."""
+        return self._aliases.get(self._normalize(name))
+
+    def extract(self, text: str) -> List[str]:
+        """Return the canonical skills mentioned in text, in taxonomy order."""
+        found = {self._aliases[self._normalize(m.group(0))] for m in self._regex.finditer(text or "")}
+        return [s for s in self.skills if s in found]
+
+    @property
+    def mask_bytes(self) -> int:
+        return (len(self.skills) + 7) // 8
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the ordered skill list: equal fingerprints mean equal mask bit positions."""
+        return hashlib.sha256("\n".join(self.skills).encode("utf-8")).hexdigest()
+
+    def to_mask(self, skills: Iterable[str]) -> Tuple[np.ndarray, int]:
+        """Pack skills into a bitmask over the taxonomy (np.packbits layout).
+
+        Returns (mask, unknown) where unknown counts skills outside the taxonomy,
+        which cannot be represented in the mask but still count toward a union.
+        """
+        bits = np.zeros(len(self.skills), dtype=bool)
+        unknown = set()
+        for name in skills:
+            idx = self.skill_index.get(name)
+            if idx is None:
+                canonical = self.canonical(name)
+                idx = self.skill_index.get(canonical) if canonical else None
+            if idx is None:
+                unknown.add(name.lower())
+            else:
+                bits[idx] = True
+        return np.packbits(bits), len(unknown)
+
+    def from_mask(self, mask: np.ndarray) -> List[str]:
+        bits = np.unpackbits(np.asarray(mask, dtype=np.uint8), count=len(self.skills))
+        return [self.skills[i] for i in np.flatnonzero(bits)]
+
+
+_extractor: Optional[SkillExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_skill_extractor() -> SkillExtractor:
+    """Process-wide extractor compiled from SKILL_TAXONOMY_PATH on first use."""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = SkillExtractor.from_file()
+        return _extractor
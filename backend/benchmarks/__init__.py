@@ -0,0 +1,4 @@
+"""Offline benchmarks for the ingest, embedding, matching and results hot paths.
+
+Run from backend/: ``python -m benchmarks.run --scale 1k --output bench.json``
+"""
@@ -0,0 +1,47 @@
+"""Compare two benchmark reports.
+
+    python -m benchmarks.compare base.json head.json --threshold 1.2
+
+Prints the median-time ratio (head / base) for every scenario present in
+both reports and exits with status 1 if any ratio exceeds --threshold.
+"""
+import argparse
+import json
+import sys
+
+
+def compare(base: dict, head: dict, threshold: float) -> int:
+    regressions = 0
+    print(f"{'scale':<6} {'scenario':<24} {'base ms':>10} {'head ms':>10} {'ratio':>7}")
+    for scale, head_scale in head["scales"].items():
+        base_scale = base["scales"].get(scale)
+        if base_scale is None:
+            continue
+        for name, h in head_scale["scenarios"].items():
+            b = base_scale["scenarios"].get(name)
+            if b is None or not b["median_s"]:
+                continue
+            ratio = h["median_s"] / b["median_s"]
+            flag = ""
+            if ratio > threshold:
+                regressions += 1
+                flag = "  REGRESSION"
+            print(f"{scale:<6} {name:<24} {b['median_s'] * 1000:10.2f} {h['median_s'] * 1000:10.2f} {ratio:7.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=1.2, help="flag scenarios slower than base by this factor")
+    args = parser.parse_args(argv)
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+    return 1 if compare(base, head, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
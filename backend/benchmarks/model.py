@@ -0,0 +1,41 @@
+import re
+import zlib
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9+#.]+")
+
+
+class HashingModel:
+    """Deterministic stand-in for the sentence-transformers model.
+
+    Embeds text as a signed bag of hashed tokens, so texts sharing words get
+    similar vectors and the same text always gets the same vector, with no
+    download or GPU. Plug it in with ``EmbeddingService().model = HashingModel()``.
+    Encoding is much cheaper than a transformer, so embedding timings measure
+    the pipeline around the model (dedup, cache, normalization), not inference.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self._buckets = {}
+
+    def _bucket(self, token: str):
+        hit = self._buckets.get(token)
+        if hit is None:
+            h = zlib.crc32(token.encode("utf-8"))
+            hit = self._buckets[token] = (h % self.dim, 1.0 if (h >> 16) & 1 else -1.0)
+        return hit
+
+    def encode(self, texts, batch_size: int = 64, convert_to_numpy: bool = True):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in _TOKEN.findall(text.lower()):
+                idx, sign = self._bucket(token)
+                out[i, idx] += sign
+        return out[0] if single else out
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
@@ -0,0 +1,280 @@
+"""Benchmark runner.
+
+    python -m benchmarks.run --scale 1k --scale 10k --repeat 3 --output bench.json
+
+Each scale runs in its own process against a fresh SQLite database, embedding
+cache and corpus directory in a temp dir, with the HashingModel stand-in, so
+runs are offline and reproducible for a given --seed. Compare two outputs
+with ``python -m benchmarks.compare``.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+SCALES = {
+    "1k": {"jobs": 1_000, "resumes": 200},
+    "10k": {"jobs": 10_000, "resumes": 1_000},
+    "100k": {"jobs": 100_000, "resumes": 2_000},
+}
+QUERIES = 20  # resumes used for per-query scenarios
+NEW_JOBS = 100  # size of the "fresh fetch" for reverse matching
+DOCS = 10  # resume documents parsed per format
+ROLES = ["developer", "engineer", "scientist"]
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _log(msg: str):
+    print(msg, file=sys.stderr, flush=True)
+
+
+class Timer:
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results: Dict[str, Dict] = {}
+
+    def run(self, name: str, fn: Callable, items: int, setup: Optional[Callable] = None):
+        """Time fn() `repeat` times (setup() runs untimed before each) and record throughput per item."""
+        times = []
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        median = statistics.median(times)
+        self.results[name] = {
+            "items": items,
+            "repeat": len(times),
+            "min_s": min(times),
+            "median_s": median,
+            "mean_s": statistics.fmean(times),
+            "items_per_s": items / median if median > 0 else None,
+        }
+        _log(f"  {name:<24} median {median * 1000:10.2f} ms  ({items} items)")
+
+
+def _isolate(workdir: str):
+    # must run before anything under app/ is imported: settings are read at import time
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "EMBEDDING_CACHE_PATH": os.path.join(workdir, "embedding_cache.db"),
+        "EMBEDDING_BACKEND": "inline",
+        "EMBEDDING_WARMUP": "0",
+        "JOB_CORPUS_PATH": os.path.join(workdir, "job_corpus"),
+        "JOB_CORPUS_CHECK_INTERVAL": "0",
+    })
+
+
+def run_scale(scale: str, repeat: int, seed: int) -> Dict:
+    sizes = SCALES[scale]
+    workdir = tempfile.mkdtemp(prefix=f"jobmatch-bench-{scale}-")
+    _isolate(workdir)
+    try:
+        return _run_scenarios(sizes, repeat, seed)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _run_scenarios(sizes: Dict, repeat: int, seed: int) -> Dict:
+    import numpy as np
+
+    from app.core.config import JOB_CORPUS_PATH
+    from app.core.database import SessionLocal, init_db
+    from app.models.job import Job
+    from app.models.resume import Resume
+    from app.services.embedding_service import EmbeddingService
+    from app.services.job_corpus import JobCorpus
+    from app.services.job_fetcher import FetchState, JobFetcher
+    from app.services.job_ingest import JobIngestor
+    from app.services.matcher import Matcher
+    from app.services.resume_matrix import ResumeMatrix
+    from app.services.resume_parser import ResumeParser
+
+    from .model import HashingModel
+    from .synthetic import SyntheticCorpus
+
+    n_jobs, n_resumes = sizes["jobs"], sizes["resumes"]
+    init_db()
+    db = SessionLocal()
+    service = EmbeddingService()
+    service.model = HashingModel()
+    matcher = Matcher(db)
+    timer = Timer(repeat)
+
+    _log(f"generating {n_jobs} jobs / {n_resumes} resumes (seed {seed})")
+    corpus = SyntheticCorpus(seed)
+    raw = corpus.raw_jobs(n_jobs)
+    fresh_raw = corpus.raw_jobs(NEW_JOBS, start=n_jobs)
+    resume_texts = corpus.resume_texts(n_resumes)
+    fetcher = JobFetcher(app_id="bench", app_key="bench", rate_limit=0)
+
+    # --- fetch + ingest ---
+    timer.run("fetcher_select", lambda: fetcher._select(raw, ROLES, [], FetchState()), items=n_jobs)
+    normalized = [fetcher._normalize(r) for r in raw]
+
+    def clear_jobs():
+        db.query(Job).delete()
+        db.commit()
+
+    timer.run("job_ingest", lambda: JobIngestor(db).ingest(normalized), items=n_jobs, setup=clear_jobs)
+
+    # --- embeddings ---
+    descriptions = [j["description"] for j in normalized]
+    timer.run("embed_cold", lambda: service.generate_embeddings(descriptions), items=n_jobs,
+              setup=service.cache.clear)
+    timer.run("embed_warm", lambda: service.generate_embeddings(descriptions), items=n_jobs)
+    matcher.embed_jobs(db.query(Job).order_by(Job.id).all())
+    # re-query: the commit above expired every loaded Job
+    jobs = db.query(Job).order_by(Job.id).all()
+
+    # --- job-side preparation ---
+    timer.run("prepare_jobs", lambda: matcher.prepare_jobs(jobs), items=n_jobs)
+
+    def fresh_corpus_dir():
+        shutil.rmtree(JOB_CORPUS_PATH, ignore_errors=True)
+
+    timer.run("corpus_build", lambda: JobCorpus().refresh(db), items=n_jobs, setup=fresh_corpus_dir)
+
+    # --- scoring ---
+    batch = matcher.prepare_jobs(jobs)
+    queries = resume_texts[:QUERIES]
+    query_embs = service.generate_embeddings(queries)
+    query_skills = [matcher.skill_extractor.extract(t) for t in queries]
+
+    def score_all():
+        for emb, skills in zip(query_embs, query_skills):
+            matcher.score_batch(emb, skills, batch)
+
+    timer.run("score_batch", score_all, items=QUERIES * n_jobs)
+
+    def rank_all():
+        for emb, skills in zip(query_embs, query_skills):
+            matcher.rank_corpus(emb, skills, top_k=20)
+
+    timer.run("rank_corpus_top20", rank_all, items=QUERIES)
+
+    # --- resumes and reverse matching ---
+    resume_embs = service.generate_embeddings(resume_texts)
+    resumes = []
+    for text, emb in zip(resume_texts, resume_embs):
+        resume = Resume(text=text, skills=json.dumps(matcher.skill_extractor.extract(text)))
+        resume.set_embedding(emb)
+        resumes.append(resume)
+    db.add_all(resumes)
+    db.commit()
+
+    timer.run("resume_matrix_refresh", lambda: ResumeMatrix().refresh(db), items=n_resumes)
+    resume_set = ResumeMatrix()
+    resume_set.refresh(db)
+    resume_set = resume_set.current()
+
+    JobIngestor(db).ingest([fetcher._normalize(r) for r in fresh_raw])
+    new_jobs = db.query(Job).order_by(Job.id.desc()).limit(NEW_JOBS).all()
+    new_batch = matcher.prepare_jobs(new_jobs)
+    timer.run("reverse_match_new_jobs", lambda: matcher.match_jobs_with_resumes(new_batch, resume_set),
+              items=NEW_JOBS * n_resumes)
+
+    view = JobCorpus().view()
+    query_set = resume_set.rows(0, QUERIES)
+    timer.run("resume_corpus_match", lambda: matcher.match_resumes_with_corpus(view.batch(), query_set),
+              items=QUERIES)
+
+    query_ids = [int(i) for i in query_set.ids]
+
+    def results_all():
+        for resume_id in query_ids:
+            matcher.get_matches_for_resume(resume_id, limit=100)
+
+    timer.run("results_query", results_all, items=QUERIES)
+
+    # --- resume parsing ---
+    parser = ResumeParser()
+    docx_docs = [corpus.docx_bytes(t) for t in resume_texts[:DOCS]]
+    pdf_docs = []
+    for text in resume_texts[:DOCS]:
+        words = text.split()
+        pdf_docs.append(corpus.pdf_bytes([" ".join(words[i:i + 12]) for i in range(0, len(words), 12)][:5]))
+    words = " ".join(resume_texts[:4]).split()
+    long_pdf = corpus.pdf_bytes([" ".join(words[i:i + 12]) for i in range(0, 12 * 24, 12)])
+
+    timer.run("parse_docx", lambda: [parser.parse_resume(io.BytesIO(d), "docx") for d in docx_docs], items=DOCS)
+    timer.run("parse_pdf", lambda: [parser.parse_resume(io.BytesIO(d), "pdf") for d in pdf_docs], items=DOCS)
+    timer.run("parse_pdf_24_pages", lambda: parser.parse_resume(io.BytesIO(long_pdf), "pdf"), items=24)
+
+    db.close()
+    return {
+        "config": {"jobs": n_jobs, "resumes": n_resumes, "queries": QUERIES, "new_jobs": NEW_JOBS, "docs": DOCS,
+                   "embedding_dim": HashingModel().dim, "numpy": np.__version__},
+        "scenarios": timer.results,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BACKEND_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", action="append", choices=sorted(SCALES), help="repeatable; default 1k")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    scales = args.scale or ["1k"]
+
+    if args.child:
+        json.dump(run_scale(scales[0], args.repeat, args.seed), sys.stdout)
+        return 0
+
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "scales": {},
+    }
+    for scale in scales:
+        _log(f"[{scale}]")
+        # a fresh process per scale: settings, singletons and caches start empty
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--child", "--scale", scale,
+             "--repeat", str(args.repeat), "--seed", str(args.seed)],
+            cwd=BACKEND_DIR, stdout=subprocess.PIPE, check=True,
+        )
+        report["scales"][scale] = json.loads(out.stdout)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
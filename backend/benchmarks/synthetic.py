@@ -0,0 +1,106 @@
+"""Seeded synthetic jobs, resumes and resume documents for the benchmarks.
+
+Skill popularity follows a Zipf-like distribution over the skill taxonomy, so
+a few skills appear in most postings and the long tail in few, as in real
+job boards. Everything is derived from one numpy Generator, so the same seed
+always yields the same corpus.
+"""
+import io
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+
+from app.services.skill_extractor import get_skill_extractor
+
+ROLES = ["Backend Developer", "Frontend Engineer", "Data Scientist", "DevOps Engineer", "Full Stack Developer",
+         "Machine Learning Engineer", "Mobile Developer", "Site Reliability Engineer", "Data Engineer", "QA Engineer"]
+LEVELS = ["Junior", "", "Senior", "Staff", "Lead"]
+FILLER = ("build maintain scalable services team product customers platform design review code quality ownership "
+          "collaborate stakeholders deliver features performance reliability testing deploy cloud systems data "
+          "pipelines users mentor agile remote hybrid benefits growth impact mission fast paced environment").split()
+
+
+class SyntheticCorpus:
+    def __init__(self, seed: int = 42, n_companies: int = 200, zipf: float = 1.1):
+        self.rng = np.random.default_rng(seed)
+        self.skills = list(get_skill_extractor().skills)
+        ranks = self.rng.permutation(len(self.skills)) + 1
+        weights = 1.0 / ranks ** zipf
+        self.skill_p = weights / weights.sum()
+        self.companies = [f"Company {i:03d}" for i in range(n_companies)]
+        company_w = 1.0 / (np.arange(n_companies) + 1) ** zipf
+        self.company_p = company_w / company_w.sum()
+        self.now = datetime.utcnow().replace(microsecond=0)
+
+    def _skills(self, low: int, high: int) -> List[str]:
+        k = int(self.rng.integers(low, high + 1))
+        return [self.skills[i] for i in self.rng.choice(len(self.skills), size=k, replace=False, p=self.skill_p)]
+
+    def _filler(self, n: int) -> str:
+        return " ".join(FILLER[i] for i in self.rng.integers(0, len(FILLER), size=n))
+
+    def raw_jobs(self, n: int, start: int = 0) -> List[Dict]:
+        """Adzuna-shaped search results, as JobFetcher receives them."""
+        jobs = []
+        for i in range(start, start + n):
+            role = ROLES[int(self.rng.integers(len(ROLES)))]
+            level = LEVELS[int(self.rng.integers(len(LEVELS)))]
+            skills = self._skills(3, 8)
+            description = (f"We are hiring a {role.lower()} to {self._filler(12)}. "
+                           f"Requirements: {', '.join(skills)}. {self._filler(30)}.")
+            created = self.now - timedelta(minutes=int(self.rng.integers(0, 60 * 24 * 10)))
+            jobs.append({
+                "id": f"bench-{i}",
+                "title": f"{level} {role}".strip(),
+                "company": {"display_name": self.companies[int(self.rng.choice(len(self.companies), p=self.company_p))]},
+                "description": description,
+                "created": created.isoformat() + "Z",
+                "redirect_url": f"https://jobs.example.com/{i}",
+            })
+        return jobs
+
+    def resume_texts(self, n: int) -> List[str]:
+        texts = []
+        for _ in range(n):
+            role = ROLES[int(self.rng.integers(len(ROLES)))]
+            years = int(self.rng.integers(0, 15))
+            skills = self._skills(2, 10)
+            texts.append(f"{role} with {years} years of experience. Skills: {', '.join(skills)}. "
+                         f"{self._filler(80)}.")
+        return texts
+
+    def docx_bytes(self, text: str) -> bytes:
+        from docx import Document
+
+        doc = Document()
+        for line in text.split(". "):
+            doc.add_paragraph(line)
+        buf = io.BytesIO()
+        doc.save(buf)
+        return buf.getvalue()
+
+    @staticmethod
+    def pdf_bytes(pages: List[str]) -> bytes:
+        """A minimal text PDF with one line of Helvetica per page."""
+        n = len(pages)
+        objects = ["<< /Type /Catalog /Pages 2 0 R >>",
+                   "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{3 + 2 * i} 0 R" for i in range(n)), n)]
+        font = 3 + 2 * n
+        for i, text in enumerate(pages):
+            safe = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            stream = f"BT /F1 10 Tf 40 760 Td ({safe}) Tj ET"
+            objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+                           f"/Resources << /Font << /F1 {font} 0 R >> >> >>")
+            objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        out = b"%PDF-1.4\n"
+        offsets = []
+        for i, obj in enumerate(objects):
+            offsets.append(len(out))
+            out += f"{i + 1} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+        xref = len(out)
+        out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+        out += b"".join(f"{o:010d} 00000 n \n".encode() for o in offsets)
+        out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF".encode()
+        return out
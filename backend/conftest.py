@@ -0,0 +1,60 @@
+import os
+import tempfile
+
+# Settings are read when app modules are imported, so they are set before any test
+# module imports the app. Tests must not load the model in the background or
+# write the database, embedding cache and job corpus into the working tree.
+_data_dir = tempfile.mkdtemp(prefix="jobmatch-test-")
+os.environ.setdefault("EMBEDDING_WARMUP", "0")
+os.environ.setdefault("JOB_CORPUS_WARMUP", "0")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_data_dir, 'jobs.db')}")
+os.environ.setdefault("EMBEDDING_CACHE_PATH", "")
+os.environ.setdefault("JOB_CORPUS_PATH", os.path.join(_data_dir, "job_corpus"))
+
+import pytest
+
+
+def _install_hashing_model():
+    from app.services.embedding_service import EmbeddingService
+    from benchmarks.model import HashingModel
+
+    EmbeddingService().model = HashingModel()
+
+
+# test_api.py makes its requests at import, before any fixture runs
+_install_hashing_model()
+
+
+@pytest.fixture(autouse=True)
+def hashing_model():
+    """Embed with the deterministic HashingModel so no test downloads the real model."""
+    _install_hashing_model()
+    yield
+
+
+@pytest.fixture
+def db_session(tmp_path):
+    """A session on a fresh SQLite database with every table created."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core.database import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def unit_vectors():
+    """Returns unit(rng, n, dim=16): n random float32 unit vectors."""
+    import numpy as np
+
+    def unit(rng, n, dim=16):
+        vectors = rng.standard_normal((n, dim)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return unit
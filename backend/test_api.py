@@ -1,8 +1,6 @@
 from fastapi.testclient import TestClient
 from app.main import app
 
-client = TestClient(app)
-
 # Test data
 resume_data = {
     "text": "I am a Python developer with 3 years of experience in web development using FastAPI, SQL, and machine learning.",
@@ -11,8 +9,9 @@ resume_data = {
     "seniority": "Mid"
 }
 
-# Make the request
-response = client.post("/api/run", json=resume_data)
+# Make the request (the with block runs the app lifespan, which creates the DB tables)
+with TestClient(app) as client:
+    response = client.post("/api/run", json=resume_data)
 
 print("Status Code:", response.status_code)
 print("Response:", response.json())
\ No newline at end of file
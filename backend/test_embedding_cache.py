@@ -0,0 +1,53 @@
+import numpy as np
+from app.services.embedding_cache import EmbeddingCache
+
+
+def _vector(value):
+    return np.full(4, value, dtype=np.float32)
+
+
+def test_memory_tier_evicts_the_least_recently_used_key():
+    cache = EmbeddingCache("model", max_items=2, path="")
+    a, b, c = (cache.key(text) for text in ("a", "b", "c"))
+    cache.put_many({a: _vector(1), b: _vector(2)})
+    cache.get_many([a])  # a is now more recent than b
+    cache.put_many({c: _vector(3)})
+
+    assert set(cache.get_many([a, b, c])) == {a, c}
+    assert cache.stats()["memory_items"] == 2
+
+
+def test_keys_ignore_whitespace_but_not_the_model():
+    cache = EmbeddingCache("model", path="")
+    assert cache.key("python  developer\n") == cache.key(" python developer")
+    assert cache.key("python") != EmbeddingCache("other-model", path="").key("python")
+
+
+def test_disk_hits_are_promoted_and_counted(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = EmbeddingCache("model", path=path)
+    key = writer.key("python developer")
+    writer.put_many({key: _vector(0.5)})
+
+    # a fresh process starts with an empty memory tier and reads the vector from disk
+    cache = EmbeddingCache("model", path=path)
+    missing = cache.key("not cached")
+    found = cache.get_many([key, missing])
+    assert list(found) == [key]
+    assert found[key].tolist() == [0.5] * 4
+    assert cache.stats() == {"hits": 1, "misses": 1, "disk_hits": 1, "memory_items": 1}
+
+    # the promoted vector is now a memory hit
+    cache.get_many([key])
+    assert cache.stats() == {"hits": 2, "misses": 1, "disk_hits": 1, "memory_items": 1}
+
+
+def test_clear_empties_both_tiers(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = EmbeddingCache("model", path=path)
+    key = cache.key("python")
+    cache.put_many({key: _vector(1)})
+    cache.clear()
+
+    assert cache.get_many([key]) == {}
+    assert EmbeddingCache("model", path=path).get_many([key]) == {}
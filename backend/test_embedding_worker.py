@@ -0,0 +1,100 @@
+import os
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client
+
+import numpy as np
+import pytest
+
+from app.services.embedding_worker import EmbeddingBackendBusy, EmbeddingServer, WorkerEmbeddingModel
+
+
+class CountingModel:
+    """Deterministic stand-in encoder that records every encode() call."""
+
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+
+    def encode(self, texts, batch_size=64, convert_to_numpy=True):
+        self.calls.append(len(texts))
+        time.sleep(self.delay)
+        return np.array([[len(t), t.count("a"), 1.0] for t in texts], dtype=np.float32)
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+
+def start_server(tmp_path, model, **kwargs):
+    address = str(tmp_path / "embed.sock")
+    server = EmbeddingServer(model, address=address, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = WorkerEmbeddingModel(address=address, timeout=5, autostart=False)
+    for _ in range(50):
+        try:
+            client.get_sentence_embedding_dimension()
+            break
+        except (ConnectionRefusedError, FileNotFoundError):
+            time.sleep(0.05)
+    return server, client
+
+
+def test_concurrent_requests_are_coalesced(tmp_path):
+    model = CountingModel()
+    server, client = start_server(tmp_path, model, window_ms=200)
+    texts = [f"text {'a' * i}" for i in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda t: client.encode([t]), texts))
+
+    for text, emb in zip(texts, results):
+        assert emb.shape == (1, 3)
+        assert emb[0, 0] == len(text) and emb[0, 1] == text.count("a")
+    # 8 single-text requests, far fewer model calls
+    assert sum(model.calls) == 8
+    assert len(model.calls) < 8
+
+
+def test_full_queue_rejects_requests(tmp_path):
+    model = CountingModel(delay=0.5)
+    server, client = start_server(tmp_path, model, window_ms=0, max_pending=1)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(client.encode, [f"t{i}"]) for i in range(4)]
+        outcomes = []
+        for f in futures:
+            try:
+                f.result()
+                outcomes.append("ok")
+            except EmbeddingBackendBusy:
+                outcomes.append("busy")
+
+    assert "busy" in outcomes and "ok" in outcomes
+    assert server.rejected == outcomes.count("busy")
+
+
+def test_worker_listens_on_a_private_unix_socket_only(tmp_path):
+    server, client = start_server(tmp_path, CountingModel())
+    assert stat.S_IMODE(os.stat(server.address).st_mode) == 0o600
+    with pytest.raises(ValueError):
+        WorkerEmbeddingModel(address="127.0.0.1:8765", autostart=False)
+
+
+def test_pickled_requests_are_not_executed(tmp_path):
+    server, client = start_server(tmp_path, CountingModel())
+    conn = Client(server.address, family="AF_UNIX")
+    conn.send({"op": "encode", "texts": ["x"]})  # a pickle, not JSON
+    with pytest.raises(EOFError):
+        conn.recv_bytes()
+    conn.close()
+    # other clients are unaffected
+    assert client.encode(["abc"]).tolist() == [[3.0, 1.0, 1.0]]
+
+
+def test_client_refuses_a_socket_owned_by_another_user(tmp_path, monkeypatch):
+    server, client = start_server(tmp_path, CountingModel())
+    uid = os.getuid()
+    monkeypatch.setattr(os, "getuid", lambda: uid + 1)
+    stranger = WorkerEmbeddingModel(address=server.address, timeout=5, autostart=False)
+    with pytest.raises(PermissionError):
+        stranger.encode(["abc"])
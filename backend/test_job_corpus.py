@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+from app.models.job import Job
+from app.services.job_corpus import JobCorpus
+
+
+def _add_jobs(db, companies, start=0):
+    rng = np.random.default_rng(start)
+    for i, company in enumerate(companies, start):
+        job = Job(external_id=f"job-{i}", title=f"Job {i}", company=company, description="x",
+                  skills=json.dumps(["python"]))
+        # embeddings and skills are already stored, so refresh needs no model
+        job.set_embedding(rng.standard_normal(16).astype(np.float32))
+        db.add(job)
+    db.commit()
+
+
+def test_refresh_keeps_company_codes_and_quantized_columns_aligned(tmp_path, db_session):
+    db = db_session
+    _add_jobs(db, ["Acme", "Globex", "acme ", "Globex", "Initech"])
+    corpus = JobCorpus(str(tmp_path / "corpus"), check_interval=0)
+    assert corpus.refresh(db) == 5
+    _add_jobs(db, ["Initech", "Acme"], start=5)
+    assert corpus.refresh(db) == 2
+
+    view = corpus.view()
+    assert view.companies == ["acme", "globex", "initech"]
+    assert view.company_codes.tolist() == [0, 1, 0, 1, 2, 2, 0]
+    assert (tmp_path / "corpus" / "company").stat().st_size == 7 * 4
+    assert view.codes.shape == (7, 16) and view.scales.shape == (7,)
+    reconstructed = view.codes * view.scales[:, None]
+    assert np.abs(reconstructed - view.embeddings).max() <= view.scales.max() / 2 + 1e-6
+
+
+def test_taxonomy_change_rebuilds_into_new_files(tmp_path, db_session):
+    db = db_session
+    _add_jobs(db, ["Acme", "Globex", "Initech"])
+    corpus = JobCorpus(str(tmp_path / "corpus"), check_interval=0)
+    corpus.refresh(db)
+    old = corpus.view()
+    old_embeddings = np.array(old.embeddings)
+
+    # same mask width, different skill order: the bit positions no longer line up
+    meta_path = tmp_path / "corpus" / "meta.json"
+    meta = json.loads(meta_path.read_text())
+    assert meta["taxonomy"]
+    meta["taxonomy"] = "another taxonomy"
+    meta_path.write_text(json.dumps(meta))
+    assert corpus.refresh(db) == 3
+
+    # the previous generation is still mapped and readable after the rebuild
+    assert np.array_equal(old.embeddings, old_embeddings)
+    assert corpus.view().ids.tolist() == [1, 2, 3]
+    assert json.loads(meta_path.read_text())["taxonomy"] != "another taxonomy"
+
+
+
+def test_refresh_picks_up_jobs_committed_after_a_higher_id(tmp_path, db_session):
+    db = db_session
+    corpus = JobCorpus(str(tmp_path / "corpus"), check_interval=0)
+    rng = np.random.default_rng(0)
+    # two concurrent ingests: id 2 commits and is snapshotted before id 1 commits
+    for job_id in (2, 1):
+        job = Job(id=job_id, external_id=f"job-{job_id}", title="Job", company="Acme", description="x",
+                  skills=json.dumps(["python"]), match_pending=True)
+        job.set_embedding(rng.standard_normal(16).astype(np.float32))
+        db.add(job)
+        db.commit()
+        assert corpus.refresh(db) == 1
+    assert sorted(corpus.view().ids.tolist()) == [1, 2]
+    # still pending, but already in the corpus: not appended again
+    assert corpus.refresh(db) == 0
@@ -0,0 +1,183 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from app.services.job_fetcher import FetchState, JobFetcher
+
+PER_PAGE = 5
+now = datetime.utcnow()
+
+# 3 pages of fresh jobs for "us", then a page that crosses the 5-day window;
+# "gb" has a single short page
+PAGES = {
+    "us": [
+        [{"id": f"us-{p}-{i}", "title": "Backend Developer", "company": {"display_name": "Amazon"},
+          "description": "Python", "created": (now - timedelta(hours=p * 10 + i)).isoformat() + "Z",
+          "redirect_url": f"https://example.com/us/{p}/{i}"} for i in range(PER_PAGE)]
+        for p in range(3)
+    ] + [
+        [{"id": f"us-old-{i}", "title": "Backend Developer", "company": {"display_name": "Amazon"},
+          "description": "Python", "created": (now - timedelta(days=4 + i)).isoformat() + "Z",
+          "redirect_url": f"https://example.com/us/old/{i}"} for i in range(PER_PAGE)]
+    ],
+    "gb": [
+        [{"id": "gb-0", "title": "Backend Developer", "company": {"display_name": "Amazon"},
+          "description": "Python", "created": now.isoformat() + "Z", "redirect_url": "https://example.com/gb/0"}]
+    ],
+}
+requested = []
+failing = set()  # (country, page) pairs answered with a server error
+
+
+class StubAdzuna(BaseHTTPRequestHandler):
+    def do_GET(self):
+        # /{country}/search/{page}
+        _, country, _, page = urlparse(self.path).path.split("/")
+        requested.append((country, int(page)))
+        if (country, int(page)) in failing:
+            self.send_error(500)
+            return
+        pages = PAGES.get(country, [])
+        results = pages[int(page) - 1] if int(page) <= len(pages) else []
+        body = json.dumps({"results": results}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def stub_fetcher(server):
+    return JobFetcher(
+        countries=["us", "gb"], base_url=f"http://127.0.0.1:{server.server_port}",
+        max_pages=10, results_per_page=PER_PAGE, max_workers=2, rate_limit=0,
+        app_id="id", app_key="key",
+    )
+
+
+def start_stub():
+    requested.clear()
+    failing.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAdzuna)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_concurrent_pagination_against_stub_server():
+    server = start_stub()
+    try:
+        jobs = stub_fetcher(server).fetch_jobs(["backend"], ["Amazon"])
+    finally:
+        server.shutdown()
+
+    ids = {j["external_id"] for j in jobs}
+    # 15 fresh "us" jobs + the one still-recent job on the boundary page + "gb"
+    assert len(ids) == 17
+    assert "us-old-0" in ids and "us-old-1" not in ids
+    # paging stops after the page that crosses the window; never reaches page 10
+    assert max(p for c, p in requested if c == "us") <= 5
+    assert [p for c, p in requested if c == "gb"] == [1]
+
+
+def test_incremental_fetch_returns_only_unseen_postings():
+    server = start_stub()
+    try:
+        state = FetchState()
+        first = stub_fetcher(server).fetch_jobs(["backend"], ["Amazon"], state)
+        first_requests = len(requested)
+        requested.clear()
+        second = stub_fetcher(server).fetch_jobs(["backend"], ["Amazon"], state)
+    finally:
+        server.shutdown()
+
+    assert len(first) == 17
+    assert second == []
+    # every posting on page 1 is already seen, so each country stops after one page
+    assert len(requested) < first_requests
+    assert sorted(p for c, p in requested if c == "us")[0] == 1
+
+
+def test_failed_page_keeps_the_pages_around_it():
+    server = start_stub()
+    failing.add(("us", 2))
+    try:
+        fetcher = JobFetcher(
+            countries=["us"], base_url=f"http://127.0.0.1:{server.server_port}",
+            max_pages=10, results_per_page=PER_PAGE, max_workers=3, rate_limit=0, max_retries=0,
+            app_id="id", app_key="key",
+        )
+        jobs = fetcher.fetch_jobs(["backend"], ["Amazon"])
+    finally:
+        server.shutdown()
+
+    # pages 1-3 go out in one wave; page 2 fails, page 3 is still returned
+    ids = [j["external_id"] for j in jobs]
+    assert ids == [f"us-0-{i}" for i in range(PER_PAGE)] + [f"us-2-{i}" for i in range(PER_PAGE)]
+    assert sorted(p for _, p in requested) == [1, 2, 3]
+
+
+def test_postings_on_a_failed_page_come_back_on_the_next_fetch():
+    server = start_stub()
+    failing.add(("us", 2))
+    try:
+        # one page per wave, so "us" stops at the failed page
+        fetcher = JobFetcher(
+            countries=["us", "gb"], base_url=f"http://127.0.0.1:{server.server_port}",
+            max_pages=10, results_per_page=PER_PAGE, max_workers=1, rate_limit=0, max_retries=0,
+            app_id="id", app_key="key",
+        )
+        state = FetchState()
+        first = fetcher.fetch_jobs(["backend"], ["Amazon"], state)
+        assert state.incomplete == ["us"]
+        assert state.newest_created is None
+        failing.clear()
+        second = fetcher.fetch_jobs(["backend"], ["Amazon"], state)
+    finally:
+        server.shutdown()
+
+    assert {j["external_id"] for j in first} == {f"us-0-{i}" for i in range(PER_PAGE)} | {"gb-0"}
+    # page 1 is all seen, but "us" pages on past it to what the failed page held
+    assert {j["external_id"] for j in second} == (
+        {f"us-{p}-{i}" for p in (1, 2) for i in range(PER_PAGE)} | {"us-old-0"})
+    assert state.incomplete == [] and state.newest_created is not None
+
+
+def test_undated_postings_are_pruned_with_the_window():
+    state = FetchState()
+    state.mark_seen("undated", None)
+    state.seen["legacy"] = ""
+    state.prune(datetime.utcnow() - timedelta(days=5))
+    assert list(state.seen) == ["undated"]
+    state.prune(datetime.utcnow() + timedelta(seconds=1))
+    assert state.seen == {}
+
+
+def test_watermark_save_upserts_per_query(tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core.database import Base
+    from app.models.fetch_watermark import FetchWatermark
+    from app.services.fetch_watermark import WatermarkStore
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'wm.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    first, second = Session(), Session()
+    try:
+        # both start from "no watermark yet", as two concurrent first fetches would
+        assert WatermarkStore(first).load("q").seen == {}
+        assert WatermarkStore(second).load("q").seen == {}
+        WatermarkStore(first).save("q", FetchState(seen={"a": now.isoformat()}))
+        WatermarkStore(second).save("q", FetchState(seen={"b": now.isoformat()}, incomplete=["us"]))
+        assert first.query(FetchWatermark).count() == 1
+        assert list(WatermarkStore(first).load("q").seen) == ["b"]
+        assert WatermarkStore(first).load("q").incomplete == ["us"]
+    finally:
+        first.close()
+        second.close()
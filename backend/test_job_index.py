@@ -0,0 +1,104 @@
+import json
+import os
+
+import numpy as np
+
+from app.models.job import Job
+from app.models.match import Match
+from app.services import job_corpus, matcher as matcher_module
+from app.services.job_corpus import JobCorpus
+from app.services.job_index import IVFIndex, assign_lists, train_centroids
+from app.services.matcher import Matcher
+from app.services.resume_matrix import ResumeSet
+
+
+def _clustered(rng, n, centers, noise=0.1):
+    vectors = centers[rng.integers(0, len(centers), size=n)] + noise * rng.standard_normal((n, centers.shape[1]))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _add_jobs(db, embeddings, start=0):
+    for i, embedding in enumerate(embeddings, start):
+        job = Job(external_id=f"job-{i}", title=f"Job {i}", company="Acme", description="x",
+                  skills=json.dumps(["python"]))
+        job.set_embedding(embedding)
+        db.add(job)
+    db.commit()
+
+
+def test_probed_lists_hold_the_nearest_rows(unit_vectors):
+    rng = np.random.default_rng(0)
+    centers = unit_vectors(rng, 16, 32)
+    data = _clustered(rng, 4000, centers)
+    centroids = train_centroids(data, 16)
+    assert centroids.shape == (16, 32)
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1, atol=1e-5)
+
+    index = IVFIndex(centroids, assign_lists(data, centroids))
+    queries = _clustered(rng, 20, centers)
+    for query, rows in zip(queries, index.probe(queries, 2)):
+        assert np.all(np.diff(rows) > 0)
+        # a small fraction of the data, holding the exact nearest neighbours
+        assert len(rows) < len(data) / 4
+        nearest = np.argsort(-(data @ query))[:10]
+        assert np.isin(nearest, rows).mean() >= 0.9
+
+
+def test_corpus_trains_the_index_and_retrains_as_it_grows(tmp_path, db_session, unit_vectors):
+    rng = np.random.default_rng(1)
+    centers = unit_vectors(rng, 8)
+    _add_jobs(db_session, _clustered(rng, 60, centers))
+    corpus = JobCorpus(str(tmp_path / "corpus"), check_interval=0, index_min_rows=100, index_lists=8)
+    corpus.refresh(db_session)
+    assert corpus.view().index is None
+
+    _add_jobs(db_session, _clustered(rng, 60, centers), start=60)
+    corpus.refresh(db_session)
+    view = corpus.view()
+    assert len(view.index) == 8 and len(view.index.lists) == 120
+    assert np.array_equal(view.index.lists, assign_lists(view.embeddings, view.index.centroids))
+
+    # new rows join the existing lists until the corpus has doubled
+    _add_jobs(db_session, _clustered(rng, 60, centers), start=120)
+    corpus.refresh(db_session)
+    view = corpus.view()
+    assert len(view.index.lists) == 180
+    assert np.array_equal(view.index.lists[120:], assign_lists(view.embeddings[120:], view.index.centroids))
+    assert os.path.exists(tmp_path / "corpus" / "lists.1")
+
+    _add_jobs(db_session, _clustered(rng, 60, centers), start=180)
+    corpus.refresh(db_session)
+    assert len(corpus.view().index.lists) == 240
+    assert sorted(n for n in os.listdir(tmp_path / "corpus") if n.startswith(("lists.", "centroids."))) == [
+        "centroids.2", "lists.2"]
+
+
+def test_rank_corpus_and_corpus_matching_score_only_the_probed_lists(tmp_path, db_session, unit_vectors,
+                                                                    monkeypatch):
+    rng = np.random.default_rng(2)
+    centers = unit_vectors(rng, 8)
+    _add_jobs(db_session, _clustered(rng, 400, centers, noise=0.05))
+    corpus = JobCorpus(str(tmp_path / "corpus"), check_interval=0, index_min_rows=100, index_lists=8)
+    corpus.refresh(db_session)
+    view = corpus.view()
+    monkeypatch.setattr(job_corpus, "get_job_corpus", lambda: corpus)
+    monkeypatch.setattr(matcher_module, "JOB_CORPUS_RESCORE_MIN", 20)
+    monkeypatch.setattr(matcher_module, "JOB_INDEX_NPROBE", 2)
+
+    resume = _clustered(rng, 1, centers, noise=0.05)[0]
+    resumes = ResumeSet(np.array([1], dtype=np.int64), resume.reshape(1, -1),
+                        np.zeros((1, view.skill_masks.shape[1]), dtype=np.uint8), np.zeros(1, dtype=np.int64))
+    matcher = Matcher(db_session)
+    try:
+        probed = matcher.index_candidates(resumes, view.index, len(view), 5)[0]
+        assert len(probed) < len(view) / 2
+
+        exact = matcher.score_matrix(resumes, view.batch())["final"][0]
+        best = [int(i) for i in view.ids[np.argsort(-exact, kind="stable")[:5]]]
+        ranked = matcher.rank_corpus(resume, ["python"], top_k=5)
+        assert [m["job_id"] for m in ranked] == best
+
+        matcher.match_resumes_with_corpus(view.batch(), resumes, top_k=5)
+        assert sorted(m.job_id for m in db_session.query(Match).all()) == sorted(best)
+    finally:
+        matcher.close()
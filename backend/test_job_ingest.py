@@ -0,0 +1,44 @@
+from app.models.job import Job
+from app.services.job_ingest import JobIngestor
+
+
+def _job(external_id, title="Engineer"):
+    return {"external_id": external_id, "title": title, "company": "Acme",
+            "description": "Python and SQL", "posted_date": "2024-05-01T00:00:00"}
+
+
+def test_ingest_stores_new_jobs_and_resolves_known_ones(db_session):
+    db = db_session
+    first = JobIngestor(db).ingest([_job("a"), _job("b")])
+    assert len(first.new_ids) == 2 and first.job_ids == first.new_ids
+
+    # a repeated posting in the same batch is stored once; postings without an id always are
+    result = JobIngestor(db).ingest([_job("b"), _job("c"), _job("c"), _job(None), _job(None)])
+    assert len(result.new_ids) == 3
+    assert result.job_ids[0] == first.job_ids[1]
+    assert result.job_ids[1:] == result.new_ids
+    assert db.query(Job).count() == 5
+    assert db.query(Job).filter(Job.external_id == "c").one().match_pending is True
+
+
+def test_ingest_resolves_postings_stored_by_a_concurrent_fetch(db_session, monkeypatch):
+    db = db_session
+    ingestor = JobIngestor(db)
+    lookup = ingestor._existing_ids
+
+    def racing_lookup(external_ids):
+        found = lookup(external_ids)
+        if "b" in external_ids and "b" not in found:
+            # another fetch stores "b" between our lookup and our insert
+            db.add(Job(external_id="b", title="Stored elsewhere"))
+            db.commit()
+        return found
+
+    monkeypatch.setattr(ingestor, "_existing_ids", racing_lookup)
+    result = ingestor.ingest([_job("a"), _job("b")])
+
+    stored = db.query(Job).filter(Job.external_id == "b").one()
+    assert stored.title == "Stored elsewhere"
+    assert len(result.new_ids) == 1
+    assert result.job_ids == [result.new_ids[0], stored.id]
+    assert db.query(Job).count() == 2
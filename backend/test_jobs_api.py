@@ -1,14 +1,30 @@
+import io
+import time
+
+from docx import Document
 from fastapi.testclient import TestClient
+
 from app.main import app
-import io
 
-client = TestClient(app)
+
+def _resume_docx(text: str) -> bytes:
+    document = Document()
+    document.add_paragraph(text)
+    buf = io.BytesIO()
+    document.save(buf)
+    return buf.getvalue()
+
 
 def test_upload_and_fetch_jobs():
-    # upload a simple resume txt saved as .pdf (parser expects pdf/docx but parser will error on real pdf parsing)
-    # instead, we'll create a small pdf-like file name but rely on the mocked parser capability: use docx
-    content = b"John Doe\nExperience with Python, Docker, FastAPI, SQL"
-    files = {"file": ("resume.txt", content, "text/plain")}
+    # entering the client runs the app lifespan, which creates the DB tables
+    with TestClient(app) as client:
+        _upload_and_fetch_jobs(client)
+
+def _upload_and_fetch_jobs(client):
+    # the parser accepts .pdf and .docx only, so upload a real (small) Word document
+    content = _resume_docx("John Doe\nExperience with Python, Docker, FastAPI, SQL")
+    files = {"file": ("resume.docx", content,
+                      "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
 
     # upload
     r = client.post("/api/resume/upload", files=files)
@@ -19,8 +35,108 @@ def test_upload_and_fetch_jobs():
     # fetch jobs (uses mocked jobs since ADZUNA vars not set in test env)
     resp = client.post("/api/jobs/fetch", json={"roles": ["Backend Developer"], "companies": ["Amazon", "Google"]})
     assert resp.status_code == 200
-    assert "jobs_fetched" in resp.json()
+    assert "jobs_fetched" in resp.json() and "jobs_stored" in resp.json()
 
     # check match results (may be empty until matches are computed)
-    res = client.get(f"/api/match/results/{resume_id}")
-    assert res.status_code in (200, 404)
+    res = client.get(f"/api/results/{resume_id}")
+    assert res.status_code == 200
+
+
+
+def test_results_revalidate_with_etag():
+    with TestClient(app) as client:
+        _results_revalidate_with_etag(client)
+
+def _results_revalidate_with_etag(client):
+    from app.core.database import SessionLocal
+    from app.models.job import Job
+    from app.services.matcher import Matcher
+
+    assert client.post("/api/jobs/fetch", json={"roles": ["Backend Developer"], "companies": []}).status_code == 200
+    content = _resume_docx("Backend engineer: Python, Docker, SQL")
+    r = client.post("/api/resume/upload", files={"file": ("cv.docx", content, "application/octet-stream")})
+    assert r.status_code == 200
+    resume_id = r.json()["resume_id"]
+
+    # wait for the background matching of the stored jobs, so the results stop changing
+    task_id = r.json()["match_task_id"]
+    for _ in range(100):
+        if task_id is None or client.get(f"/api/jobs/match-tasks/{task_id}").json()["status"] in ("done", "partial", "failed"):
+            break
+        time.sleep(0.05)
+
+    res = client.get(f"/api/results/{resume_id}")
+    assert res.status_code == 200
+    etag = res.headers["ETag"]
+    assert res.headers["Cache-Control"] == "no-cache"
+
+    # unchanged results: revalidation answers 304 without a body
+    cached = client.get(f"/api/results/{resume_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag and cached.content == b""
+
+    # saving matches bumps the resume's match_version, so the old tag no longer matches
+    db = SessionLocal()
+    try:
+        job_id = db.query(Job.id).order_by(Job.id).first()[0]
+        with Matcher(db) as matcher:
+            matcher.save_matches([{"resume_id": resume_id, "job_id": job_id, "score": 1.0,
+                                   "semantic_similarity": 0.0, "skill_overlap": 0.0, "missing_skills": "[]"}])
+    finally:
+        db.close()
+    fresh = client.get(f"/api/results/{resume_id}", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert any(m["score"] == 1 for m in fresh.json())
+
+
+def test_rejected_resume_matching_is_retried_by_the_next_fetch(monkeypatch):
+    from app.api import resume as resume_api
+    from app.core.database import SessionLocal
+    from app.models.resume import Resume
+    from app.services.match_queue import QueueFull
+
+    class FullQueue:
+        def submit(self, *args, **kwargs):
+            raise QueueFull("match queue is full")
+
+    with TestClient(app) as client:
+        monkeypatch.setattr(resume_api, "get_match_queue", lambda: FullQueue())
+        r = client.post("/api/resume/upload",
+                        files={"file": ("cv.docx", _resume_docx("Python and Docker"), "application/octet-stream")})
+        assert r.status_code == 200 and r.json()["match_task_id"] is None
+        resume_id = r.json()["resume_id"]
+        monkeypatch.undo()
+
+        assert client.post("/api/jobs/fetch", json={"roles": ["Backend Developer"], "companies": []}).status_code == 200
+        # the retried resume task clears the flag once the resume is matched against the corpus
+        db = SessionLocal()
+        try:
+            for _ in range(100):
+                db.expire_all()
+                if db.get(Resume, resume_id).match_pending is None:
+                    break
+                time.sleep(0.05)
+            assert db.get(Resume, resume_id).match_pending is None
+        finally:
+            db.close()
+        assert client.get(f"/api/results/{resume_id}").json()
+
+
+def test_ready_retries_a_failed_model_load(monkeypatch):
+    from app.services.embedding_service import EmbeddingService
+    from benchmarks.model import HashingModel
+
+    service = EmbeddingService()
+    monkeypatch.setattr(service, "_model", None)
+    monkeypatch.setattr(service, "model_state", "failed")
+    monkeypatch.setattr(EmbeddingService, "_load_model", staticmethod(HashingModel))
+    with TestClient(app) as client:
+        r = client.get("/ready")
+        assert r.status_code == 503 and r.json()["model"] == "loading"
+        for _ in range(100):
+            r = client.get("/ready")
+            if r.status_code == 200:
+                break
+            time.sleep(0.05)
+        assert r.status_code == 200 and r.json()["model"] == "ready"
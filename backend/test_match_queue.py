@@ -0,0 +1,85 @@
+import json
+
+from app.core.database import SessionLocal, init_db
+from app.core.metrics import start_profile
+from app.models.job import Job
+from app.services.job_corpus import JobCorpus
+from app.services.match_queue import MatchQueue, MatchTask
+
+
+def _store_jobs(n, prefix):
+    db = SessionLocal()
+    try:
+        jobs = [Job(external_id=f"{prefix}-{i}", title="Engineer", company="Acme",
+                    description=f"Python developer {i}", skills=json.dumps(["python"]), match_pending=True)
+                for i in range(n)]
+        db.add_all(jobs)
+        db.commit()
+        return [job.id for job in jobs]
+    finally:
+        db.close()
+
+
+def test_job_task_does_not_reload_jobs_one_by_one(monkeypatch):
+    init_db()
+    # as if another worker's refresh already covered the jobs, so nothing here reloads them in bulk
+    monkeypatch.setattr(JobCorpus, "refresh", lambda self, db: 0)
+    queries = []
+    for n in (5, 50):
+        task = MatchTask(_store_jobs(n, f"queries-{n}"))
+        profile = start_profile()
+        MatchQueue(max_retries=0)._run(task)
+        assert task.status == "done"
+        queries.append(profile["db"][1])
+    # ten times the jobs, the same number of round trips
+    assert queries[1] == queries[0]
+
+
+def test_task_status_is_readable_from_another_process():
+    init_db()
+    task = MatchTask(_store_jobs(2, "status"))
+    MatchQueue(max_retries=0)._run(task)
+    # a fresh queue stands in for another API worker, which never saw the task
+    status = MatchQueue().status(task.id)
+    assert status["status"] == "done" and status["jobs"] == 2 and status["finished_at"]
+    assert MatchQueue().status("no-such-task") is None
+
+
+def test_failed_chunks_make_the_task_partial(monkeypatch):
+    import numpy as np
+
+    from app.models.resume import Resume
+    from app.services.matcher import Matcher
+
+    init_db()
+    db = SessionLocal()
+    try:
+        resumes = [Resume(text=f"resume {i}", skills=json.dumps(["python"])) for i in range(2)]
+        for resume in resumes:
+            resume.set_embedding(np.ones(384, dtype=np.float32) / np.sqrt(384))
+        db.add_all(resumes)
+        db.commit()
+        bad_id = resumes[0].id
+    finally:
+        db.close()
+
+    match = Matcher.match_jobs_with_resumes
+
+    def failing(self, batch, chunk, *args, **kwargs):
+        if bad_id in chunk.ids:
+            raise RuntimeError("scoring failed")
+        return match(self, batch, chunk, *args, **kwargs)
+
+    monkeypatch.setattr(Matcher, "_chunk_rows", lambda self, *args: 1)
+    monkeypatch.setattr(Matcher, "match_jobs_with_resumes", failing)
+    job_ids = _store_jobs(1, "partial")
+    task = MatchTask(job_ids)
+    MatchQueue(max_retries=0)._run(task)
+    assert task.status == "partial" and task.resumes_failed == 1 and task.resumes_done == task.resumes_total
+    assert MatchQueue().status(task.id)["status"] == "partial"
+    db = SessionLocal()
+    try:
+        # the job stays pending, so the next fetch retries it
+        assert db.get(Job, job_ids[0]).match_pending is True
+    finally:
+        db.close()
@@ -0,0 +1,172 @@
+import json
+
+import numpy as np
+from app.models.job import Job
+from app.models.match import Match
+from app.models.resume import Resume
+from app.services.matcher import JobBatch, Matcher
+from app.services.resume_matrix import ResumeSet
+
+
+def _batch(rng, unit, job_ids):
+    n = len(job_ids)
+    return JobBatch(None, unit(rng, n), np.zeros(n), np.zeros((n, 4), dtype=np.uint8),
+                    job_ids=np.array(job_ids, dtype=np.int64))
+
+
+def test_new_job_matching_keeps_the_same_top_k_per_resume(db_session, unit_vectors):
+    rng = np.random.default_rng(0)
+    db = db_session
+    matcher = Matcher(db)
+    try:
+        db.add_all([Resume(id=1, text="a"), Resume(id=2, text="b")])
+        db.commit()
+        resumes = ResumeSet(np.array([1, 2], dtype=np.int64), unit_vectors(rng, 2),
+                            np.zeros((2, 4), dtype=np.uint8), np.zeros(2, dtype=np.int64))
+        first, second = _batch(rng, unit_vectors, range(1, 11)), _batch(rng, unit_vectors, range(11, 21))
+        assert matcher.match_jobs_with_resumes(first, resumes, top_k=4) == 8
+        matcher.match_jobs_with_resumes(second, resumes, top_k=4)
+
+        # the kept rows are each resume's best 4 over both batches
+        exact = matcher.score_matrix(resumes, JobBatch(
+            None, np.vstack([first.embeddings, second.embeddings]), np.zeros(20),
+            np.zeros((20, 4), dtype=np.uint8), job_ids=np.arange(1, 21, dtype=np.int64)))
+        for r, resume_id in enumerate([1, 2]):
+            kept = db.query(Match).filter(Match.resume_id == resume_id).all()
+            assert len(kept) == 4
+            assert sorted(m.score for m in kept) == sorted(np.sort(exact["score"][r])[::-1][:4].tolist())
+        assert db.get(Resume, 1).match_version == 2
+    finally:
+        matcher.close()
+
+
+def test_matches_are_not_pruned_by_default(db_session, unit_vectors):
+    rng = np.random.default_rng(2)
+    db = db_session
+    matcher = Matcher(db)
+    try:
+        db.add(Resume(id=1, text="a"))
+        db.commit()
+        resumes = ResumeSet(np.array([1], dtype=np.int64), unit_vectors(rng, 1),
+                            np.zeros((1, 4), dtype=np.uint8), np.zeros(1, dtype=np.int64))
+        matcher.match_jobs_with_resumes(_batch(rng, unit_vectors, range(1, 11)), resumes)
+        matcher.match_resumes_with_corpus(_batch(rng, unit_vectors, range(11, 21)), resumes)
+        assert db.query(Match).filter(Match.resume_id == 1).count() == 20
+    finally:
+        matcher.close()
+
+
+def test_top_k_is_picked_on_the_unrounded_score(db_session):
+    db = db_session
+    matcher = Matcher(db)
+    try:
+        db.add(Resume(id=1, text="a"))
+        db.commit()
+        resume = np.zeros((1, 16), dtype=np.float32)
+        resume[0, 0] = 1
+        # semantic 0.400 and 0.405 (no skills on either side, so full overlap): both round to 51
+        jobs = np.zeros((2, 16), dtype=np.float32)
+        for row, cosine in enumerate([0.400, 0.405]):
+            jobs[row, 0], jobs[row, 1] = cosine, np.sqrt(1 - cosine ** 2)
+        batch = JobBatch(None, jobs, np.zeros(2), np.zeros((2, 4), dtype=np.uint8),
+                         job_ids=np.array([10, 11], dtype=np.int64))
+        resumes = ResumeSet(np.array([1], dtype=np.int64), resume, np.zeros((1, 4), dtype=np.uint8),
+                            np.zeros(1, dtype=np.int64))
+        assert matcher.score_matrix(resumes, batch)["score"].tolist() == [[51.0, 51.0]]
+        matcher.match_jobs_with_resumes(batch, resumes, top_k=1)
+        assert [m.job_id for m in db.query(Match).all()] == [11]
+    finally:
+        matcher.close()
+
+
+def test_skills_outside_the_taxonomy_count_the_same_on_both_sides(db_session):
+    db = db_session
+    matcher = Matcher(db)
+    try:
+        jobs = []
+        for i, skills in enumerate([["python"], ["python", "cobol-on-mars"]]):
+            job = Job(external_id=f"job-{i}", title="Engineer", company="Acme", description="x",
+                      skills=json.dumps(skills))
+            job.set_embedding(np.eye(16, dtype=np.float32)[0])
+            jobs.append(job)
+        db.add_all(jobs)
+        db.commit()
+        batch = matcher.prepare_jobs(jobs)
+        assert batch.unknown.tolist() == [0, 1]
+
+        embedding = np.eye(16, dtype=np.float32)[0]
+        with_unknown = matcher.score_batch(embedding, ["python", "cobol-on-mars"], batch)["skill_overlap"]
+        plain = matcher.score_batch(embedding, ["python"], batch)["skill_overlap"]
+        # {python, x} vs {python} scores 1/2 whichever side lists x
+        assert with_unknown[0] == plain[1] == 0.5
+    finally:
+        matcher.close()
+
+
+def test_resume_matrix_picks_up_resumes_committed_after_a_higher_id(db_session, unit_vectors):
+    from app.services.resume_matrix import ResumeMatrix
+
+    db = db_session
+    rng = np.random.default_rng(3)
+    matrix = ResumeMatrix()
+    # two concurrent uploads: id 2 commits and is loaded before id 1 commits
+    for resume_id in (2, 1):
+        resume = Resume(id=resume_id, text="a", skills=json.dumps(["python"]), match_pending=True)
+        resume.set_embedding(unit_vectors(rng, 1)[0])
+        db.add(resume)
+        db.commit()
+        assert matrix.refresh(db) == 1
+    assert sorted(matrix.current().ids.tolist()) == [1, 2]
+    assert matrix.refresh(db) == 0
+
+
+def test_saving_the_same_pairs_again_updates_them_in_place(db_session, monkeypatch):
+    import app.services.matcher as matcher_module
+
+    db = db_session
+    matcher = Matcher(db)
+    try:
+        db.add_all([Resume(id=1, text="a"), Resume(id=2, text="b")])
+        db.commit()
+
+        def rows(score):
+            return [{"resume_id": r, "job_id": j, "score": score, "semantic_similarity": 0.5,
+                     "skill_overlap": 0.5, "missing_skills": "[]"} for r in (1, 2) for j in (10, 11)]
+
+        matcher.save_matches(rows(40.0))
+        matcher.save_matches(rows(60.0))
+        # dialects without ON CONFLICT replace the pairs instead
+        monkeypatch.setattr(matcher_module, "dialect_insert", lambda db, table: None)
+        matcher.save_matches(rows(80.0)[:2])
+
+        saved = {(m.resume_id, m.job_id): m.score for m in db.query(Match).all()}
+        assert saved == {(1, 10): 80.0, (1, 11): 80.0, (2, 10): 60.0, (2, 11): 60.0}
+        assert db.get(Resume, 1).match_version == 3
+        assert db.get(Resume, 2).match_version == 2
+    finally:
+        matcher.close()
+
+
+def test_results_page_by_score_with_a_minimum(db_session):
+    db = db_session
+    matcher = Matcher(db)
+    try:
+        db.add(Resume(id=1, text="a"))
+        db.add_all([Job(id=j, external_id=f"job-{j}", title=f"Job {j}", company="Acme") for j in range(1, 6)])
+        db.add_all([Match(resume_id=1, job_id=j, score=score, missing_skills=json.dumps(["go"]))
+                    for j, score in zip(range(1, 6), [30.0, 90.0, 60.0, 75.0, 45.0])])
+        # another resume's matches never show up
+        db.add(Match(resume_id=2, job_id=1, score=99.0))
+        db.commit()
+
+        def titles(**kwargs):
+            return [m["title"] for m in matcher.get_matches_for_resume(1, **kwargs)]
+
+        assert titles() == ["Job 2", "Job 4", "Job 3", "Job 5", "Job 1"]
+        assert titles(limit=2, offset=1) == ["Job 4", "Job 3"]
+        assert titles(min_score=50) == ["Job 2", "Job 4", "Job 3"]
+        assert titles(limit=2, offset=2, min_score=50) == ["Job 3"]
+        assert matcher.get_matches_for_resume(1, limit=1)[0] == {
+            "title": "Job 2", "company": "Acme", "score": 90, "missing_skills": ["go"], "apply_url": None}
+    finally:
+        matcher.close()
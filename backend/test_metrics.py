@@ -0,0 +1,42 @@
+from app.core.metrics import Counter, Histogram, REGISTRY, server_timing, stage, start_profile
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram("test_latency_seconds", "test", ["stage"], buckets=(0.1, 1.0))
+    REGISTRY.remove(hist)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(value, stage="a")
+    lines = hist.render()
+    assert 'test_latency_seconds_bucket{stage="a",le="0.1"} 2' in lines
+    assert 'test_latency_seconds_bucket{stage="a",le="1"} 3' in lines
+    assert 'test_latency_seconds_bucket{stage="a",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_count{stage="a"} 4' in lines
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("test_total", "test", ["result"])
+    REGISTRY.remove(counter)
+    counter.inc(2, result='say "hi"')
+    assert counter.render()[-1] == 'test_total{result="say \\"hi\\""} 2'
+
+
+def test_stages_collect_into_the_current_profile():
+    profile = start_profile()
+    with stage("embed", items=3):
+        pass
+    with stage("embed", items=2):
+        pass
+    assert profile["embed"][1:] == [2, 5]
+    assert server_timing(profile).startswith('embed;dur=')
+    assert server_timing(profile).endswith('desc="2 calls, 5 items"')
+
+
+
+def test_route_label_keeps_the_router_prefix():
+    from app.api.match import router
+    from app.main import route_label
+
+    route = next(r for r in router.routes if r.path == "/results/{resume_id}")
+    scope = {"path": "/api/results/7", "route": route}
+    assert route_label(scope) == "/api/results/{resume_id}"
+    assert route_label({"path": "/no/such/path"}) == "unmatched"
@@ -0,0 +1,83 @@
+import json
+
+import numpy as np
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.migrations import dedupe_matches, migrate_json_embeddings, run_migrations
+from app.models.job import Job
+from app.models.resume import Resume
+
+# tables as the first release created them: embeddings as JSON text, no unique match index
+BASELINE_SCHEMA = [
+    "CREATE TABLE jobs (id INTEGER PRIMARY KEY, external_id VARCHAR UNIQUE, title VARCHAR, company VARCHAR, "
+    "description TEXT, posted_date DATETIME, apply_url VARCHAR, embedding TEXT, "
+    "created_at DATETIME DEFAULT CURRENT_TIMESTAMP)",
+    "CREATE TABLE resumes (id INTEGER PRIMARY KEY, text TEXT, skills TEXT, embedding TEXT, "
+    "created_at DATETIME DEFAULT CURRENT_TIMESTAMP)",
+    "CREATE TABLE matches (id INTEGER PRIMARY KEY, resume_id INTEGER REFERENCES resumes (id), "
+    "job_id INTEGER REFERENCES jobs (id), score FLOAT, semantic_similarity FLOAT, skill_overlap FLOAT, "
+    "missing_skills TEXT, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)",
+]
+
+
+def _baseline_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.execute(text(statement))
+    return engine
+
+
+def _init_db(engine):
+    # what init_db() does, against the given engine
+    from app.models import fetch_watermark, job, match, match_task, resume  # noqa: F401
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+
+def test_json_embeddings_are_rewritten_as_float32_blobs(tmp_path):
+    engine = _baseline_engine(tmp_path)
+    vector = [0.25, -0.5, 1.0]
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO jobs (id, external_id, title, embedding) VALUES (1, 'a', 'Engineer', :e)"),
+                     {"e": json.dumps(vector)})
+        conn.execute(text("INSERT INTO jobs (id, external_id, title) VALUES (2, 'b', 'Analyst')"))
+        conn.execute(text("INSERT INTO resumes (id, text, skills, embedding) VALUES (1, 'cv', '[]', :e)"),
+                     {"e": json.dumps(vector)})
+
+    _init_db(engine)
+
+    db = sessionmaker(bind=engine)()
+    try:
+        assert db.get(Job, 1).embedding_vector().tolist() == vector
+        assert db.get(Job, 2).embedding is None
+        assert db.get(Resume, 1).embedding_vector().dtype == np.float32
+    finally:
+        db.close()
+    # already converted rows are left alone on the next start
+    assert migrate_json_embeddings(engine) == 0
+    engine.dispose()
+
+
+def test_duplicate_matches_collapse_to_the_newest_before_the_unique_index(tmp_path):
+    engine = _baseline_engine(tmp_path)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO jobs (id, external_id, title) VALUES (1, 'a', 'Engineer'), (2, 'b', 'Analyst')"))
+        conn.execute(text("INSERT INTO resumes (id, text, skills) VALUES (1, 'cv', '[]')"))
+        # the baseline stored a new row each time a pair was matched again
+        conn.execute(text("INSERT INTO matches (id, resume_id, job_id, score) "
+                          "VALUES (1, 1, 1, 40), (2, 1, 2, 55), (3, 1, 1, 70)"))
+
+    _init_db(engine)
+
+    with engine.begin() as conn:
+        rows = conn.execute(text("SELECT id, job_id, score FROM matches ORDER BY id")).fetchall()
+        assert [tuple(row) for row in rows] == [(2, 2, 55.0), (3, 1, 70.0)]
+        indexes = [row[1] for row in conn.execute(text("PRAGMA index_list('matches')"))]
+    assert "uq_matches_resume_job" in indexes
+    # a second start finds the index and deletes nothing
+    assert dedupe_matches(engine) == 0
+    engine.dispose()
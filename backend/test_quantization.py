@@ -0,0 +1,49 @@
+import numpy as np
+
+from app.core.vectors import decode_json_embedding, embedding_from_bytes, embedding_to_bytes, quantize_int8
+from app.services.matcher import JobBatch, Matcher
+from app.services.resume_matrix import ResumeSet
+
+
+def test_int8_codes_reconstruct_within_half_a_step(unit_vectors):
+    embeddings = unit_vectors(np.random.default_rng(0), 100, 64)
+    embeddings[3] = 0
+    codes, scales = quantize_int8(embeddings)
+    assert codes.dtype == np.int8 and scales.dtype == np.float32
+    assert scales[3] == 0 and not codes[3].any()
+    error = np.abs(codes * scales[:, None] - embeddings)
+    assert (error <= scales[:, None] / 2 + 1e-7).all()
+
+
+def test_stored_embeddings_decode_binary_and_legacy_json():
+    vector = np.array([0.5, -1.0, 2.0], dtype=np.float32)
+    assert embedding_from_bytes(embedding_to_bytes(vector)).tolist() == vector.tolist()
+    assert embedding_from_bytes(b" [0.5, -1.0, 2.0]\n").tolist() == vector.tolist()
+    assert embedding_from_bytes("[0.5, -1.0, 2.0]").tolist() == vector.tolist()
+    # binary rows are never taken for JSON, even when framed by "[" and "]"
+    assert decode_json_embedding(embedding_to_bytes(vector)) is None
+    assert decode_json_embedding(b"[" + embedding_to_bytes(vector) + b"]") is None
+
+
+def test_rescore_shortlist_keeps_the_exact_top_k(unit_vectors):
+    rng = np.random.default_rng(1)
+    n_jobs, top_k = 5000, 20
+    embeddings = unit_vectors(rng, n_jobs, 64)
+    codes, scales = quantize_int8(embeddings)
+    skill_masks = rng.integers(0, 256, size=(n_jobs, 4), dtype=np.uint8)
+    batch = JobBatch(None, embeddings, rng.random(n_jobs), skill_masks,
+                     job_ids=np.arange(n_jobs, dtype=np.int64), codes=codes, scales=scales)
+    resumes = ResumeSet(np.arange(3, dtype=np.int64), unit_vectors(rng, 3, 64),
+                        rng.integers(0, 256, size=(3, 4), dtype=np.uint8), np.zeros(3, dtype=np.int64))
+
+    matcher = Matcher()
+    try:
+        shortlist = matcher.rescore_candidates(resumes, batch, top_k)
+        exact = matcher.score_matrix(resumes, batch)["final"]
+    finally:
+        matcher.close()
+    assert shortlist is not None and shortlist.shape[0] == 3
+    for r in range(3):
+        # every job scoring above the exact k-th best score made the shortlist
+        kth = np.sort(exact[r])[::-1][top_k - 1]
+        assert set(np.flatnonzero(exact[r] > kth)) <= set(shortlist[r])
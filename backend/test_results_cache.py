@@ -0,0 +1,25 @@
+from app.services.results_cache import ResultsCache
+
+
+def test_entries_are_served_only_for_their_version():
+    cache = ResultsCache(max_bytes=1024)
+    cache.put(1, (100, 0, None), 3, b"[1]")
+    assert cache.get(1, (100, 0, None), 3) == b"[1]"
+    assert cache.get(1, (100, 0, None), 4) is None
+    assert cache.get(1, (10, 0, None), 3) is None
+    cache.put(1, (100, 0, None), 4, b"[1,2]")
+    assert cache.get(1, (100, 0, None), 4) == b"[1,2]"
+    assert len(cache) == 1 and cache.size == 5
+
+
+def test_least_recently_used_bodies_are_evicted_past_max_bytes():
+    cache = ResultsCache(max_bytes=10)
+    cache.put(1, (), 0, b"aaaa")
+    cache.put(2, (), 0, b"bbbb")
+    cache.get(1, (), 0)
+    cache.put(3, (), 0, b"cccc")
+    assert cache.get(2, (), 0) is None
+    assert cache.get(1, (), 0) == b"aaaa" and cache.get(3, (), 0) == b"cccc"
+    assert cache.size == 8
+    cache.put(4, (), 0, b"x" * 11)  # larger than the whole cache: not stored
+    assert cache.get(4, (), 0) is None and cache.size == 8
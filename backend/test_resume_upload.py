@@ -0,0 +1,83 @@
+import io
+
+from docx import Document
+from fastapi.testclient import TestClient
+
+import app.services.resume_parser as resume_parser
+from app.main import app
+from app.services.resume_parser import ResumeParser
+from benchmarks.synthetic import SyntheticCorpus
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def _docx(text: str) -> bytes:
+    document = Document()
+    document.add_paragraph(text)
+    buf = io.BytesIO()
+    document.save(buf)
+    return buf.getvalue()
+
+
+def test_pdfs_over_the_page_limit_are_rejected(monkeypatch):
+    monkeypatch.setattr(resume_parser, "RESUME_MAX_PAGES", 2)
+    pdf = SyntheticCorpus.pdf_bytes(["Python developer", "SQL", "Docker"])
+    with TestClient(app) as client:
+        r = client.post("/api/resume/upload", files={"file": ("cv.pdf", pdf, PDF)})
+    assert r.status_code == 413
+    assert "3 pages" in r.json()["detail"]
+
+
+def test_files_over_the_byte_limit_are_rejected(monkeypatch):
+    monkeypatch.setattr(resume_parser, "RESUME_MAX_BYTES", 1000)
+    with TestClient(app) as client:
+        r = client.post("/api/resume/upload", files={"file": ("cv.docx", _docx("Python " * 500), DOCX)})
+    assert r.status_code == 413
+
+
+def test_long_pdfs_are_split_across_the_process_pool(monkeypatch):
+    monkeypatch.setattr(resume_parser, "RESUME_PARALLEL_PAGES", 2)
+    monkeypatch.setattr(resume_parser, "RESUME_PARSE_WORKERS", 2)
+    pages = [f"page{i} Python developer" for i in range(5)]
+    try:
+        text = ResumeParser.extract_text(io.BytesIO(SyntheticCorpus.pdf_bytes(pages)), "pdf")
+        assert resume_parser._pool is not None
+    finally:
+        if resume_parser._pool is not None:
+            resume_parser._pool.shutdown()
+        resume_parser._reset_pool()
+    # contiguous page ranges come back in document order
+    assert [line.split()[0] for line in text.splitlines()] == [f"page{i}" for i in range(5)]
+
+
+def test_batch_upload_stores_the_good_files_and_reports_the_bad_ones(monkeypatch):
+    monkeypatch.setattr(resume_parser, "RESUME_MAX_PAGES", 2)
+    files = [
+        ("files", ("first.docx", _docx("Backend engineer: Python, Docker"), DOCX)),
+        ("files", ("notes.txt", b"plain text", "text/plain")),
+        ("files", ("broken.pdf", b"not a pdf", PDF)),
+        ("files", ("long.pdf", SyntheticCorpus.pdf_bytes(["Python", "SQL", "Go"]), PDF)),
+        ("files", ("second.pdf", SyntheticCorpus.pdf_bytes(["Data engineer: SQL, Spark"]), PDF)),
+    ]
+    with TestClient(app) as client:
+        r = client.post("/api/resume/upload/batch", files=files)
+    assert r.status_code == 200
+    body = r.json()
+    resumes = body["resumes"]
+    assert [entry["filename"] for entry in resumes] == ["first.docx", "notes.txt", "broken.pdf", "long.pdf",
+                                                        "second.pdf"]
+    assert resumes[1]["error"] == "Unsupported file type"
+    assert "error" in resumes[2] and "resume_id" not in resumes[2]
+    assert "3 pages" in resumes[3]["error"]
+    assert resumes[0]["resume_id"] < resumes[4]["resume_id"]
+    assert body["match_task_id"] is not None
+
+
+def test_batch_upload_is_capped(monkeypatch):
+    import app.api.resume as resume_api
+
+    monkeypatch.setattr(resume_api, "RESUME_BATCH_MAX_FILES", 1)
+    files = [("files", (f"{i}.docx", _docx("Python"), DOCX)) for i in range(2)]
+    with TestClient(app) as client:
+        assert client.post("/api/resume/upload/batch", files=files).status_code == 413
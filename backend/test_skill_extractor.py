@@ -0,0 +1,14 @@
+from app.services.skill_extractor import SkillExtractor, get_skill_extractor
+
+
+def test_multi_word_skills_and_aliases():
+    skills = get_skill_extractor().extract(
+        "Built Machine-Learning pipelines in Python3 with scikit learn, deployed on K8s and AWS."
+    )
+    assert skills == ["python", "machine learning", "scikit-learn", "aws", "kubernetes"]
+
+
+def test_word_boundaries_for_symbol_skills():
+    extractor = SkillExtractor({"java": [], "javascript": ["js"], "c++": [], "c#": [], "node.js": ["nodejs"]})
+    assert extractor.extract("JavaScript and Node.js, some C++ / C#.") == ["javascript", "c++", "c#", "node.js"]
+    assert extractor.extract("javadoc, jsx, c+") == []